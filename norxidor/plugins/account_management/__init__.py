@@ -1,4 +1,4 @@
-from nonebot import get_plugin_config
+from nonebot import get_plugin_config, require
 from nonebot.plugin import PluginMetadata
 
 from .config import Config
@@ -12,5 +12,8 @@ __plugin_meta__ = PluginMetadata(
 
 config = get_plugin_config(Config)
 
-from . import utils
+require("nonebot_plugin_localstore")
+require("nonebot_plugin_orm")
+
+from . import checkin, coins, executor, journal, leaderboard, purge, storage, utils
 from .commands import *
\ No newline at end of file
@@ -0,0 +1,112 @@
+import time
+from .types.checkin import CheckinHistory
+from datetime import date, datetime, timedelta, timezone
+from nonebot_plugin_orm import async_scoped_session
+from sqlalchemy import select, update
+
+# 每日签到状态
+#
+# 签到日以UTC+8凌晨4时为界。当天已签到的账户id保存在内存中，重复签到无需查询数据库；
+# 跨过刷新时间后首次调用`day_start`时清空，重启后则在各账户再次签到时逐个补回。
+#
+# 签到历史以每个账户每月一个整数的位图保存，统计时将各月拼接为以`EPOCH`起的天数为下标的整数，
+# 连续签到天数等均由移位、按位运算与`int.bit_count`求得。
+
+TZ = timezone(timedelta(hours=8))
+RESET_HOUR = 4
+EPOCH = date(2000, 1, 1)
+
+checked_in: set[int] = set()
+"""当前签到日内已签到的账户id"""
+
+_day_start = 0.0
+_day_end = 0.0
+
+
+def day_start() -> float:
+    """当前签到日开始时的时间戳，每天只计算一次"""
+    global _day_start, _day_end
+    now = time.time()
+    if not _day_start <= now < _day_end:
+        today = datetime.fromtimestamp(now, TZ) - timedelta(hours=RESET_HOUR)
+        start = datetime(today.year, today.month, today.day, RESET_HOUR, tzinfo=TZ)
+        _day_start = start.timestamp()
+        _day_end = (start + timedelta(days=1)).timestamp()
+        checked_in.clear()
+    return _day_start
+
+
+def discard(user_id: int | None = None):
+    """账户被删除后调用，`user_id`为`None`时清除全部"""
+    if user_id is None:
+        checked_in.clear()
+    else:
+        checked_in.discard(user_id)
+
+
+def today() -> date:
+    """当前签到日的日期"""
+    return datetime.fromtimestamp(day_start(), TZ).date()
+
+
+def day_index(day: date) -> int:
+    return (day - EPOCH).days
+
+
+async def record(session: async_scoped_session, user_id: int, day: date):
+    """在签到历史中记录一次签到并提交，当月已有记录时为一条按位或的`UPDATE`"""
+    bit = 1 << (day.day - 1)
+    res = await session.execute(
+        update(CheckinHistory)
+        .where(
+            CheckinHistory.user_id == user_id,
+            CheckinHistory.year == day.year,
+            CheckinHistory.month == day.month,
+        )
+        .values(days=CheckinHistory.days.bitwise_or(bit))
+        .execution_options(synchronize_session=False)
+    )
+    if not res.rowcount:
+        session.add(CheckinHistory(user_id=user_id, year=day.year, month=day.month, days=bit))
+    await session.commit()
+
+
+async def month_days(session: async_scoped_session, user_id: int, year: int, month: int) -> int:
+    """某月的签到位图"""
+    return await session.scalar(
+        select(CheckinHistory.days).where(
+            CheckinHistory.user_id == user_id,
+            CheckinHistory.year == year,
+            CheckinHistory.month == month,
+        )
+    ) or 0
+
+
+async def history(session: async_scoped_session, user_id: int) -> int:
+    """全部签到历史拼接成的位图，第`day_index(d)`位表示日期`d`是否签到"""
+    res = 0
+    for year, month, days in await session.execute(
+        select(CheckinHistory.year, CheckinHistory.month, CheckinHistory.days).where(
+            CheckinHistory.user_id == user_id
+        )
+    ):
+        res |= days << day_index(date(year, month, 1))
+    return res
+
+
+def current_streak(bits: int, today: int) -> int:
+    """截至`today`的连续签到天数，今天尚未签到时截至昨天"""
+    if not bits >> today & 1:
+        today -= 1
+    # 不晚于`today`的最后一个未签到日之后均已签到
+    missed = ~bits & ((1 << (today + 1)) - 1)
+    return today + 1 - missed.bit_length()
+
+
+def longest_streak(bits: int) -> int:
+    """最长连续签到天数，每次迭代将所有连续段缩短一天"""
+    res = 0
+    while bits:
+        bits &= bits >> 1
+        res += 1
+    return res
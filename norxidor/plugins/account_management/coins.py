@@ -0,0 +1,61 @@
+from . import journal, leaderboard, utils
+from .types.account import Account
+from .types.journal import Reason
+from nonebot_plugin_orm import async_scoped_session
+from sqlalchemy import ColumnElement, and_, update
+
+# 余额变动的唯一入口
+#
+# 每次变动为一条`UPDATE ... SET coin = coin + :delta WHERE ... RETURNING id, coin`，
+# 由数据库完成加减与余额检查，避免读-改-写在并发命令间丢失更新。
+# 函数会提交会话，并在提交成功后更新账户缓存与排行榜、记录流水。
+
+
+async def add_coins(
+    session: async_scoped_session,
+    where: ColumnElement[bool],
+    delta: int,
+    reason: Reason,
+    *,
+    min_coin: int | None = None,
+    **values,
+) -> list[tuple[int, int]]:
+    """为满足`where`的所有账户增加`delta`（可为负）并提交，返回变动后的`[(id, coin)]`
+
+    `min_coin`不为`None`时只修改余额不低于该值的账户；`values`为同时写入的其他字段
+    """
+    stmt = (
+        update(Account)
+        .where(where)
+        .values(coin=Account.coin + delta, **values)
+        .returning(Account.id, Account.coin)
+        .execution_options(synchronize_session=False)
+    )
+    if min_coin is not None:
+        stmt = stmt.where(Account.coin >= min_coin)
+    rows = [tuple(x) for x in await session.execute(stmt)]
+    await session.commit()
+    for id, coin in rows:
+        utils.invalidate_account(id)
+        leaderboard.update_coin(id, coin)
+        journal.record(id, delta, reason)
+    return rows
+
+
+async def add_coin(
+    session: async_scoped_session,
+    user_id: int,
+    delta: int,
+    reason: Reason,
+    *where: ColumnElement[bool],
+    min_coin: int | None = None,
+    **values,
+) -> int | None:
+    """为单个账户增加`delta`（可为负）并提交，返回变动后的余额
+
+    账户不存在、余额低于`min_coin`或不满足附加条件`where`时不做修改并返回`None`
+    """
+    rows = await add_coins(
+        session, and_(Account.id == user_id, *where), delta, reason, min_coin=min_coin, **values
+    )
+    return rows[0][1] if rows else None
@@ -1,10 +1,12 @@
-from . import admin, good_day, lookup, nick, register, swindlestones
+from . import admin, good_day, lookup, nick, rank, register, streak, swindlestones
 
 __all__ = [
     "admin",
     "good_day",
     "lookup",
     "nick",
+    "rank",
     "register",
+    "streak",
     "swindlestones",
 ]
\ No newline at end of file
@@ -1,10 +1,14 @@
 import re
 import time
-from .. import config, utils
+from .. import coins, config, leaderboard, names, purge, utils
+from ..executor import executor
+from ..swindlestones import metrics, registry
 from ..types.account import Account, Nickname
-from sqlalchemy import delete
+from ..types.journal import Reason
+from sqlalchemy import insert, select, update
 from nonebot import on_command, on_shell_command, logger
 from nonebot.adapters.onebot.v11 import (
+    Bot,
     GroupMessageEvent,
     Message,
     MessageSegment,
@@ -18,6 +22,14 @@ from nonebot.rule import ArgumentParser, Namespace, is_type, to_me
 from nonebot.typing import T_State
 from nonebot_plugin_orm import async_scoped_session
 
+
+def _notify_target(bot: Bot, event: GroupMessageEvent | PrivateMessageEvent) -> dict:
+    """后台任务完成时通知的会话"""
+    if type(event) is GroupMessageEvent:
+        return {"self_id": bot.self_id, "group_id": event.group_id}
+    return {"self_id": bot.self_id, "user_id": event.user_id}
+
+
 # region dbnuke
 
 dbnuke = on_command(
@@ -55,29 +67,20 @@ async def _(
 @dbnuke.got("conformation")
 async def _(
     matcher: Matcher,
+    bot: Bot,
     event: GroupMessageEvent | PrivateMessageEvent,
-    session: async_scoped_session,
     state: T_State,
     conformation: str = ArgPlainText(),
 ):
     if conformation != "YES":
         await matcher.finish("已取消操作。")
 
-    try:
-        if state["target"] == "group" and type(event) is GroupMessageEvent:
-            await session.execute(
-                delete(Nickname).where(Nickname.group_id == event.group_id)
-            )
-        else:
-            await session.execute(delete(Account))
-            await session.execute(delete(Nickname))
-        await session.commit()
-        await matcher.finish("数据已删除完毕。")
-    except MatcherException:
-        raise
-    except Exception as e:
-        logger.opt(exception=e).error(type(e).__name__)
-        await matcher.finish("数据删除失败")
+    if state["target"] == "group" and type(event) is GroupMessageEvent:
+        job = purge.Job("group", event.group_id, notify=_notify_target(bot, event))
+    else:
+        job = purge.Job("all", notify=_notify_target(bot, event))
+    purge.submit(job)
+    await matcher.finish(f"已开始在后台删除{job.describe()}，完成后将通知。（使用命令【!purgestatus】查看进度）")
 
 
 # endregion
@@ -114,6 +117,10 @@ async def _(
     if type(new_nick) is not str:
         await matcher.finish("请提供合法昵称")
 
+    (target,), ambiguous = await utils.match_targets([target], event.group_id, session, exact=True)
+    if ambiguous:
+        await matcher.finish(utils.ambiguous_message(ambiguous))
+
     account, nickname = await utils.find_account(
         target=target, group_id=event.group_id, session=session
     )
@@ -122,8 +129,11 @@ async def _(
 
     try:
         if nickname:
-            nickname.nickname = new_nick
-            await session.flush([nickname])
+            await session.execute(
+                update(Nickname)
+                .where(Nickname.session_id == nickname.session_id)
+                .values(nickname=new_nick)
+            )
         else:
             session.add(
                 Nickname(
@@ -133,10 +143,12 @@ async def _(
                     nickname=new_nick,
                 )
             )
-        target_id = account.id
         await session.commit()
+        utils.invalidate_nickname(event.group_id, account.id)
+        leaderboard.update_nickname(event.group_id, account.id, new_nick, account.coin)
+        names.nicknames.set(event.group_id, account.id, new_nick)
         await matcher.finish(
-            "成功修改" + MessageSegment.at(target_id) + f" 的昵称为{new_nick}"
+            "成功修改" + MessageSegment.at(account.id) + f" 的昵称为{new_nick}"
         )
     except MatcherException:
         raise
@@ -171,41 +183,75 @@ async def _(
     if prefix != "!" or len(args) < 1:
         await matcher.finish()
 
-    target = utils.get_target_from_msg(args[0])
-    _nick = args[1] if len(args) >= 2 and type(args[1]) is str else None
+    # 第二个参数为文本且不是at或QQ号时视为`目标 昵称`（与之前一样忽略其后的参数），只有每个参数都是at或QQ号时才批量注册
+    _nick = (
+        args[1]
+        if len(args) >= 2 and type(args[1]) is str and type(utils.get_target_from_msg(args[1])) is not int
+        else None
+    )
+    targets = [utils.get_target_from_msg(x) for x in (args[:1] if _nick else args)]
 
-    if type(target) is not int:
+    if any(type(x) is not int for x in targets):
         await matcher.finish("请提供合法目标")
-
-    account, nickname = await utils.find_account(
-        target=target, group_id=event.group_id, session=session
-    )
-    if account:
-        await matcher.finish(
-            MessageSegment.at(account.id)
-            + (f"（{nickname.nickname}）" if nickname else "")
-            + "已经注册账户"
+    targets = list(dict.fromkeys(targets))
+    single = len(targets) == 1
+
+    registered = set()
+    if single:
+        target = targets[0]
+        account, nickname = await utils.find_account(
+            target=target, group_id=event.group_id, session=session
         )
-
-    session.add(
-        Account(id=target, register_time=time.time(), coin=0, last_checkin_time=0)
-    )
-    if _nick:
-        session.add(
-            Nickname(
-                session_id=f"group_{event.group_id}_{target}",
-                user_id=target,
-                group_id=event.group_id,
-                nickname=_nick,
+        if account:
+            await matcher.finish(
+                MessageSegment.at(account.id)
+                + (f"（{nickname.nickname}）" if nickname else "")
+                + "已经注册账户"
             )
+    else:
+        registered = set(
+            await session.scalars(select(Account.id).where(Account.id.in_(targets)))
         )
+        targets = [x for x in targets if x not in registered]
+        if not targets:
+            await matcher.finish("目标均已注册账户")
+
+    register_time = time.time()
     try:
+        await session.execute(
+            insert(Account),
+            [
+                dict(id=x, register_time=register_time, coin=0, last_checkin_time=0)
+                for x in targets
+            ],
+        )
+        if _nick:
+            await session.execute(
+                insert(Nickname).values(
+                    session_id=f"group_{event.group_id}_{targets[0]}",
+                    user_id=targets[0],
+                    group_id=event.group_id,
+                    nickname=_nick,
+                )
+            )
         await session.commit()
+        for target in targets:
+            utils.invalidate_account(target)
+            leaderboard.update_coin(target, 0)
+        if _nick:
+            utils.invalidate_nickname(event.group_id, targets[0])
+            leaderboard.update_nickname(event.group_id, targets[0], _nick, 0)
+            names.nicknames.set(event.group_id, targets[0], _nick)
+        if single:
+            await matcher.finish(
+                "成功为"
+                + MessageSegment.at(targets[0])
+                + (f"（{_nick}）" if _nick else " ")
+                + "注册账户"
+            )
         await matcher.finish(
-            "成功为"
-            + MessageSegment.at(target)
-            + (f"（{_nick}）" if _nick else " ")
-            + "注册账户"
+            f"成功注册{len(targets)}个账户"
+            + (f"，{len(registered)}个目标已经注册账户" if registered else "")
         )
     except MatcherException:
         raise
@@ -246,9 +292,14 @@ async def _(
     if target is None:
         await matcher.finish("请提供合法目标")
 
+    group_id = event.group_id if type(event) is GroupMessageEvent else None
+    (target,), ambiguous = await utils.match_targets([target], group_id, session, exact=True)
+    if ambiguous:
+        await matcher.finish(utils.ambiguous_message(ambiguous))
+
     account, nickname = await utils.find_account(
         target=target,
-        group_id=event.group_id if type(event) is GroupMessageEvent else None,
+        group_id=group_id,
         session=session,
     )
     if not account:
@@ -264,25 +315,17 @@ async def _(
 @deleteaccount.got("conformation")
 async def _(
     matcher: Matcher,
+    bot: Bot,
     event: GroupMessageEvent | PrivateMessageEvent,
-    session: async_scoped_session,
     state: T_State,
     conformation: str = ArgPlainText(),
 ):
     if conformation != "YES":
         await matcher.finish("已取消操作。")
 
-    account_id = state["account_id"]
-    try:
-        await session.execute(delete(Account).where(Account.id == account_id))
-        await session.execute(delete(Nickname).where(Nickname.user_id == account_id))
-        await session.commit()
-        await matcher.finish("已删除该用户。")
-    except MatcherException:
-        raise
-    except Exception as e:
-        logger.opt(exception=e).error(type(e).__name__)
-        await matcher.finish("数据删除失败")
+    job = purge.Job("account", state["account_id"], notify=_notify_target(bot, event))
+    purge.submit(job)
+    await matcher.finish(f"已开始在后台删除{job.describe()}，完成后将通知。")
 
 
 # endregion
@@ -312,40 +355,136 @@ async def _(
     if prefix != "!" or len(args) < 1:
         await matcher.finish()
 
-    if len(args) == 1:
-        if type(args[0]) is not str or not re.match(r"^[+-]?\d+$", args[0]):
+    if type(args[-1]) is not str or not re.match(r"^[+-]?\d+$", args[-1]):
+        await matcher.finish("参数不合法")
+    add_count = int(args[-1])
+    args = args[:-1]
+
+    if "--group" in args:
+        if len(args) > 1:
             await matcher.finish("参数不合法")
-        target = event.user_id
-        add_count = int(args[0])
+        # 本群所有拥有昵称的账户
+        where = Account.id.in_(
+            select(Nickname.user_id).where(Nickname.group_id == event.group_id)
+        )
+        target_id, target_nick = None, None
     else:
-        target = utils.get_target_from_msg(args[0])
-        if type(args[1]) is not str or not re.match(r"^[+-]?\d+$", args[1]):
-            await matcher.finish("参数不合法")
-        else:
-            add_count = int(args[1])
-
-    if target is None:
-        await matcher.finish("请提供合法目标")
-
-    account, nickname = await utils.find_account(
-        target=target, group_id=event.group_id, session=session
-    )
-    if not account:
-        await matcher.finish("未找到符合的对象")
+        targets = [utils.get_target_from_msg(x) for x in args] or [event.user_id]
+        if None in targets:
+            await matcher.finish("请提供合法目标")
+        targets, ambiguous = await utils.match_targets(targets, event.group_id, session, exact=True)
+        if ambiguous:
+            await matcher.finish(utils.ambiguous_message(ambiguous))
+
+        results = await utils.find_accounts(
+            targets=list(dict.fromkeys(targets)), group_id=event.group_id, session=session
+        )
+        if not all(account for account, _ in results):
+            await matcher.finish("未找到符合的对象")
+        where = Account.id.in_({account.id for account, _ in results})
+        account, nickname = results[0]
+        target_id = account.id if len(results) == 1 else None
+        target_nick = nickname.nickname if nickname else None
 
     try:
-        target_id = account.id
-        target_nick = nickname.nickname if nickname else None
-        account.coin += add_count
-        await session.flush([account])
-        await session.commit()
-        await matcher.finish(
-            f"成功为{target_nick}" + MessageSegment.at(target_id) + " " + ("添加" if add_count >= 0 else "扣除") + f"{abs(add_count)}枚{config.coin_notation}！"
-        )
+        rows = await coins.add_coins(session, where, add_count, Reason.ADMIN)
+        verb = "添加" if add_count >= 0 else "扣除"
+        if target_id is not None:
+            await matcher.finish(
+                f"成功为{target_nick}" + MessageSegment.at(target_id) + f" {verb}{abs(add_count)}枚{config.coin_notation}！"
+            )
+        await matcher.finish(f"成功为{len(rows)}个账户{verb}{abs(add_count)}枚{config.coin_notation}！")
     except MatcherException:
         raise
     except Exception as e:
         logger.opt(exception=e).error(type(e).__name__)
         await matcher.finish("兔币数据修改失败")
 
-# endregion
\ No newline at end of file
+# endregion
+
+# region purgestatus
+
+purgestatus = on_command(
+    "!purgestatus",
+    permission=SUPERUSER,
+    priority=10,
+    block=True,
+)
+
+
+@purgestatus.handle()
+async def _(matcher: Matcher, prefix: str = CommandStart()):
+    if prefix != "!":
+        await matcher.finish()
+
+    await matcher.finish("\n".join(purge.status()) or "没有进行中的删除任务")
+
+
+# endregion
+
+# region ssstatus
+
+ssstatus = on_command(
+    "!ssstatus",
+    permission=SUPERUSER,
+    priority=10,
+    block=True,
+)
+
+
+@ssstatus.handle()
+async def _(
+    matcher: Matcher,
+    prefix: str = CommandStart(),
+    args: Message = CommandArg(),
+):
+    if prefix != "!":
+        await matcher.finish()
+
+    preset = args.extract_plain_text().strip().lower()
+    if preset == "reset":
+        metrics.reset()
+        await matcher.finish("已清空AI决策统计")
+    elif preset:
+        await matcher.finish("\n".join(metrics.detail(preset)) or "该骰子预设下尚无AI决策")
+
+    await matcher.finish(
+        f"进行中的Swindlestones对局：{len(registry.games)}局"
+        + f"\n估算内存占用：{registry.memory_usage() / 1024:.1f} KiB"
+        + f"\n闲置超时：{config.swindlestones_idle_timeout:g}秒"
+        + f"\n工作池：{executor.pending}个任务执行或排队中，已完成{executor.completed}，拒绝{executor.rejected}，超时{executor.timed_out}"
+        + "".join(f"\n{x}" for x in metrics.summary())
+    )
+
+
+# endregion
+
+# region cachestatus
+
+cachestatus = on_command(
+    "!cachestatus",
+    permission=SUPERUSER,
+    priority=10,
+    block=True,
+)
+
+
+@cachestatus.handle()
+async def _(
+    matcher: Matcher,
+    prefix: str = CommandStart(),
+):
+    if prefix != "!":
+        await matcher.finish()
+
+    msg = ""
+    for name, cache in (("账户", utils.account_cache), ("昵称", utils.nickname_cache)):
+        total = cache.hits + cache.misses
+        msg += (
+            f"\n{name}缓存：{len(cache)}/{cache.maxsize}条，命中{cache.hits}次，未命中{cache.misses}次"
+            + (f"，命中率{cache.hits / total:.1%}" if total else "")
+        )
+    await matcher.finish(msg.strip())
+
+
+# endregion
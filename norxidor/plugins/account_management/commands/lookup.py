@@ -28,23 +28,30 @@ async def _(
     session: async_scoped_session,
     args: list[str | MessageSegment] = ShellCommandArgv(),
 ):
-    target = utils.get_target_from_msg(args[0]) if len(args) > 0 else event.user_id
-    if target is None:
+    targets = [utils.get_target_from_msg(x) for x in args] if len(args) > 0 else [event.user_id]
+    if None in targets:
         await matcher.finish(
             MessageSegment.at(event.user_id) + " 请提供合法的查询目标：本群昵称/QQ号/at"
         )
+    targets, ambiguous = await utils.match_targets(targets, event.group_id, session)
+    if ambiguous:
+        await matcher.finish(MessageSegment.at(event.user_id) + " " + utils.ambiguous_message(ambiguous))
+    targets = list(dict.fromkeys(targets))
 
-    account, nickname = await utils.find_account(target=target, group_id=event.group_id, session=session)
+    results = await utils.find_accounts(targets=targets, group_id=event.group_id, session=session)
 
-    if not account:
+    if not any(account for account, _ in results):
         await matcher.finish(
             MessageSegment.at(event.user_id) + " 未找到符合的查询对象！"
         )
     else:
         tz_utc_8 = timezone(timedelta(hours=8))
-        await matcher.finish(
-            MessageSegment.at(event.user_id)
-            + MessageSegment.text(
+        msg = ""
+        for target, (account, nickname) in zip(targets, results):
+            if not account:
+                msg += f"\n查询对象：{target}\n{BAR_STRING}\n未找到符合的查询对象！"
+                continue
+            msg += (
                 f"\n查询对象："
                 + (f"{nickname.nickname} ({account.id})" if nickname else str(account.id))
                 + f"\n{BAR_STRING}"
@@ -52,4 +59,4 @@ async def _(
                 + f"\n上次签到时间：{datetime.fromtimestamp(account.last_checkin_time, tz=tz_utc_8).strftime('%Y/%m/%d %H:%M:%S')} (UTC+8)"
                 + f"\n{config.coin_notation}：{account.coin}"
             )
-        )
+        await matcher.finish(MessageSegment.at(event.user_id) + MessageSegment.text(msg))
@@ -1,4 +1,5 @@
-from ..types.account import Account, Nickname
+from .. import leaderboard, names, utils
+from ..types.account import Nickname
 from nonebot import on_shell_command, logger
 from nonebot.adapters.onebot.v11 import GroupMessageEvent, MessageSegment
 from nonebot.exception import MatcherException
@@ -6,6 +7,7 @@ from nonebot.matcher import Matcher
 from nonebot.params import ShellCommandArgs
 from nonebot.rule import ArgumentParser, Namespace, is_type, to_me
 from nonebot_plugin_orm import async_scoped_session
+from sqlalchemy import update
 
 parser = ArgumentParser(prog="NICK | 修改昵称")
 parser.add_argument("nickname", type=str, help="要修改的昵称")
@@ -26,15 +28,17 @@ async def _(
     session: async_scoped_session,
     args: Namespace = ShellCommandArgs(),
 ):
-    if await session.get(Account, event.user_id):
-        nickname = await session.get(Nickname, event.get_session_id())
+    if account := await utils.get_account(event.user_id, session):
+        nickname = await utils.get_nickname(event.get_session_id(), session)
         try:
             if nickname:
-                nickname.nickname = args.nickname
-                await session.flush([nickname])
+                await session.execute(update(Nickname).where(Nickname.session_id == nickname.session_id).values(nickname=args.nickname))
             else:
                 session.add(Nickname(session_id=event.get_session_id(), user_id=event.user_id, group_id=event.group_id, nickname=args.nickname))
             await session.commit()
+            utils.invalidate_nickname(event.group_id, event.user_id)
+            leaderboard.update_nickname(event.group_id, event.user_id, args.nickname, account.coin)
+            names.nicknames.set(event.group_id, event.user_id, args.nickname)
             await matcher.finish(MessageSegment.at(event.user_id) + f" 成功修改昵称为{args.nickname}")
         except MatcherException:
             raise
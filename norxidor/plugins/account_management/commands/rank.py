@@ -0,0 +1,48 @@
+import nonebot
+from .. import config, leaderboard
+from nonebot import on_shell_command
+from nonebot.adapters.onebot.v11 import GroupMessageEvent, MessageSegment, PrivateMessageEvent
+from nonebot.exception import ParserExit
+from nonebot.matcher import Matcher
+from nonebot.params import ShellCommandArgs
+from nonebot.rule import ArgumentParser, Namespace, is_type
+from nonebot_plugin_orm import async_scoped_session
+
+BAR_STRING = nonebot.get_driver().config.bar_string
+
+parser = ArgumentParser(prog="LEADERBOARD | RANK | 排行榜")
+parser.add_argument("-g", "--global", dest="is_global", action="store_true", help="查看全服排行榜（私聊中默认为全服）")
+
+matcher = on_shell_command(
+    "leaderboard",
+    aliases={"rank", "排行榜"},
+    parser=parser,
+    rule=is_type(GroupMessageEvent, PrivateMessageEvent),
+    priority=10,
+    block=True,
+)
+
+
+@matcher.handle()
+async def _(matcher: Matcher, args: ParserExit = ShellCommandArgs()):
+    await matcher.finish(args.message if args.status == 0 else "参数解析失败")
+
+
+@matcher.handle()
+async def _(
+    matcher: Matcher,
+    event: GroupMessageEvent | PrivateMessageEvent,
+    session: async_scoped_session,
+    args: Namespace = ShellCommandArgs(),
+):
+    group_id = event.group_id if type(event) is GroupMessageEvent else None
+    res = await leaderboard.top(None if args.is_global else group_id, session)
+    if not res:
+        await matcher.finish(MessageSegment.at(event.user_id) + " 还没有人上榜！")
+
+    msg = f"🏆{'全服' if args.is_global or not group_id else '本群'}{config.coin_notation}排行榜"
+    msg += f"\n{BAR_STRING}"
+    for i, (id, coin) in enumerate(res):
+        nickname = leaderboard.nickname_of(id, group_id)
+        msg += f"\n{i + 1}. {f'{nickname} ({id})' if nickname else id}：{coin}"
+    await matcher.finish(msg)
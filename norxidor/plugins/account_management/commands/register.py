@@ -1,4 +1,5 @@
 import time
+from .. import leaderboard, names, utils
 from ..types.account import Account, Nickname
 from nonebot import on_shell_command, logger
 from nonebot.adapters.onebot.v11 import GroupMessageEvent, MessageSegment
@@ -14,8 +15,8 @@ parser.add_argument("nickname", type=str, nargs="?", default="", help="您的昵
 matcher = on_shell_command("register", aliases={"注册"}, parser=parser, rule=is_type(GroupMessageEvent)&to_me(), priority=10, block=True)
 @matcher.handle()
 async def _(matcher: Matcher, event: GroupMessageEvent, session: async_scoped_session, args: Namespace = ShellCommandArgs()):
-    if await session.get(Account, event.user_id):
-        nickname = await session.get(Nickname, event.get_session_id())
+    if await utils.get_account(event.user_id, session):
+        nickname = await utils.get_nickname(event.get_session_id(), session)
         await matcher.finish(f"亲爱的{(nickname.nickname+' ') if nickname else ''} " + MessageSegment.at(event.user_id) + "，您已经注册过了！")
     
     nickname = args.nickname
@@ -25,6 +26,12 @@ async def _(matcher: Matcher, event: GroupMessageEvent, session: async_scoped_se
         
     try:
         await session.commit()
+        utils.invalidate_account(event.user_id)
+        leaderboard.update_coin(event.user_id, 0)
+        utils.invalidate_nickname(event.group_id, event.user_id)
+        if nickname:
+            leaderboard.update_nickname(event.group_id, event.user_id, nickname, 0)
+            names.nicknames.set(event.group_id, event.user_id, nickname)
         await matcher.finish(f"尊敬的{(nickname+' ') if nickname else ''}" + MessageSegment.at(event.user_id) + "，您已成功注册账户！")
     except MatcherException:
         raise
@@ -0,0 +1,86 @@
+import calendar
+import nonebot
+import re
+from .. import checkin, utils
+from nonebot import on_command, on_shell_command
+from nonebot.adapters.onebot.v11 import GroupMessageEvent, MessageSegment
+from nonebot.exception import ParserExit
+from nonebot.matcher import Matcher
+from nonebot.params import ShellCommandArgs
+from nonebot.rule import ArgumentParser, Namespace, is_type
+from nonebot_plugin_orm import async_scoped_session
+
+BAR_STRING = nonebot.get_driver().config.bar_string
+
+# region streak
+
+streak = on_command("streak", aliases={"连签"}, rule=is_type(GroupMessageEvent), priority=10, block=True)
+
+
+@streak.handle()
+async def _(matcher: Matcher, event: GroupMessageEvent, session: async_scoped_session):
+    if not await utils.get_account(event.user_id, session):
+        await matcher.finish("尊敬的"+MessageSegment.at(event.user_id)+"，您尚未注册账户，请先注册！（使用命令【/(register|注册) [昵称]】注册，昵称为可选项，使用时需at本机器人）")
+
+    bits = await checkin.history(session, event.user_id)
+    today = checkin.today()
+    await matcher.finish(
+        MessageSegment.at(event.user_id)
+        + f"\n当前连续签到：{checkin.current_streak(bits, checkin.day_index(today))}天"
+        + f"\n最长连续签到：{checkin.longest_streak(bits)}天"
+        + f"\n累计签到：{bits.bit_count()}天"
+    )
+
+
+# endregion
+
+# region calendar
+
+calendar_parser = ArgumentParser(prog="CALENDAR | 签到日历")
+calendar_parser.add_argument("month", type=str, nargs="?", default="", help="要查看的月份（YYYY-MM），默认为本月")
+
+calendar_matcher = on_shell_command(
+    "calendar",
+    aliases={"签到日历"},
+    parser=calendar_parser,
+    rule=is_type(GroupMessageEvent),
+    priority=10,
+    block=True,
+)
+
+
+@calendar_matcher.handle()
+async def _(matcher: Matcher, args: ParserExit = ShellCommandArgs()):
+    await matcher.finish(args.message if args.status == 0 else "参数解析失败")
+
+
+@calendar_matcher.handle()
+async def _(
+    matcher: Matcher,
+    event: GroupMessageEvent,
+    session: async_scoped_session,
+    args: Namespace = ShellCommandArgs(),
+):
+    today = checkin.today()
+    if not args.month:
+        year, month = today.year, today.month
+    elif match := re.match(r"^(\d{4})-(\d{1,2})$", args.month):
+        year, month = map(int, match.groups())
+        if not 1 <= month <= 12:
+            await matcher.finish(MessageSegment.at(event.user_id) + " 请提供正确的月份（YYYY-MM）！")
+    else:
+        await matcher.finish(MessageSegment.at(event.user_id) + " 请提供正确的月份（YYYY-MM）！")
+
+    if not await utils.get_account(event.user_id, session):
+        await matcher.finish("尊敬的"+MessageSegment.at(event.user_id)+"，您尚未注册账户，请先注册！（使用命令【/(register|注册) [昵称]】注册，昵称为可选项，使用时需at本机器人）")
+
+    days = await checkin.month_days(session, event.user_id, year, month)
+    msg = f"\n📅{year}年{month}月签到日历（{days.bit_count()}天）\n{BAR_STRING}\n一 二 三 四 五 六 日"
+    for week in calendar.monthcalendar(year, month):
+        msg += "\n" + " ".join(
+            "  " if not day else "✅" if days >> (day - 1) & 1 else f"{day:2d}" for day in week
+        )
+    await matcher.finish(MessageSegment.at(event.user_id) + msg)
+
+
+# endregion
@@ -1,11 +1,19 @@
-import math
+import asyncio
 import nonebot
-import random
 import re
-import statistics
 from functools import reduce
-from typing import Literal
-from .. import config, utils
+from .. import coins, config, utils
+from ..executor import ExecutorBusy, executor
+from ..swindlestones.constants import (
+    HARD_MODE_DICE_FACE,
+    HARD_MODE_DICE_PRESET,
+    MAX_DICE_FACE,
+    MAX_PLAYER_DICE_COUNT,
+    MULTIPLIERS,
+)
+from ..swindlestones import policy, registry, replay, stats
+from ..swindlestones.game import GameState, check_guess_valid, coin_flip, decide, end_round, new_game, record_decision
+from ..types.journal import Reason
 from nonebot import on_shell_command, logger
 from nonebot.adapters.onebot.v11 import (
     Message,
@@ -17,17 +25,7 @@ from nonebot.exception import MatcherException, ParserExit
 from nonebot.matcher import Matcher
 from nonebot.params import ArgPlainText, ShellCommandArgs
 from nonebot.rule import ArgumentParser, Namespace, is_type, to_me
-from nonebot.typing import T_State
-from nonebot_plugin_orm import Model, async_scoped_session
-from sqlalchemy import select
-from sqlalchemy.orm import Mapped, mapped_column
-
-AI_VERSION = 3
-
-MAX_DICE_COUNT = 10
-MAX_PLAYER_DICE_COUNT = MAX_DICE_COUNT / 2
-HARD_MODE_DICE_PRESET = (3, 5)
-MULTIPLIERS = (1.6, 3.5)
+from nonebot_plugin_orm import async_scoped_session
 
 BAR_STRING = nonebot.get_driver().config.bar_string
 
@@ -51,8 +49,8 @@ RULE_TEXT = f"""\
 
 ARGS_HELP_TEXT = f"""\
 🔧【自定义】：SWINDLESTONES [赌注] [难度] [骰子预设]
-赌注：默认为0，最高为10。普通难度倍率为{MULTIPLIERS[0]}，奇进偶舍
-难度：默认0普通（困难模式暂未开放）
+赌注：默认为0，最高为10。普通难度倍率为{MULTIPLIERS[0]}{f"，困难难度倍率为{MULTIPLIERS[1]}" if policy.POLICY is not None else ""}，奇进偶舍
+难度：{f"默认0普通，1困难（您{HARD_MODE_DICE_PRESET[0]}枚、诺辛德{HARD_MODE_DICE_PRESET[1]}枚{HARD_MODE_DICE_FACE}面骰，诺辛德先手）" if policy.POLICY is not None else "默认0普通（困难模式暂未开放）"}
 骰子预设：NdF，代表开局双方各有N枚F面骰"""
 
 FULL_HELP_TEXT = (
@@ -66,277 +64,6 @@ FULL_HELP_TEXT = (
 INGAME_HELP_TEXT = RULE_TEXT + f"\n{BAR_STRING}\n局内命令：\n" + COMMAND_TIP
 
 
-class SwindlestonesStatistics(Model):
-    version: Mapped[int] = mapped_column(primary_key=True, default=AI_VERSION)
-    regular_game_count: Mapped[int] = mapped_column(default=0)
-    regular_bot_win_count: Mapped[int] = mapped_column(default=0)
-    hardmode_game_count: Mapped[int] = mapped_column(default=0)
-    hardmode_bot_win_count: Mapped[int] = mapped_column(default=0)
-
-
-def pmf_B(k: int, n: int, p: float) -> float:
-    """二项分布概率质量函数 `Pr(X = k; n, p)`"""
-    if k > n or p < 0 or p > 1:
-        raise ValueError
-    return math.comb(n, k) * p**k * (1 - p) ** (n - k)
-
-
-def cdf_B(k: int, n: int, p: float) -> float:
-    """二项分布累积分布函数 `Pr(X <= k; n, p)`"""
-    res = 0
-    for i in range(k + 1):
-        res += pmf_B(i, n, p)
-    return res
-
-
-def dice_probability(k: int, kmin: int, kmax: int, n: int, f: int) -> float:
-    """在`n`个`f`面骰中，已知指定面值的骰子数目在`kmin`与`kmax`之间，求所有骰子中有至少`k`个相应面值骰子的概率
-    
-    `Pr(X >= k | kmin ≤ X ≤ kmax) (kmin ≤ k ≤ kmax)`。
-
-    Args:
-        `k` (int): 目标值
-        `kmin` (int): 对应面值骰子数量的下限
-        `kmax` (int): 对应面值骰子数量的上限
-        `n` (int): 骰子总数
-        `f` (int): 骰子面数
-    """
-    if kmin > kmax:
-        raise ValueError
-    
-    if k <= kmin:
-        return 1
-    elif k > kmax:
-        return 0
-    else:
-        p = 1 / f
-        return ((1 - cdf_B(k - 1, n, p)) - (1 - cdf_B(kmax, n, p))) / (
-            1 - cdf_B(kmin - 1, n, p) - (1 - cdf_B(kmax, n, p))
-        )
-
-def p_no_more_than_k_same(k: int, n: int, d: int) -> float:
-    """有d种不同的项目共n个，其中同种项目的个数不足k的概率"""
-    if k == 1:
-        return math.factorial(d) / (math.factorial(d-n)*d**n)
-    
-    res = 0
-    for i in range(1, math.floor(n/k)+1):
-        a = math.factorial(n)*math.factorial(d) / (d**(i*k)*math.factorial(i)*math.factorial(k)**i*math.factorial(n-i*k)*math.factorial(d-i))
-        s = 0
-        for j in range(1, k):
-            s += p_no_more_than_k_same(j, n-i*k, d-i)*(d-i)**(n-i*k)/d**(n-i*k)
-        res += a*s
-    return res
-
-def p_at_least_k_same(k: int, n: int, d: int) -> float:
-    """有d种不同项目的物体共n个，其中同种项目的个数至少为k的概率"""
-    if k > n:
-        raise ValueError("k must lower or equal to n")
-    if k <= math.ceil(n/d):
-        return 1
-    else:
-        return sum([p_no_more_than_k_same(i, n, d) for i in range(k, n+1)])
-
-def check_guess_valid(guess: tuple[int, int, bool], last_guess: tuple[int, int, bool]):
-    valid = False
-    if guess[0] == last_guess[0] and guess[1] > last_guess[1]:
-        valid = True
-    elif guess[0] > last_guess[0]:
-        valid = True
-
-    return valid
-
-
-def ai_guess(state: T_State) -> tuple[int, int, Literal[False]] | None:
-    f: int = state["swindlestones"]["dice_face"]
-
-    player_dices: list[int] = state["swindlestones"]["player_dices"]
-    ai_dices: list[int] = state["swindlestones"]["ai_dices"]
-    dice_count = len(player_dices + ai_dices)
-
-    if not state["swindlestones"]["last_guess"]:  # 先手
-        STRATEGY_TABLE = [
-            [1],
-            [5, 5],
-            [1, 3, 6],
-            [1, 1, 2, 6],
-            [0, 1, 1, 2, 6],
-        ]
-
-        # 投机：增加猜测数目上限
-        opportunistic_limit = 0
-        for i in range(len(player_dices)-1, 0, -1):
-            if random.random() <= dice_probability(i, 0, len(player_dices), len(player_dices), f) / 3:
-                opportunistic_limit += i
-                break
-        if opportunistic_limit > 0:
-            logger.info(f"投机：猜测数目上限+{opportunistic_limit}")
-
-        selected_dice = random.choice(statistics.multimode(ai_dices))
-        selected_dice_count = ai_dices.count(selected_dice)
-        
-        missing_faces = [
-            x for x in range(1, f + 1) if x not in ai_dices
-        ]  # ai手上缺失的骰子
-        if len(missing_faces) > 0 and random.random() > 1 - p_at_least_k_same(selected_dice_count, len(ai_dices), f) / 2:
-            chosen_face = random.choice(missing_faces)
-            logger.info(
-                "欺诈性开局："
-                + ("随机" if len(missing_faces) > 1 else "")
-                + f"选择不存在的面值{chosen_face}"
-            )
-            return (min(random.sample([1, 2], k=1, counts=[3, 1])[0], len(ai_dices) + opportunistic_limit), chosen_face, False)
-
-        strategy = STRATEGY_TABLE[selected_dice_count - 1]
-
-        chosen_count, threshold = 0, 0
-        rand = random.randint(1, sum(strategy))
-        for _n in range(len(strategy)):
-            if rand > threshold and rand <= threshold + strategy[_n]:
-                chosen_count = _n + 1 + opportunistic_limit
-                logger.info(
-                    ("" if chosen_count <= selected_dice_count else "欺诈性")
-                    + f"开局：选择策略{chosen_count}x{selected_dice}"
-                )
-                break
-            else:
-                threshold += strategy[_n]
-
-        return (chosen_count, selected_dice, False)
-
-    else:  # 后手或玩家已猜测
-        player_c: int
-        player_n: int
-        player_c, player_n, _ = state["swindlestones"]["last_guess"]
-        ai_last_c: int
-        ai_last_n: int
-        ai_last_c, ai_last_n, _ = (
-            state["swindlestones"]["ai_last_guess"]
-            if state["swindlestones"]["ai_last_guess"]
-            else (0, 0, False)
-        )
-
-        if player_c > dice_count - len([x for x in ai_dices if x != player_n]):
-            logger.info("玩家猜测的骰子数目超过了场上可能存在的最大数目")
-            return None
-
-        if (cdiff := player_c - ai_dices.count(player_n)) > 0:
-            player_possible_dice_count = len(player_dices) - sum([v for k, v in state["swindlestones"]["ai_memory"].items() if k != player_n])
-            if (player_possible_dice_count < cdiff
-                or random.random() >= p_at_least_k_same(cdiff, player_possible_dice_count, f) / ((len(player_dices) / MAX_PLAYER_DICE_COUNT / 2 + 0.5) if ai_last_n != 0 else 1)
-                or (_r := random.random() <= 0.05 * cdiff)):
-                logger.info(f"{'随机' if '_r' in vars() else ''}怀疑玩家欺诈")
-                return None
-            
-        if max(state["swindlestones"]["ai_memory"].values()) > 0 or player_n == ai_last_n: # 玩家后手
-            guaranteed_player_dice_count = max(int((player_c - ai_last_c if player_n == ai_last_n else 0) * 2 / 3), 0)
-        else: # 玩家先手，或AI先手后玩家不跟面值
-            guaranteed_player_dice_count = max(int(player_c / 2), 1 if len(player_dices) <= 2 and random.random() >= 0.5 else 0) # 随机防止欺诈
-        
-        if state["swindlestones"]["ai_memory"][player_n] < guaranteed_player_dice_count:
-            state["swindlestones"]["ai_memory"][player_n] = guaranteed_player_dice_count
-            logger.info(f"记忆：玩家所持面值为 {player_n} 骰子的数目至少为{guaranteed_player_dice_count}")
-
-        logger.info("记忆：玩家的骰子组合：" + ", ".join([f"{k}: {v}" for k, v in state["swindlestones"]["ai_memory"].items()]))
-        
-        modified_memory = state["swindlestones"]["ai_memory"].copy()
-        for i in random.sample(range(1, f+1), f):
-            opportunistic_limit = 0
-            avaliable_dice_count = len(player_dices) - sum([v for v in modified_memory.values()])
-            for j in range(int(len(player_dices)/2), 0, -1):
-                if random.random() <= (_p := dice_probability(j, 0, avaliable_dice_count, len(player_dices), f) / 3):
-                    opportunistic_limit += j
-                    break
-            if opportunistic_limit > 0:
-                modified_memory[i] += opportunistic_limit
-                logger.info(f"投机：猜测玩家所持面值为 {i} 骰子的数目+{opportunistic_limit} ({_p})")
-        
-        best_probabilities: dict[int, tuple[int, float]] = {}  # { 面值: (个数, 概率) }
-        for _n in range(1, f + 1):  # 遍历所有面值
-            all_probabilities: list[tuple[int, float]] = []
-            count_max = (
-                dice_count
-                - len([x for x in ai_dices if x != _n])
-                - sum([v for k, v in modified_memory.items() if k != _n])
-            )
-            count_min = min(ai_dices.count(_n) + modified_memory[_n], count_max)
-
-            for _c in range(count_min, count_max + 1):  # 遍历可能的所有骰子数目
-                if (
-                    _c == player_c
-                    and _n == player_n
-                    and dice_probability(_c, count_min, count_max, dice_count, f) < 0.2
-                ):
-                    logger.info("玩家当前猜测的骰子组合可能性过小")
-                    return None
-                if check_guess_valid(
-                    (_c, _n, False), state["swindlestones"]["last_guess"]
-                ):  # 按规则筛选猜测
-                    all_probabilities.append(
-                        (_c, dice_probability(_c, count_min, count_max, dice_count, f))
-                    )
-            all_probabilities.sort(key=lambda x: x[0], reverse=True)  # 按骰子数目排序
-            if len(all_probabilities) > 0:
-                best_probabilities[_n] = max(
-                    all_probabilities, key=lambda x: x[1]
-                )  # 确保找到最大概率中骰子数量最大的
-
-        if len(best_probabilities) == 0:
-            logger.info("不存在合法的猜测")
-            return None
-
-        best_probability = max(best_probabilities.values(), key=lambda x: x[1])[1]
-        if best_probability < 0.2 and random.random() <= 0.5 * best_probability * 5:
-            logger.info("所有合法猜测的可能性均过小")
-            return None
-
-        best_probabilities = {
-            k: v for (k, v) in best_probabilities.items() if v[1] == best_probability and k > 0
-        }
-        if len(best_probabilities) == 0:
-            logger.info("最佳猜测中所有可用的骰子面值对应的数目均为0")
-            return None
-        
-        
-        res = min(best_probabilities.keys())
-        logger.info(
-            f"面值最小的最佳猜测：{best_probabilities[res][0]}x{res} @ {best_probabilities[res][1]}"
-        )
-        return (best_probabilities[res][0], res, False)
-
-
-def end_round(state: T_State):
-    f: int = state["swindlestones"]["dice_face"]
-
-    _c: int
-    _n: int
-    is_player: bool
-    _c, _n, is_player = state["swindlestones"]["last_guess"]
-
-    player_dices: list[int]
-    ai_dices: list[int]
-    player_dices, ai_dices = (
-        state["swindlestones"]["player_dices"],
-        state["swindlestones"]["ai_dices"],
-    )
-    all_dices: list[int] = player_dices + ai_dices
-
-    player_win = (is_player and all_dices.count(_n) >= _c) or (
-        not is_player and all_dices.count(_n) < _c
-    )
-    if player_win:
-        ai_dices.pop()
-    else:
-        player_dices.pop()
-
-    player_dices = sorted([random.randint(1, f) for i in range(len(player_dices))])
-    ai_dices = sorted([random.randint(1, f) for i in range(len(ai_dices))])
-    state["swindlestones"]["player_dices"] = player_dices
-    state["swindlestones"]["ai_dices"] = ai_dices
-
-    return player_win
-
-
 def get_dice_emoji_list(dices: list[int]):
     return "".join(
         [
@@ -355,9 +82,9 @@ parser.add_argument(
     "hardmode",
     type=int,
     nargs="?",
-    choices=(0,),
+    choices=(0, 1) if policy.POLICY is not None else (0,),
     default=0,
-    help="难度设置，0为一般（默认）（困难模式暂未开放）",
+    help="难度设置，0为一般（默认），1为困难" if policy.POLICY is not None else "难度设置，0为一般（默认）（困难模式暂未开放）",
 )
 parser.add_argument(
     "dice_notation",
@@ -393,22 +120,9 @@ async def _(
 async def _(
     matcher: Matcher,
     event: GroupMessageEvent | PrivateMessageEvent,
-    state: T_State,
     session: async_scoped_session,
     args: Namespace = ShellCommandArgs(),
 ):
-    if not await session.scalar(
-        select(SwindlestonesStatistics).where(
-            SwindlestonesStatistics.version == AI_VERSION
-        )
-    ):
-        session.add(SwindlestonesStatistics())
-        try:
-            await session.commit()
-        except Exception as e:
-            logger.opt(exception=e).error(type(e).__name__)
-            await matcher.finish("统计表创建失败")
-
     account, nickname = await utils.find_account(
         event.user_id,
         event.group_id if type(event) is GroupMessageEvent else None,
@@ -440,7 +154,7 @@ async def _(
         )
 
     if args.hardmode:
-        f = 4
+        f = HARD_MODE_DICE_FACE
     elif not re.match(r"^\d+[dD]\d+$", args.dice_notation):
         await matcher.finish(
             MessageSegment.reply(event.message_id) + MessageSegment.at(event.user_id) + " 请提供正确的骰子配置！"
@@ -451,34 +165,34 @@ async def _(
             await matcher.finish(
                 MessageSegment.at(event.user_id) + " 请提供正确的骰子配置！"
             )
-        elif n > 5 or f > 8:
+        elif n > MAX_PLAYER_DICE_COUNT or f > MAX_DICE_FACE:
             await matcher.finish(
                 MessageSegment.at(event.user_id) + " 骰子数目或面数过多！"
             )
 
     if args.bet > 0:
         try:
-            account.coin -= args.bet
-            await session.flush([account])
-            await session.commit()
+            coin = await coins.add_coin(session, event.user_id, -args.bet, Reason.BET, min_coin=args.bet)
         except Exception as e:
             logger.opt(exception=e).error(type(e).__name__)
             await matcher.finish("数据操作失败")
+        if coin is None:
+            await matcher.finish(
+                MessageSegment.at(event.user_id)
+                + " 诺辛德看着你，面露难色：“您好像没有那么多钱……”"
+            )
 
     # init
-    state["swindlestones"] = {
-        "account": account,
-        "nickname": nickname,
-        "hardmode": args.hardmode,
-        "bet": args.bet,
-        "dice_face": f,
-        "player_dices": sorted([random.randint(1, f) for i in range(n if not args.hardmode else HARD_MODE_DICE_PRESET[0])]),
-        "ai_dices": sorted([random.randint(1, f) for i in range(n if not args.hardmode else HARD_MODE_DICE_PRESET[1])]),
-        "last_guess": None,
-        "ai_last_guess": None,
-        "ai_memory": {i: 0 for i in range(1, f+1)},
-        "ai_turn": False,
-    }
+    game = new_game(
+        f,
+        n if not args.hardmode else HARD_MODE_DICE_PRESET[0],
+        n if not args.hardmode else HARD_MODE_DICE_PRESET[1],
+        hardmode=bool(args.hardmode),
+    )
+    game.user_id = event.user_id
+    game.group_id = event.group_id if type(event) is GroupMessageEvent else 0
+    game.bet = args.bet
+    registry.add(game)
 
     msg = "⚠您选择了困难模式⚠\n" if args.hardmode else ""
     msg += (
@@ -495,24 +209,24 @@ async def _(
     ][args.hardmode * 2 + int(bool(args.bet))]
 
     msg += f"\n{BAR_STRING}"
-    msg += f"\n🎲您手上的骰子为：{get_dice_emoji_list(state['swindlestones']['player_dices'])}"
-    msg += f"\n诺辛德手上现在有【{len(state['swindlestones']['ai_dices'])}枚】骰子。"
+    msg += f"\n🎲您手上的骰子为：{get_dice_emoji_list(game.player_dices)}"
+    msg += f"\n诺辛德手上现在有【{len(game.ai_dices)}枚】骰子。"
     msg += f"\n{BAR_STRING}"
     
     if not args.hardmode:
         msg += "\n诺辛德投了一枚硬币，"
-        if random.random() <= 0.5:
+        if coin_flip(game):
             msg += "反面朝上，他先手。"
-            state["swindlestones"]["ai_turn"] = True
+            game.ai_turn = True
             matcher.set_arg("cmd", Message())
         else:
-            state["swindlestones"]["ai_turn"] = False
+            game.ai_turn = False
             msg += "正面朝上，您先手。"
             msg += "\n" + COMMAND_TIP
     else:
         msg += "\n他说：“既然选择困难，就要贯彻到底……”"
         msg += "【困难模式下固定诺辛德先手。】"
-        state["swindlestones"]["ai_turn"] = True
+        game.ai_turn = True
         matcher.set_arg("cmd", Message())
 
     await matcher.send(MessageSegment.reply(event.message_id) + MessageSegment.at(event.user_id) + "\n" + msg)
@@ -522,14 +236,13 @@ async def _(
 async def _(
     matcher: Matcher,
     event: GroupMessageEvent | PrivateMessageEvent,
-    state: T_State,
     session: async_scoped_session,
     cmd: str = ArgPlainText(),
 ):
     async def call(
         matcher: Matcher,
         event: GroupMessageEvent | PrivateMessageEvent,
-        state: T_State,
+        game: GameState,
         session: async_scoped_session,
         call_from_player: bool,
     ):
@@ -537,82 +250,65 @@ async def _(
         msg = "🔨"
         msg += f"{'你' if call_from_player else '诺辛德'}选择揭穿！双方都展示了自己的骰子……"
         msg += f"\n{BAR_STRING}"
-        msg += f"\n您手上的骰子为：{' '.join([str(x) for x in state['swindlestones']['player_dices']])}"
-        msg += f"\n诺辛德手上的骰子为：{' '.join([str(x) for x in state['swindlestones']['ai_dices']])}"
+        msg += f"\n您手上的骰子为：{' '.join([str(x) for x in game.player_dices])}"
+        msg += f"\n诺辛德手上的骰子为：{' '.join([str(x) for x in game.ai_dices])}"
 
         _c: int
         _n: int
         is_player: bool
-        _c, _n, is_player = state["swindlestones"]["last_guess"]
+        _c, _n, is_player = game.last_guess
         msg += f"\n最后一次猜测是场上至少有【{_c}枚】面值为【{_n}】的骰子，由【{'您' if is_player else '诺辛德'}】提出。"
         msg += f"\n{BAR_STRING}\n"
 
-        player_win = end_round(state)
+        player_win = end_round(game)
+        replay.record_call(game, call_from_player, player_win)
         if player_win:
             msg += "🥳"
             msg += f"{'您猜中了' if is_player else '诺辛德猜错了'}！"
-            if len(state["swindlestones"]["ai_dices"]) > 0:
+            if len(game.ai_dices) > 0:
                 msg += "他下一轮需要少抓一枚骰子，且下一轮您先手。\n"
-                state["swindlestones"]["ai_turn"] = False
+                game.ai_turn = False
             else:
                 msg += "他已无骰可用，您赢得了本局游戏的胜利！🥳"
                 game_end = True
         else:
             msg += "😢"
             msg += f"{'您猜错了' if is_player else '诺辛德猜中了'}！"
-            if len(state["swindlestones"]["player_dices"]) > 0:
+            if len(game.player_dices) > 0:
                 msg += "您下一轮需要少抓一枚骰子，且下一轮他先手。\n"
-                state["swindlestones"]["ai_turn"] = True
+                game.ai_turn = True
             else:
                 msg += "您已无骰可用，输掉了本局游戏"
                 msg += (
                     "！"
-                    if state["swindlestones"]["bet"] == 0
-                    else f"以及赌注{state['swindlestones']['bet']}枚{config.coin_notation}！"
+                    if game.bet == 0
+                    else f"以及赌注{game.bet}枚{config.coin_notation}！"
                 )
                 msg += "😭"
                 game_end = True
-        state["swindlestones"]["last_guess"] = None
-        state["swindlestones"]["ai_last_guess"] = None
-        state["swindlestones"]["ai_memory"] = {i: 0 for i in range(1, state["swindlestones"]["dice_face"]+1)}
 
         if not game_end:
-            msg += f"\n🎲您现在手上的骰子为：{get_dice_emoji_list(state['swindlestones']['player_dices'])}"
-            msg += f"\n诺辛德手上现在有【{len(state['swindlestones']['ai_dices'])}枚】骰子。"
-            if not state["swindlestones"]["ai_turn"]:
+            msg += f"\n🎲您现在手上的骰子为：{get_dice_emoji_list(game.player_dices)}"
+            msg += f"\n诺辛德手上现在有【{len(game.ai_dices)}枚】骰子。"
+            if not game.ai_turn:
                 await matcher.reject(MessageSegment.reply(event.message_id) + MessageSegment.at(event.user_id) + "\n" + msg)
             else:
                 await matcher.send(MessageSegment.reply(event.message_id) + MessageSegment.at(event.user_id) + "\n" + msg)
         else:
-            stat = await session.scalar(
-                select(SwindlestonesStatistics).where(
-                    SwindlestonesStatistics.version == AI_VERSION
-                )
-            )
-            assert stat
-            if state["swindlestones"]["hardmode"]:
-                stat.hardmode_game_count += 1
-            else:
-                stat.regular_game_count += 1
+            registry.remove(game)
+            replay.save_record(game, replay.REPLAY_FILE)
+            stats.record_game(game.hardmode, not player_win)
             if player_win:
-                account, _ = await utils.find_account(
-                    event.user_id,
-                    event.group_id if type(event) is GroupMessageEvent else None,
-                    session,
-                )
-                assert account
                 coin_get = max(
                     round(
-                        state["swindlestones"]["bet"] * (MULTIPLIERS[state["swindlestones"]["hardmode"]])
+                        game.bet * (MULTIPLIERS[game.hardmode])
                     ),
                     1,
                 )
-                _reward_exp = f"({state['swindlestones']['bet']}*倍率{MULTIPLIERS[state['swindlestones']['hardmode']]})" if state['swindlestones']['bet'] else ""
+                _reward_exp = f"({game.bet}*倍率{MULTIPLIERS[game.hardmode]})" if game.bet else ""
                 msg += f"\n您获得了{coin_get}枚{config.coin_notation}{_reward_exp}"
-                account.coin += coin_get
                 try:
-                    await session.flush([account, stat])
-                    await session.commit()
+                    await coins.add_coin(session, event.user_id, coin_get, Reason.PAYOUT)
                     await matcher.finish(MessageSegment.reply(event.message_id) + MessageSegment.at(event.user_id) + "\n" + msg)
                 except MatcherException:
                     raise
@@ -620,25 +316,21 @@ async def _(
                     logger.opt(exception=e).error(type(e).__name__)
                     await matcher.finish("数据操作失败")
             else:
-                if state["swindlestones"]["hardmode"]:
-                    stat.hardmode_bot_win_count += 1
-                else:
-                    stat.regular_bot_win_count += 1
-                try:
-                    await session.flush([stat])
-                    await session.commit()
-                    await matcher.finish(MessageSegment.reply(event.message_id) + MessageSegment.at(event.user_id) + "\n" + msg)
-                except MatcherException:
-                    raise
-                except Exception as e:
-                    logger.opt(exception=e).error(type(e).__name__)
-                    await matcher.finish("统计数据写入失败")
+                await matcher.finish(MessageSegment.reply(event.message_id) + MessageSegment.at(event.user_id) + "\n" + msg)
+
+    game = registry.get(event.user_id, event.group_id if type(event) is GroupMessageEvent else None)
+    if not game:
+        await matcher.finish(
+            MessageSegment.reply(event.message_id) + MessageSegment.at(event.user_id)
+            + " ⌛对局因长时间无操作已结束，视为认输。"
+        )
 
-    cmd = cmd.lower().strip().replace("\n", "")
+    # 上一次轮到AI时工作池繁忙，忽略本条消息直接继续AI的回合
+    cmd = cmd.lower().strip().replace("\n", "") if not game.ai_turn else ""
 
     if (
         not re.match(r"^(\d+[x\x20]\d+|call|check|help|quit)$", cmd)
-        and not state["swindlestones"]["ai_turn"]
+        and not game.ai_turn
     ):
         await matcher.reject(
             MessageSegment.reply(event.message_id) + MessageSegment.at(event.user_id)
@@ -646,56 +338,58 @@ async def _(
         )
 
     if cmd == "quit":
+        registry.remove(game)
+        replay.record_quit(game)
+        replay.save_record(game, replay.REPLAY_FILE)
         await matcher.finish(
             MessageSegment.reply(event.message_id) + MessageSegment.at(event.user_id)
             + " 🏳您已认输"
-            + ("。" if state["swindlestones"]["bet"] == 0 else "，并输掉了所有赌注。")
+            + ("。" if game.bet == 0 else "，并输掉了所有赌注。")
         )
     elif cmd == "help":
         await matcher.reject(MessageSegment.reply(event.message_id) + MessageSegment.at(event.user_id) + "\n" + INGAME_HELP_TEXT)
     elif cmd == "call":
-        if not state["swindlestones"]["last_guess"]:
+        if not game.last_guess:
             await matcher.reject(
                 MessageSegment.reply(event.message_id) + MessageSegment.at(event.user_id)
                 + " 您必须先进行一次猜测，请重新输入指令！（输入help查看帮助）"
             )
-        await call(matcher, event, state, session, True)
+        await call(matcher, event, game, session, True)
     elif cmd == "check":
-        msg = f"\n🔍您现在手上的骰子为：{get_dice_emoji_list(state['swindlestones']['player_dices'])}"
+        msg = f"\n🔍您现在手上的骰子为：{get_dice_emoji_list(game.player_dices)}"
         msg += (
-            f"\n诺辛德手上现在有【{len(state['swindlestones']['ai_dices'])}枚】骰子。"
+            f"\n诺辛德手上现在有【{len(game.ai_dices)}枚】骰子。"
         )
-        if not state["swindlestones"]["last_guess"]:
+        if not game.last_guess:
             msg += "\n还没有人做出过猜测。"
         else:
             _c: int
             _n: int
             is_player: bool
-            _c, _n, is_player = state["swindlestones"]["last_guess"]
+            _c, _n, is_player = game.last_guess
             msg += f"\n最后一次猜测是场上至少有【{_c}枚】面值为【{_n}】的骰子，由【{'您' if is_player else '诺辛德'}】提出。"
         await matcher.reject(MessageSegment.reply(event.message_id) + MessageSegment.at(event.user_id) + msg)
     elif cmd:
-        dice_count = len(
-            state["swindlestones"]["player_dices"] + state["swindlestones"]["ai_dices"]
-        )
+        dice_count = len(game.player_dices) + len(game.ai_dices)
         c, n = map(int, re.split(r"x|\x20", cmd)[:2])
-        if (c <= dice_count and n <= state["swindlestones"]["dice_face"]) and (
-            not state["swindlestones"]["last_guess"]
-            or check_guess_valid((c, n, True), state["swindlestones"]["last_guess"])
+        if (c <= dice_count and n <= game.dice_face) and (
+            not game.last_guess
+            or check_guess_valid((c, n, True), game.last_guess)
         ):
             await matcher.send(
                 MessageSegment.reply(event.message_id) + MessageSegment.at(event.user_id)
                 + f"\n🤔您猜场上现在至少有【{c}枚】面值为【{n}】的骰子。"
             )
-            state["swindlestones"]["last_guess"] = (c, n, True)
-            state["swindlestones"]["ai_turn"] = True
+            game.last_guess = (c, n, True)
+            replay.record_guess(game, (c, n, True))
+            game.ai_turn = True
         else:
             if c > dice_count:
                 await matcher.reject(
                     MessageSegment.reply(event.message_id) + MessageSegment.at(event.user_id)
                     + " 指定的骰子个数大于场上骰子总个数，请重新输入指令！（输入help查看帮助）"
                 )
-            elif n > state["swindlestones"]["dice_face"]:
+            elif n > game.dice_face:
                 await matcher.reject(
                     MessageSegment.reply(event.message_id) + MessageSegment.at(event.user_id)
                     + " 指定的骰子面值大于骰子面数，请重新输入指令！（输入help查看帮助）"
@@ -706,16 +400,45 @@ async def _(
                     + " 骰子个数须大于等于上次的猜测，且若骰子个数相等则面值必须大于上次猜测，请重新输入指令！（输入help查看帮助）"
                 )
 
-    while state["swindlestones"]["ai_turn"]:
-        state["swindlestones"]["ai_turn"] = False
-        _ai_guess = ai_guess(state)
+    while game.ai_turn:
+        # 工作线程只修改对局的副本：超时作废并退还赌注后，仍在运行的决策不会再改动对局
+        snapshot = game.snapshot()
+        try:
+            decision = await executor.run(decide, snapshot)
+        except ExecutorBusy:
+            await matcher.reject(
+                MessageSegment.reply(event.message_id) + MessageSegment.at(event.user_id)
+                + " 诺辛德正忙着应付其他对局，请稍后发送任意消息让他继续。"
+            )
+        except asyncio.TimeoutError:
+            registry.remove(game)
+            msg = " ⌛诺辛德想得太久，本局作废"
+            if game.bet > 0:
+                try:
+                    await coins.add_coin(session, event.user_id, game.bet, Reason.REFUND)
+                    msg += f"，赌注{game.bet}枚{config.coin_notation}已退还"
+                except Exception as e:
+                    logger.opt(exception=e).error(type(e).__name__)
+                    await matcher.finish("数据操作失败")
+            await matcher.finish(
+                MessageSegment.reply(event.message_id) + MessageSegment.at(event.user_id) + msg + "。"
+            )
+        if registry.get(game.user_id, game.group_id) is not game:
+            # 等待决策期间对局已被清理或替换
+            await matcher.finish()
+        game.apply(snapshot)
+        record_decision(game, decision)
+        _ai_guess = decision.guess
+        game.ai_turn = False
+        if _ai_guess:
+            replay.record_guess(game, _ai_guess)
 
         if _ai_guess:
-            state["swindlestones"]["last_guess"] = _ai_guess
-            state["swindlestones"]["ai_last_guess"] = _ai_guess
+            game.last_guess = _ai_guess
+            game.ai_last_guess = _ai_guess
             await matcher.reject(
                 MessageSegment.reply(event.message_id) + MessageSegment.at(event.user_id)
                 + f"\n🤔诺辛德猜场上现在至少有【{_ai_guess[0]}枚】面值为【{_ai_guess[1]}】的骰子。现在轮到您了。"
             )
         else:
-            await call(matcher, event, state, session, False)
+            await call(matcher, event, game, session, False)
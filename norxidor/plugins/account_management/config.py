@@ -3,4 +3,34 @@ from pydantic import BaseModel
 
 class Config(BaseModel):
     """Plugin Config Here"""
-    coin_notation: str = "🐰🪙"
\ No newline at end of file
+    coin_notation: str = "🐰🪙"
+    leaderboard_size: int = 10
+    """排行榜显示的名次数"""
+    coin_journal_flush_interval: float = 10
+    """余额流水写入数据库的间隔（秒）"""
+    coin_journal_batch_size: int = 500
+    """缓冲的余额流水达到该条数时立即写入"""
+    account_cache_size: int = 1024
+    """账户与昵称缓存各自的最大条目数"""
+    account_cache_ttl: float = 300
+    """账户与昵称缓存的过期时间（秒）"""
+    purge_chunk_size: int = 500
+    """后台删除任务每次删除的行数"""
+    purge_interval: float = 0.05
+    """后台删除任务每删除一块后暂停的时间（秒）"""
+    purge_retry_max_delay: float = 300
+    """后台删除任务出错后重试的最长间隔（秒），间隔从1秒起每次加倍"""
+    sqlite_profile: bool = True
+    """创建SQLite连接时应用存储配置（WAL等，见`storage.py`）"""
+    sqlite_pragmas: dict[str, str | int] = {}
+    """覆盖存储配置中的单项PRAGMA，如`{"mmap_size": 0}`"""
+    executor_max_workers: int = 2
+    """CPU密集任务工作池的线程数"""
+    executor_queue_size: int = 32
+    """工作池等待队列的长度，队列已满时新任务将被拒绝"""
+    executor_timeout: float = 5
+    """工作池中单个任务的默认超时（秒）"""
+    swindlestones_statistics_flush_interval: float = 60
+    """Swindlestones统计数据写入数据库的间隔（秒）"""
+    swindlestones_idle_timeout: float = 600
+    """Swindlestones对局无操作多久（秒）后视为认输并被清理"""
@@ -0,0 +1,84 @@
+import asyncio
+import nonebot
+import threading
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, TypeVar
+from . import config
+
+T = TypeVar("T")
+
+driver = nonebot.get_driver()
+
+
+class ExecutorBusy(Exception):
+    """工作池的等待队列已满，任务未被提交"""
+
+
+class BoundedExecutor:
+    """有界的工作池，供各插件执行CPU密集的任务而不阻塞事件循环
+
+    正在执行与排队的任务总数不超过`max_workers + queue_size`，超出时立即抛出`ExecutorBusy`；
+    等待超过`timeout`秒时抛出`asyncio.TimeoutError`，调用方被取消时尚未开始的任务一并取消。
+    已开始执行的任务无法中断，在其结束前仍占用名额。
+
+    Args:
+        `max_workers` (int): 工作线程（进程）数
+        `queue_size` (int): 等待队列的长度
+        `timeout` (float | None): 默认的单任务超时（秒），`None`为不限
+        `process` (bool): 是否使用进程池，此时任务及其参数与返回值须可被pickle
+    """
+
+    def __init__(self, max_workers: int, queue_size: int, timeout: float | None = None, process: bool = False):
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._pool: Executor = (ProcessPoolExecutor if process else ThreadPoolExecutor)(max_workers)
+        self._lock = threading.Lock()
+        self.pending = 0
+        """正在执行与排队的任务数"""
+        self.completed = 0
+        """已结束（含被取消）的任务数"""
+        self.rejected = 0
+        """因队列已满被拒绝的任务数"""
+        self.timed_out = 0
+        """等待超时的任务数"""
+
+    def _done(self, _: Future):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    async def run(self, fn: Callable[..., T], *args: Any, timeout: float | None = None) -> T:
+        """在工作池中执行`fn(*args)`并等待结果
+
+        Raises:
+            ExecutorBusy: 等待队列已满
+            asyncio.TimeoutError: 超过`timeout`（未指定时为默认超时）仍未完成
+        """
+        with self._lock:
+            if self.pending >= self.max_workers + self.queue_size:
+                self.rejected += 1
+                raise ExecutorBusy
+            self.pending += 1
+        future = self._pool.submit(fn, *args)
+        future.add_done_callback(self._done)
+
+        try:
+            # 超时或被取消时wrap_future会一并取消尚未开始的任务
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+executor = BoundedExecutor(config.executor_max_workers, config.executor_queue_size, config.executor_timeout)
+"""插件共用的线程池"""
+
+
+@driver.on_shutdown
+async def _():
+    executor.shutdown()
@@ -0,0 +1,66 @@
+import asyncio
+import nonebot
+import time
+from . import config
+from .types.journal import CoinJournal, Reason
+from nonebot import logger
+from nonebot_plugin_orm import get_session
+from sqlalchemy import insert
+
+driver = nonebot.get_driver()
+
+pending: list[dict] = []
+"""尚未写入数据库的流水"""
+
+_flush_task: asyncio.Task | None = None
+
+_batch_tasks: set[asyncio.Task] = set()
+"""缓冲达到批量大小时启动的写入任务，保留引用以免任务未完成即被回收"""
+
+
+def record(user_id: int, delta: int, reason: Reason):
+    """在内存中记录一条流水（须在余额变动提交成功之后），由后台任务批量写入"""
+    pending.append(dict(user_id=user_id, delta=delta, reason=reason, time=time.time()))
+    if len(pending) >= config.coin_journal_batch_size:
+        task = asyncio.get_running_loop().create_task(flush())
+        _batch_tasks.add(task)
+        task.add_done_callback(_batch_tasks.discard)
+
+
+async def flush():
+    """将缓冲的流水以一次`executemany`插入"""
+    if not pending:
+        return
+
+    rows = pending.copy()
+    pending.clear()
+    try:
+        async with get_session() as session:
+            await session.execute(insert(CoinJournal), rows)
+            await session.commit()
+    except Exception as e:
+        pending[:0] = rows
+        logger.opt(exception=e).error(type(e).__name__)
+
+
+async def _flush_periodically(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        await flush()
+
+
+@driver.on_startup
+async def _():
+    global _flush_task
+    _flush_task = asyncio.create_task(
+        _flush_periodically(config.coin_journal_flush_interval)
+    )
+
+
+@driver.on_shutdown
+async def _():
+    if _flush_task:
+        _flush_task.cancel()
+    if _batch_tasks:
+        await asyncio.gather(*_batch_tasks, return_exceptions=True)
+    await flush()
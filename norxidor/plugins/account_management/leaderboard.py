@@ -0,0 +1,139 @@
+from . import config
+from .types.account import Account, Nickname
+from nonebot_plugin_orm import async_scoped_session
+from sqlalchemy import select
+
+# 兔币排行榜的内存缓存
+#
+# 每个榜单保存余额最高的至多`capacity`个账户以及其余账户余额的上界`bound`，
+# 余额变动时增量更新；只有当缓存中的前N名无法确定（前N名的余额低于`bound`）时才重新查询数据库。
+# 群榜单的成员为在该群拥有昵称的账户。
+
+
+class Leaderboard:
+    __slots__ = ("capacity", "entries", "bound")
+
+    def __init__(self, capacity: int, rows: list[tuple[int, int]]):
+        """`rows`为按余额降序查询的至多`capacity + 1`行`(id, coin)`"""
+        self.capacity = capacity
+        self.entries: dict[int, int] = dict(rows[:capacity])
+        """`{ 账户id: 余额 }`"""
+        self.bound: float = rows[capacity][1] if len(rows) > capacity else float("-inf")
+        """不在缓存中的账户余额的上界，缓存包含全部账户时为`-inf`"""
+
+    def update(self, id: int, coin: int):
+        if id in self.entries:
+            self.entries[id] = coin
+        elif coin > self.bound:
+            self.entries[id] = coin
+            if len(self.entries) > self.capacity:
+                evicted = min(self.entries, key=lambda x: (self.entries[x], -x))
+                self.bound = max(self.bound, self.entries.pop(evicted))
+
+    def remove(self, id: int):
+        self.entries.pop(id, None)
+
+    def top(self, n: int) -> list[tuple[int, int]] | None:
+        """前`n`名`[(id, coin)]`，无法仅凭缓存确定时返回`None`"""
+        res = sorted(self.entries.items(), key=lambda x: (-x[1], x[0]))[:n]
+        if self.bound != float("-inf") and (len(res) < n or res[-1][1] < self.bound):
+            return None
+        return res
+
+
+class GroupLeaderboard(Leaderboard):
+    __slots__ = ("members",)
+
+    def __init__(self, capacity: int, rows: list[tuple[int, int]], members: dict[int, str]):
+        super().__init__(capacity, rows)
+        self.members = members
+        """`{ 账户id: 本群昵称 }`"""
+
+
+global_board: Leaderboard | None = None
+group_boards: dict[int, GroupLeaderboard] = {}
+
+
+def _capacity() -> int:
+    return config.leaderboard_size * 2
+
+
+async def _load_global(session: async_scoped_session) -> Leaderboard:
+    rows = await session.execute(
+        select(Account.id, Account.coin)
+        .order_by(Account.coin.desc(), Account.id)
+        .limit(_capacity() + 1)
+    )
+    return Leaderboard(_capacity(), [tuple(x) for x in rows])
+
+
+async def _load_group(group_id: int, session: async_scoped_session) -> GroupLeaderboard:
+    members = await session.execute(
+        select(Nickname.user_id, Nickname.nickname).where(Nickname.group_id == group_id)
+    )
+    rows = await session.execute(
+        select(Account.id, Account.coin)
+        .join(Nickname, Nickname.user_id == Account.id)
+        .where(Nickname.group_id == group_id)
+        .order_by(Account.coin.desc(), Account.id)
+        .limit(_capacity() + 1)
+    )
+    return GroupLeaderboard(_capacity(), [tuple(x) for x in rows], dict(tuple(x) for x in members))
+
+
+async def top(
+    group_id: int | None, session: async_scoped_session, n: int | None = None
+) -> list[tuple[int, int]]:
+    """群（`group_id`为`None`时为全服）余额前`n`名的`[(id, coin)]`，默认为`config.leaderboard_size`名"""
+    global global_board
+    n = n or config.leaderboard_size
+
+    board = global_board if group_id is None else group_boards.get(group_id)
+    if board and (res := board.top(n)) is not None:
+        return res
+
+    if group_id is None:
+        board = global_board = await _load_global(session)
+    else:
+        board = group_boards[group_id] = await _load_group(group_id, session)
+    return board.top(n) or []
+
+
+def nickname_of(id: int, group_id: int | None) -> str | None:
+    """已缓存的群昵称"""
+    board = group_boards.get(group_id) if group_id else None
+    return board.members.get(id) if board else None
+
+
+def update_coin(id: int, coin: int):
+    """账户余额变动后调用（须在提交成功之后）"""
+    if global_board:
+        global_board.update(id, coin)
+    for board in group_boards.values():
+        if id in board.members:
+            board.update(id, coin)
+
+
+def update_nickname(group_id: int, id: int, nickname: str, coin: int):
+    """账户在群中获得或修改昵称后调用"""
+    if board := group_boards.get(group_id):
+        board.members[id] = nickname
+        board.update(id, coin)
+
+
+def remove_account(id: int):
+    if global_board:
+        global_board.remove(id)
+    for board in group_boards.values():
+        board.members.pop(id, None)
+        board.remove(id)
+
+
+def invalidate(group_id: int | None = None):
+    """丢弃群（`group_id`为`None`时为全部）榜单的缓存，下次查询时重新载入"""
+    global global_board
+    if group_id is None:
+        global_board = None
+        group_boards.clear()
+    else:
+        group_boards.pop(group_id, None)
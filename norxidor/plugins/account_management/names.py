@@ -0,0 +1,145 @@
+import difflib
+from .types.account import Nickname
+from bisect import bisect_left, insort
+from collections import Counter
+from collections.abc import Hashable
+from nonebot_plugin_orm import async_scoped_session
+from sqlalchemy import select
+from sqlalchemy.orm import InstrumentedAttribute
+
+# 按群的内存名称索引
+#
+# 每个群的名称保存为按`casefold()`排序的数组，首次访问某群时以一次查询载入，此后由写入名称的命令同步更新，
+# 精确查询与唯一性检查为一次字典查找，前缀匹配为一次二分查找加顺序扫描；模糊匹配先以二元组倒排索引选出
+# 共有字符二元组最多的候选名称，再由`difflib`在候选中比较，不必与群内每个名称逐一比较。
+# 名称在群内可以重复（如昵称），每个名称对应一组key（如账户id）。
+
+
+FUZZY_CANDIDATES = 50
+"""模糊匹配时交由`difflib`比较的候选名称数"""
+
+
+def _grams(name: str) -> set[str]:
+    name = name.casefold()
+    return {name[i : i + 2] for i in range(len(name) - 1)} or {name}
+
+
+class _Group:
+    __slots__ = ("entries", "names", "keys", "grams")
+
+    def __init__(self, rows: list[tuple[Hashable, str]]):
+        self.entries: list[tuple[str, str, Hashable]] = sorted((name.casefold(), name, key) for key, name in rows)
+        """`[(折叠大小写的名称, 名称, key)]`"""
+        self.names: dict[str, set[Hashable]] = {}
+        """`{ 名称: { key } }`"""
+        self.keys: dict[Hashable, str] = {}
+        """`{ key: 名称 }`"""
+        self.grams: dict[str, set[str]] = {}
+        """`{ 字符二元组: { 名称 } }`"""
+        for key, name in rows:
+            self._add(key, name)
+
+    def _add(self, key: Hashable, name: str):
+        if name not in self.names:
+            self.names[name] = set()
+            for gram in _grams(name):
+                self.grams.setdefault(gram, set()).add(name)
+        self.names[name].add(key)
+        self.keys[key] = name
+
+    def set(self, key: Hashable, name: str):
+        self.remove(key)
+        insort(self.entries, (name.casefold(), name, key))
+        self._add(key, name)
+
+    def remove(self, key: Hashable):
+        if (name := self.keys.pop(key, None)) is None:
+            return
+        self.entries.pop(bisect_left(self.entries, (name.casefold(), name, key)))
+        self.names[name].discard(key)
+        if not self.names[name]:
+            del self.names[name]
+            for gram in _grams(name):
+                self.grams[gram].discard(name)
+                if not self.grams[gram]:
+                    del self.grams[gram]
+
+    def prefixed(self, prefix: str) -> list[str]:
+        """以`prefix`开头的名称（不区分大小写），有不区分大小写完全一致的名称时只返回这些名称"""
+        prefix = prefix.casefold()
+        i = bisect_left(self.entries, (prefix,))
+        res, exact = [], []
+        while i < len(self.entries) and self.entries[i][0].startswith(prefix):
+            res.append(self.entries[i][1])
+            if self.entries[i][0] == prefix:
+                exact.append(self.entries[i][1])
+            i += 1
+        return list(dict.fromkeys(exact or res))
+
+    def fuzzy(self, query: str, limit: int) -> list[str]:
+        counts = Counter()
+        for gram in _grams(query):
+            counts.update(self.grams.get(gram, ()))
+        candidates = [x for x, _ in counts.most_common(FUZZY_CANDIDATES)]
+        return difflib.get_close_matches(query, candidates, n=limit, cutoff=0.6)
+
+
+class NameIndex:
+    """按群的名称索引，`key_column`为名称所属对象的标识"""
+
+    def __init__(
+        self,
+        group_column: InstrumentedAttribute,
+        key_column: InstrumentedAttribute,
+        name_column: InstrumentedAttribute,
+    ):
+        self.group_column = group_column
+        self.key_column = key_column
+        self.name_column = name_column
+        self.groups: dict[int, _Group] = {}
+
+    async def _group(self, group_id: int, session: async_scoped_session) -> _Group:
+        if (group := self.groups.get(group_id)) is None:
+            rows = await session.execute(
+                select(self.key_column, self.name_column).where(self.group_column == group_id)
+            )
+            group = self.groups[group_id] = _Group([tuple(x) for x in rows])
+        return group
+
+    async def keys(self, group_id: int, name: str, session: async_scoped_session) -> set[Hashable]:
+        """群内使用该名称的key"""
+        return set((await self._group(group_id, session)).names.get(name, ()))
+
+    async def contains(self, group_id: int, name: str, session: async_scoped_session) -> bool:
+        return name in (await self._group(group_id, session)).names
+
+    async def match(self, group_id: int, query: str, session: async_scoped_session, limit: int = 5) -> list[str]:
+        """匹配的名称：存在完全一致的名称时只返回该名称，否则依次尝试前缀匹配（不区分大小写）与模糊匹配，至多`limit`个"""
+        group = await self._group(group_id, session)
+        if query in group.names:
+            return [query]
+        if res := group.prefixed(query):
+            return res[:limit]
+        return group.fuzzy(query, limit)
+
+    def set(self, group_id: int, key: Hashable, name: str):
+        """对象在群内获得或修改名称后调用（须在提交成功之后）"""
+        if group := self.groups.get(group_id):
+            group.set(key, name)
+
+    def remove(self, group_id: int | None, key: Hashable):
+        """对象的名称被删除后调用，`group_id`为`None`时从所有群中删除"""
+        for _group_id, group in self.groups.items():
+            if group_id is None or _group_id == group_id:
+                group.remove(key)
+
+    def invalidate(self, group_id: int | None = None):
+        """丢弃群（`group_id`为`None`时为全部）的索引，下次使用时重新载入"""
+        if group_id is None:
+            self.groups.clear()
+        else:
+            self.groups.pop(group_id, None)
+
+
+nicknames = NameIndex(Nickname.group_id, Nickname.user_id, Nickname.nickname)
+"""群昵称索引，key为账户id"""
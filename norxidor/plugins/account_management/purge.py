@@ -0,0 +1,231 @@
+import asyncio
+import json
+import nonebot
+from . import checkin, config, journal, leaderboard, names, utils
+from .types.account import Account, Nickname
+from .types.checkin import CheckinHistory
+from .types.journal import Reason
+from collections.abc import Callable
+from nonebot import logger
+from nonebot_plugin_localstore import get_plugin_data_file
+from nonebot_plugin_orm import Model, get_session
+from sqlalchemy import ColumnElement, delete, select, true, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+# 后台分块删除
+#
+# `!!dbnuke`与`!deleteaccount`提交删除任务后立即返回，任务由后台协程逐表按主键分块删除，
+# 每块单独提交并让出事件循环，删除期间其他命令照常处理。未完成的任务保存在`JOB_FILE`中，
+# 重启后继续执行；分块删除本身是幂等的，中断后重新执行只会删除剩余的行。
+# 删除出错时任务暂停，以指数退避的间隔重试（至多`config.purge_retry_max_delay`秒），排在其后的任务等待其完成。
+#
+# 各插件通过`register`登记自己按用户或群保存数据的表。
+
+driver = nonebot.get_driver()
+
+JOB_FILE = get_plugin_data_file("purge_jobs.json")
+
+
+class Target:
+    __slots__ = ("model", "user_column", "group_column", "on_delete")
+
+    def __init__(
+        self,
+        model: type[Model],
+        user_column: InstrumentedAttribute | None,
+        group_column: InstrumentedAttribute | None,
+        on_delete: Callable[["Job"], None] | None,
+    ):
+        self.model = model
+        self.user_column = user_column
+        self.group_column = group_column
+        self.on_delete = on_delete
+
+
+targets: list[Target] = []
+"""可被删除的表"""
+
+
+def register(
+    model: type[Model],
+    user_column: InstrumentedAttribute | None = None,
+    group_column: InstrumentedAttribute | None = None,
+    on_delete: Callable[["Job"], None] | None = None,
+):
+    """登记一张按用户（`user_column`）或群（`group_column`）保存数据的表
+
+    `on_delete`在每删除一块后调用，用于丢弃该表数据的缓存
+    """
+    targets.append(Target(model, user_column, group_column, on_delete))
+
+
+register(Account, user_column=Account.id)
+register(Nickname, user_column=Nickname.user_id, group_column=Nickname.group_id)
+register(CheckinHistory, user_column=CheckinHistory.user_id)
+
+
+class Job:
+    """删除任务：`kind`为`all`（全部数据）、`group`（群`id`的数据）或`account`（账户`id`的数据）"""
+
+    __slots__ = ("kind", "id", "notify", "deleted", "error")
+
+    def __init__(self, kind: str, id: int = 0, notify: dict | None = None):
+        self.kind = kind
+        self.id = id
+        self.notify = notify
+        """完成时通知的会话`{ "self_id", "group_id" | "user_id" }`"""
+        self.deleted: dict[str, int] = {}
+        """`{ 表名: 已删除行数 }`"""
+        self.error: str | None = None
+        """最近一次出错的异常名，出错后任务暂停等待重试，成功删除一块后清除"""
+
+    def describe(self) -> str:
+        return {"all": "全部数据", "group": f"群{self.id}的数据", "account": f"账户{self.id}"}[self.kind]
+
+    def condition(self, target: Target) -> ColumnElement[bool] | None:
+        """任务在该表中要删除的行，不涉及该表时为`None`"""
+        if self.kind == "all":
+            return true()
+        column = target.group_column if self.kind == "group" else target.user_column
+        return None if column is None else column == self.id
+
+
+jobs: list[Job] = []
+"""排队中的任务，第一个为正在执行的任务"""
+
+_worker: asyncio.Task | None = None
+
+
+def _save():
+    JOB_FILE.write_text(
+        json.dumps([dict(kind=x.kind, id=x.id, notify=x.notify) for x in jobs]), encoding="utf-8"
+    )
+
+
+def _invalidate(job: Job):
+    if job.kind == "account":
+        utils.invalidate_account(job.id)
+        utils.invalidate_nickname(user_id=job.id)
+        leaderboard.remove_account(job.id)
+        names.nicknames.remove(None, job.id)
+        checkin.discard(job.id)
+    elif job.kind == "group":
+        utils.invalidate_nickname(job.id)
+        leaderboard.invalidate(job.id)
+        names.nicknames.invalidate(job.id)
+    else:
+        utils.invalidate_account()
+        utils.invalidate_nickname()
+        leaderboard.invalidate()
+        names.nicknames.invalidate()
+        checkin.discard()
+    for target in targets:
+        if target.on_delete:
+            target.on_delete(job)
+
+
+async def _delete_chunk(target: Target, where: ColumnElement[bool]) -> int:
+    """删除至多`config.purge_chunk_size`行并提交，返回删除的行数"""
+    # 先查出这一块的主键再按主键列表删除：MySQL/MariaDB不支持在`IN`子查询中使用`LIMIT`
+    pk = list(target.model.__table__.primary_key.columns)
+    async with get_session() as session:
+        keys = (await session.execute(select(*pk).where(where).limit(config.purge_chunk_size))).all()
+        if not keys:
+            return 0
+        condition = pk[0].in_([x[0] for x in keys]) if len(pk) == 1 else tuple_(*pk).in_(keys)
+        stmt = delete(target.model).where(condition).execution_options(synchronize_session=False)
+        if target.model is Account:
+            rows = (await session.execute(stmt.returning(Account.id, Account.coin))).all()
+            await session.commit()
+            for id, coin in rows:
+                journal.record(id, -coin, Reason.DELETE)
+            return len(rows)
+        await session.execute(stmt)
+        await session.commit()
+        return len(keys)
+
+
+async def _run(job: Job):
+    # 账户表最后删除，任务中断时账户仍可被查询到
+    for target in sorted(targets, key=lambda x: x.model is Account):
+        if (where := job.condition(target)) is None:
+            continue
+        name = target.model.__tablename__
+        while count := await _delete_chunk(target, where):
+            job.error = None
+            job.deleted[name] = job.deleted.get(name, 0) + count
+            _invalidate(job)
+            await asyncio.sleep(config.purge_interval)
+    _invalidate(job)
+
+
+async def _notify(job: Job):
+    if not job.notify:
+        return
+    try:
+        bot = nonebot.get_bot(job.notify["self_id"])
+        await bot.send_msg(
+            message_type="group" if "group_id" in job.notify else "private",
+            **{k: v for k, v in job.notify.items() if k != "self_id"},
+            message=f"{job.describe()}已删除完毕。",
+        )
+    except Exception as e:
+        logger.opt(exception=e).warning(type(e).__name__)
+
+
+async def _work():
+    delay = 1.0
+    while jobs:
+        job = jobs[0]
+        try:
+            await _run(job)
+        except Exception as e:
+            # 任务保留在队首，暂停后从剩余的行继续删除
+            job.error = type(e).__name__
+            logger.opt(exception=e).error(f"删除任务出错，暂停{delay:.0f}秒后重试：{job.describe()}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, config.purge_retry_max_delay)
+            continue
+        delay = 1.0
+        logger.info(f"删除任务完成：{job.describe()}，{job.deleted}")
+        jobs.pop(0)
+        _save()
+        await _notify(job)
+
+
+def _ensure_worker():
+    global _worker
+    if _worker is None or _worker.done():
+        _worker = asyncio.create_task(_work())
+
+
+def submit(job: Job):
+    """提交删除任务，任务在后台按提交顺序依次执行"""
+    jobs.append(job)
+    _save()
+    _ensure_worker()
+
+
+def status() -> list[str]:
+    return [
+        f"{'⏸' if i else '⚠' if job.error else '▶'}{job.describe()}"
+        + (f"（出错暂停，等待重试：{job.error}）" if job.error else "")
+        + "：已删除"
+        + ("，".join(f"{k} {v}行" for k, v in job.deleted.items()) or "0行")
+        for i, job in enumerate(jobs)
+    ]
+
+
+@driver.on_startup
+async def _():
+    if JOB_FILE.exists():
+        jobs.extend(Job(**x) for x in json.loads(JOB_FILE.read_text(encoding="utf-8")))
+    if jobs:
+        logger.info(f"继续{len(jobs)}个未完成的删除任务")
+        _ensure_worker()
+
+
+@driver.on_shutdown
+async def _():
+    if _worker:
+        _worker.cancel()
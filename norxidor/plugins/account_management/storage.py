@@ -0,0 +1,54 @@
+from . import config
+from nonebot import logger
+from sqlalchemy import Engine, event
+
+# SQLite存储配置
+#
+# 各插件的数据都经由`nonebot_plugin_orm`的默认引擎保存，SQLite默认使用回滚日志与完全同步，每次提交都要多次fsync。
+# 此处在创建每个SQLite连接时应用以下配置：
+#
+# - `journal_mode=WAL`：写入追加到预写日志，读写互不阻塞，提交只需一次fsync
+# - `synchronous=NORMAL`：WAL模式下仍可保证数据库不损坏，断电时可能丢失最近的若干次提交
+# - `mmap_size`：以内存映射读取数据库文件，减少read系统调用与复制
+# - `cache_size`：每个连接的页缓存，负数表示KiB
+# - `busy_timeout`：数据库被锁定时等待（毫秒）而非立即报错
+# - `temp_store=MEMORY`：临时表与排序使用内存
+#
+# 另将sqlite3模块的预编译语句缓存（`cached_statements`）由默认的128条调大。
+# 配置项`sqlite_profile`为`False`时不做任何修改，`sqlite_pragmas`可覆盖其中的单项。
+# 可使用`scripts/storage_benchmark.py`比较应用配置前后的吞吐量。
+
+PROFILE: dict[str, str | int] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
+    "busy_timeout": 5000,
+    "temp_store": "MEMORY",
+}
+
+STATEMENT_CACHE_SIZE = 512
+
+
+def pragmas() -> dict[str, str | int]:
+    """当前生效的PRAGMA"""
+    return {**PROFILE, **config.sqlite_pragmas} if config.sqlite_profile else {}
+
+
+@event.listens_for(Engine, "do_connect")
+def _(dialect, conn_rec, cargs, cparams):
+    if dialect.name != "sqlite" or not config.sqlite_profile:
+        return None
+
+    cparams.setdefault("cached_statements", STATEMENT_CACHE_SIZE)
+    connection = dialect.connect(*cargs, **cparams)
+    cursor = connection.cursor()
+    try:
+        for name, value in pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    except Exception as e:
+        # 只读或内存数据库等不支持部分配置时仍正常连接
+        logger.opt(exception=e).warning(type(e).__name__)
+    finally:
+        cursor.close()
+    return connection
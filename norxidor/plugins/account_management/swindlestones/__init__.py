@@ -0,0 +1,14 @@
+from . import constants, game, kernel, metrics, policy, probability, registry, replay, solver, stats
+
+__all__ = [
+    "constants",
+    "game",
+    "kernel",
+    "metrics",
+    "policy",
+    "probability",
+    "registry",
+    "replay",
+    "solver",
+    "stats",
+]
@@ -0,0 +1,8 @@
+AI_VERSION = 4
+
+MAX_DICE_COUNT = 10
+MAX_PLAYER_DICE_COUNT = MAX_DICE_COUNT / 2
+MAX_DICE_FACE = 8
+HARD_MODE_DICE_PRESET = (3, 5)
+HARD_MODE_DICE_FACE = 4
+MULTIPLIERS = (1.6, 3.5)
@@ -0,0 +1,318 @@
+import copy
+import random
+import statistics
+import sys
+import time
+from typing import Literal, NamedTuple
+from . import kernel, metrics, policy, probability
+from .constants import MAX_PLAYER_DICE_COUNT
+from .probability import dice_probability, p_at_least_k_same
+from nonebot import logger
+
+
+class GameState:
+    """一局游戏的全部状态
+
+    只保存id与小整数：骰子与AI的记忆以`bytearray`存储（记忆的下标为面值，第0位不使用），
+    不持有任何ORM对象，以便同时容纳大量对局。
+    """
+
+    __slots__ = (
+        "seed",
+        "rng",
+        "player_dice_count",
+        "ai_dice_count",
+        "hardmode",
+        "dice_face",
+        "player_dices",
+        "ai_dices",
+        "last_guess",
+        "ai_last_guess",
+        "ai_memory",
+        "ai_turn",
+        "ai_first",
+        "record",
+        "user_id",
+        "group_id",
+        "bet",
+        "last_active",
+    )
+
+    def __init__(
+        self, f: int, player_dice_count: int, ai_dice_count: int, seed: int, hardmode: bool
+    ):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.player_dice_count = player_dice_count
+        """开局时玩家的骰子数目"""
+        self.ai_dice_count = ai_dice_count
+        """开局时AI的骰子数目"""
+        self.hardmode = hardmode
+        self.dice_face = f
+        self.player_dices = bytearray(sorted([self.rng.randint(1, f) for i in range(player_dice_count)]))
+        self.ai_dices = bytearray(sorted([self.rng.randint(1, f) for i in range(ai_dice_count)]))
+        self.last_guess: tuple[int, int, bool] | None = None
+        self.ai_last_guess: tuple[int, int, bool] | None = None
+        self.ai_memory = bytearray(f + 1)
+        """`ai_memory[N]`：AI认为玩家至少持有的面值为N的骰子数目"""
+        self.ai_turn = False
+        self.ai_first = hardmode
+        """本轮是否由AI先手，困难模式的开局固定为AI先手"""
+        self.record: list[str] = []
+        self.user_id = 0
+        self.group_id = 0
+        """私聊对局为0"""
+        self.bet = 0
+        self.last_active = 0.0
+
+    @property
+    def preset_name(self) -> str:
+        """骰子预设的名称：`NdF`或`hard`"""
+        return "hard" if self.hardmode else f"{self.player_dice_count}d{self.dice_face}"
+
+    def snapshot(self) -> "GameState":
+        """对局的副本，供工作线程中的AI决策使用，决策完成后以`apply`写回"""
+        return copy.deepcopy(self)
+
+    def apply(self, snapshot: "GameState"):
+        """写回AI决策在副本上修改的状态（随机数流与AI的记忆）"""
+        self.rng = snapshot.rng
+        self.ai_memory = snapshot.ai_memory
+
+    def sizeof(self) -> int:
+        """估算本对象及其持有的容器所占用的内存（字节）"""
+        return (
+            sys.getsizeof(self)
+            + sys.getsizeof(self.rng)
+            + sys.getsizeof(self.player_dices)
+            + sys.getsizeof(self.ai_dices)
+            + sys.getsizeof(self.ai_memory)
+            + sys.getsizeof(self.record)
+            + sum(sys.getsizeof(x) for x in self.record)
+        )
+
+
+def new_game(
+    f: int, player_dice_count: int, ai_dice_count: int, seed: int | None = None, hardmode: bool = False
+) -> GameState:
+    """开局：双方各抓指定数目的`f`面骰
+
+    对局中的抓骰、硬币与AI的所有决策均使用以`seed`为种子的独立随机数流（未指定时随机生成），
+    因此同一种子与同样的玩家操作总能复现同一局游戏。
+    """
+    if seed is None:
+        seed = random.getrandbits(64)
+    return GameState(f, player_dice_count, ai_dice_count, seed, hardmode)
+
+
+def coin_flip(game: GameState) -> bool:
+    """开局掷硬币，返回AI是否先手"""
+    game.ai_first = game.rng.random() <= 0.5
+    return game.ai_first
+
+
+def check_guess_valid(guess: tuple[int, int, bool], last_guess: tuple[int, int, bool]):
+    valid = False
+    if guess[0] == last_guess[0] and guess[1] > last_guess[1]:
+        valid = True
+    elif guess[0] > last_guess[0]:
+        valid = True
+
+    return valid
+
+
+class Decision(NamedTuple):
+    guess: tuple[int, int, Literal[False]] | None
+    """猜测，或`None`表示揭穿"""
+    seconds: float
+    evaluations: int
+    branch: str
+
+
+def decide(game: GameState) -> Decision:
+    """AI的一次决策及其耗时、概率计算次数与所走的分支，不记录统计，可在工作线程中执行"""
+    start = time.perf_counter()
+    evaluations = probability.evaluations()
+    res, branch = _ai_guess(game)
+    return Decision(res, time.perf_counter() - start, probability.evaluations() - evaluations, branch)
+
+
+def record_decision(game: GameState, decision: Decision):
+    """按骰子预设记录决策的统计，须在事件循环（或唯一的调用线程）中调用"""
+    metrics.record(game.preset_name, decision.seconds, decision.evaluations, decision.branch)
+
+
+def ai_guess(game: GameState) -> tuple[int, int, Literal[False]] | None:
+    """AI的一次决策，同时按骰子预设记录耗时、概率计算次数与所走的分支
+
+    Returns:
+        tuple[int, int, Literal[False]] | None: 猜测，或`None`表示揭穿
+    """
+    decision = decide(game)
+    record_decision(game, decision)
+    return decision.guess
+
+
+def _ai_guess(game: GameState) -> tuple[tuple[int, int, Literal[False]] | None, str]:
+    f = game.dice_face
+    rng = game.rng
+
+    player_dices = game.player_dices
+    ai_dices = game.ai_dices
+    dice_count = len(player_dices) + len(ai_dices)
+
+    if game.hardmode and policy.POLICY is not None:
+        res = policy.policy_guess(ai_dices, len(player_dices), game.ai_first, game.last_guess, rng)
+        logger.info(f"策略表：{f'{res[0]}x{res[1]}' if res else '揭穿'}")
+        return res, "policy"
+
+    if not game.last_guess:  # 先手
+        STRATEGY_TABLE = [
+            [1],
+            [5, 5],
+            [1, 3, 6],
+            [1, 1, 2, 6],
+            [0, 1, 1, 2, 6],
+        ]
+
+        # 投机：增加猜测数目上限
+        opportunistic_limit = 0
+        for i in range(len(player_dices)-1, 0, -1):
+            if rng.random() <= dice_probability(i, 0, len(player_dices), len(player_dices), f) / 3:
+                opportunistic_limit += i
+                break
+        if opportunistic_limit > 0:
+            logger.info(f"投机：猜测数目上限+{opportunistic_limit}")
+
+        selected_dice = rng.choice(statistics.multimode(ai_dices))
+        selected_dice_count = ai_dices.count(selected_dice)
+        
+        missing_faces = [
+            x for x in range(1, f + 1) if x not in ai_dices
+        ]  # ai手上缺失的骰子
+        if len(missing_faces) > 0 and rng.random() > 1 - p_at_least_k_same(selected_dice_count, len(ai_dices), f) / 2:
+            chosen_face = rng.choice(missing_faces)
+            logger.info(
+                "欺诈性开局："
+                + ("随机" if len(missing_faces) > 1 else "")
+                + f"选择不存在的面值{chosen_face}"
+            )
+            return (min(rng.sample([1, 2], k=1, counts=[3, 1])[0], len(ai_dices) + opportunistic_limit), chosen_face, False), "open"
+
+        strategy = STRATEGY_TABLE[selected_dice_count - 1]
+
+        chosen_count, threshold = 0, 0
+        rand = rng.randint(1, sum(strategy))
+        for _n in range(len(strategy)):
+            if rand > threshold and rand <= threshold + strategy[_n]:
+                chosen_count = _n + 1 + opportunistic_limit
+                logger.info(
+                    ("" if chosen_count <= selected_dice_count else "欺诈性")
+                    + f"开局：选择策略{chosen_count}x{selected_dice}"
+                )
+                break
+            else:
+                threshold += strategy[_n]
+
+        return (chosen_count, selected_dice, False), "open"
+
+    else:  # 后手或玩家已猜测
+        player_c: int
+        player_n: int
+        player_c, player_n, _ = game.last_guess
+        ai_last_c: int
+        ai_last_n: int
+        ai_last_c, ai_last_n, _ = (
+            game.ai_last_guess
+            if game.ai_last_guess
+            else (0, 0, False)
+        )
+
+        if player_c > dice_count - len([x for x in ai_dices if x != player_n]):
+            logger.info("玩家猜测的骰子数目超过了场上可能存在的最大数目")
+            return None, "suspect"
+
+        if (cdiff := player_c - ai_dices.count(player_n)) > 0:
+            player_possible_dice_count = len(player_dices) - (sum(game.ai_memory) - game.ai_memory[player_n])
+            if (player_possible_dice_count < cdiff
+                or rng.random() >= p_at_least_k_same(cdiff, player_possible_dice_count, f) / ((len(player_dices) / MAX_PLAYER_DICE_COUNT / 2 + 0.5) if ai_last_n != 0 else 1)
+                or (_r := rng.random() <= 0.05 * cdiff)):
+                logger.info(f"{'随机' if '_r' in vars() else ''}怀疑玩家欺诈")
+                return None, "suspect"
+            
+        if any(game.ai_memory) or player_n == ai_last_n: # 玩家后手
+            guaranteed_player_dice_count = max(int((player_c - ai_last_c if player_n == ai_last_n else 0) * 2 / 3), 0)
+        else: # 玩家先手，或AI先手后玩家不跟面值
+            guaranteed_player_dice_count = max(int(player_c / 2), 1 if len(player_dices) <= 2 and rng.random() >= 0.5 else 0) # 随机防止欺诈
+        
+        if game.ai_memory[player_n] < guaranteed_player_dice_count:
+            game.ai_memory[player_n] = guaranteed_player_dice_count
+            logger.info(f"记忆：玩家所持面值为 {player_n} 骰子的数目至少为{guaranteed_player_dice_count}")
+
+        logger.info("记忆：玩家的骰子组合：" + ", ".join([f"{k}: {game.ai_memory[k]}" for k in range(1, f + 1)]))
+        
+        modified_memory = game.ai_memory.copy()
+        for i in rng.sample(range(1, f+1), f):
+            opportunistic_limit = 0
+            avaliable_dice_count = len(player_dices) - sum(modified_memory)
+            for j in range(int(len(player_dices)/2), 0, -1):
+                if rng.random() <= (_p := dice_probability(j, 0, avaliable_dice_count, len(player_dices), f) / 3):
+                    opportunistic_limit += j
+                    break
+            if opportunistic_limit > 0:
+                modified_memory[i] += opportunistic_limit
+                logger.info(f"投机：猜测玩家所持面值为 {i} 骰子的数目+{opportunistic_limit} ({_p})")
+        
+        probabilities = kernel.probability_matrix(dice_count, f, ai_dices, modified_memory)
+        if probabilities[player_c, player_n] < 0.2:
+            logger.info("玩家当前猜测的骰子组合可能性过小")
+            return None, "suspect"
+
+        best_counts, best_probabilities = kernel.best_guesses(  # 确保找到最大概率中骰子数量最大的
+            probabilities,
+            kernel.legal_mask(dice_count, f, game.last_guess),  # 按规则筛选猜测
+        )
+        best_probability = best_probabilities.max()
+        if best_probability < 0:
+            logger.info("不存在合法的猜测")
+            return None, "no_legal"
+
+        if best_probability < 0.2 and rng.random() <= 0.5 * best_probability * 5:
+            logger.info("所有合法猜测的可能性均过小")
+            return None, "unlikely"
+
+        res = int((best_probabilities == best_probability).argmax())
+        logger.info(
+            f"面值最小的最佳猜测：{best_counts[res]}x{res} @ {best_probability}"
+        )
+        return (int(best_counts[res]), res, False), "best"
+
+
+def end_round(game: GameState) -> bool:
+    f = game.dice_face
+    rng = game.rng
+
+    _c: int
+    _n: int
+    is_player: bool
+    _c, _n, is_player = game.last_guess
+
+    player_dices, ai_dices = game.player_dices, game.ai_dices
+    all_dices = player_dices + ai_dices
+
+    player_win = (is_player and all_dices.count(_n) >= _c) or (
+        not is_player and all_dices.count(_n) < _c
+    )
+    if player_win:
+        ai_dices.pop()
+    else:
+        player_dices.pop()
+
+    game.player_dices = bytearray(sorted([rng.randint(1, f) for i in range(len(player_dices))]))
+    game.ai_dices = bytearray(sorted([rng.randint(1, f) for i in range(len(ai_dices))]))
+    game.last_guess = None
+    game.ai_last_guess = None
+    game.ai_memory = bytearray(f + 1)
+    game.ai_first = not player_win
+
+    return player_win
@@ -0,0 +1,103 @@
+import numpy as np
+from . import probability
+from .constants import MAX_DICE_COUNT, MAX_DICE_FACE
+from .probability import COUNT_PREFIX_TABLE, prefix_counts
+
+CONDITIONAL_TABLE: dict[tuple[int, int], np.ndarray] = {}
+"""`{ (n, f): P }`，`P[kmin, kmax, k] = dice_probability(k, kmin, kmax, n, f)`，`k`不在`[kmin, kmax]`内时为`NaN`"""
+
+LEGAL_TABLE: dict[tuple[int, int], np.ndarray] = {}
+"""`{ (n, f): L }`，`L[c0, n0, c, n] = check_guess_valid((c, n), (c0, n0))`，面值为0时恒为`False`"""
+
+
+def conditional_tensor(n: int, f: int) -> np.ndarray:
+    """计算`n`个`f`面骰所有`(kmin, kmax, k)`组合的`dice_probability`，与逐一调用的结果完全一致"""
+    prefix = COUNT_PREFIX_TABLE.get((n, f)) or prefix_counts(n, f)
+    res = np.full((n + 1, n + 1, n + 1), np.nan)
+    for kmin in range(n + 1):
+        for kmax in range(kmin, n + 1):
+            upper = prefix[kmax + 1]
+            res[kmin, kmax, kmin] = 1
+            for k in range(kmin + 1, kmax + 1):
+                res[kmin, kmax, k] = (upper - prefix[k]) / (upper - prefix[kmin])
+    return res
+
+
+def legal_tensor(n: int, f: int) -> np.ndarray:
+    """计算`n`个`f`面骰所有`(上次猜测, 本次猜测)`组合是否合法"""
+    counts = np.arange(n + 1)
+    faces = np.arange(f + 1)
+    c0, n0, c, _n = np.ix_(counts, faces, counts, faces)
+    res = (c > c0) | ((c == c0) & (_n > n0))
+    res[..., 0] = False
+    return res
+
+
+def probability_matrix(
+    dice_count: int, f: int, ai_dices: bytes, memory: bytes
+) -> np.ndarray:
+    """一次性计算所有猜测`CxN`成立的概率
+
+    面值为N的骰子数目的上下限由AI手上的骰子与对玩家骰子的记忆确定，
+    `P[C, N] = dice_probability(C, count_min[N], count_max[N], dice_count, f)`。
+
+    Args:
+        `dice_count` (int): 场上骰子总数
+        `f` (int): 骰子面数
+        `ai_dices` (bytes): AI手上的骰子
+        `memory` (bytes): 长度为`f + 1`，`memory[N]`为玩家至少持有的面值为N的骰子数目
+
+    Returns:
+        np.ndarray: 形状为`(dice_count + 1, f + 1)`的概率矩阵，超出上下限范围的元素（以及第0列）为`NaN`
+    """
+    ai_counts = np.bincount(ai_dices, minlength=f + 1)
+    _memory = np.array(memory, dtype=np.int64)
+
+    count_max = dice_count - len(ai_dices) + ai_counts - (_memory.sum() - _memory)
+    count_min = np.minimum(ai_counts + _memory, count_max)
+
+    table = CONDITIONAL_TABLE.get((dice_count, f))
+    if table is None:
+        table = conditional_tensor(dice_count, f)
+    if count_max.min() >= 0:
+        res = table[count_min, count_max].T
+    else:  # 记忆中的骰子数目过多，部分面值不存在可能的骰子数目
+        res = table[count_min.clip(0), count_max.clip(0)].T
+        res[:, count_max < 0] = np.nan
+    res[:, 0] = np.nan
+    probability.count_evaluations(dice_count * f)
+    return res
+
+
+def legal_mask(dice_count: int, f: int, last_guess: tuple[int, int, bool]) -> np.ndarray:
+    """按规则筛选猜测，与`check_guess_valid`等价
+
+    Returns:
+        np.ndarray: 形状为`(dice_count + 1, f + 1)`的布尔矩阵，第0列恒为`False`
+    """
+    table = LEGAL_TABLE.get((dice_count, f))
+    if table is None:
+        table = legal_tensor(dice_count, f)
+    return table[last_guess[0], last_guess[1]]
+
+
+def best_guesses(probabilities: np.ndarray, legal: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """对每种面值找出概率最大的合法猜测，概率相同时取骰子数目最大者
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: `(个数, 概率)`，不存在合法猜测的面值对应的概率为-1
+    """
+    masked = np.where(legal & ~np.isnan(probabilities), probabilities, -1.0)
+    best_counts = masked.shape[0] - 1 - masked[::-1].argmax(axis=0)
+    return best_counts, masked.max(axis=0)
+
+
+def build_tables():
+    """预计算所有受支持配置（`n ≤ MAX_DICE_COUNT`，`f ≤ MAX_DICE_FACE`）的概率与合法性张量"""
+    for f in range(2, MAX_DICE_FACE + 1):
+        for n in range(MAX_DICE_COUNT + 1):
+            CONDITIONAL_TABLE[(n, f)] = conditional_tensor(n, f)
+            LEGAL_TABLE[(n, f)] = legal_tensor(n, f)
+
+
+build_tables()
@@ -0,0 +1,110 @@
+from bisect import bisect_left
+from collections import Counter
+
+LATENCY_BOUNDS = (20e-6, 50e-6, 100e-6, 200e-6, 500e-6, 1e-3, 2e-3, 5e-3, 10e-3)
+"""决策耗时直方图各桶的上界（秒），最后一桶无上界"""
+
+EVALUATION_BOUNDS = (0, 1, 5, 10, 20, 50, 100, 200, 500)
+"""概率计算次数直方图各桶的上界，最后一桶无上界"""
+
+BRANCH_NAMES = {
+    "open": "开局",
+    "suspect": "怀疑欺诈",
+    "best": "最佳猜测",
+    "no_legal": "无合法猜测",
+    "unlikely": "猜测可能性过小",
+    "policy": "策略表",
+}
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "total")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+
+    def add(self, x: float):
+        self.counts[bisect_left(self.bounds, x)] += 1
+        self.total += x
+
+    def quantile_bucket(self, q: float) -> int:
+        """`q`分位数所在桶的下标"""
+        target = q * sum(self.counts)
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return i
+        return 0
+
+
+class DecisionMetrics:
+    """同一骰子预设下所有AI决策的统计"""
+
+    __slots__ = ("decisions", "latency", "evaluations", "branches")
+
+    def __init__(self):
+        self.decisions = 0
+        self.latency = Histogram(LATENCY_BOUNDS)
+        self.evaluations = Histogram(EVALUATION_BOUNDS)
+        self.branches: Counter[str] = Counter()
+
+
+metrics: dict[str, DecisionMetrics] = {}
+"""`{ 骰子预设: 统计 }`，进程启动以来的累计值"""
+
+
+def record(preset: str, seconds: float, evaluations: int, branch: str):
+    if not (m := metrics.get(preset)):
+        m = metrics[preset] = DecisionMetrics()
+    m.decisions += 1
+    m.latency.add(seconds)
+    m.evaluations.add(evaluations)
+    m.branches[branch] += 1
+
+
+def reset():
+    metrics.clear()
+
+
+def _format_bound(bounds: tuple[float, ...], i: int, unit: float, suffix: str) -> str:
+    return f"≤{bounds[i] / unit:g}{suffix}" if i < len(bounds) else f">{bounds[-1] / unit:g}{suffix}"
+
+
+def summary() -> list[str]:
+    """每个骰子预设一行的概要"""
+    res = []
+    for preset, m in sorted(metrics.items()):
+        branches = "，".join(
+            f"{BRANCH_NAMES.get(k, k)}{v / m.decisions:.0%}" for k, v in m.branches.most_common()
+        )
+        res.append(
+            f"{preset}：{m.decisions}次决策，"
+            f"平均{m.latency.total / m.decisions * 1e6:.0f}us，"
+            f"p99{_format_bound(LATENCY_BOUNDS, m.latency.quantile_bucket(0.99), 1e-6, 'us')}，"
+            f"平均计算概率{m.evaluations.total / m.decisions:.1f}次；{branches}"
+        )
+    return res
+
+
+def detail(preset: str) -> list[str]:
+    """单个骰子预设的耗时与概率计算次数直方图，预设不存在时为空"""
+    if not (m := metrics.get(preset)):
+        return []
+    res = [f"{preset}：{m.decisions}次决策", "耗时："]
+    res += [
+        f"  {_format_bound(LATENCY_BOUNDS, i, 1e-6, 'us')}：{count}"
+        for i, count in enumerate(m.latency.counts)
+        if count
+    ]
+    res.append("概率计算次数：")
+    res += [
+        f"  {_format_bound(EVALUATION_BOUNDS, i, 1, '')}：{count}"
+        for i, count in enumerate(m.evaluations.counts)
+        if count
+    ]
+    res.append("分支：")
+    res += [f"  {BRANCH_NAMES.get(k, k)}：{v}" for k, v in m.branches.most_common()]
+    return res
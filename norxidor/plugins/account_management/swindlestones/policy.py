@@ -0,0 +1,41 @@
+import numpy as np
+import random
+from pathlib import Path
+from .constants import HARD_MODE_DICE_FACE, HARD_MODE_DICE_PRESET
+from .solver import bid_to_guess, guess_to_bid, hands
+
+POLICY_FILE = Path(__file__).with_name("hardmode_policy.npy")
+"""由`scripts/swindlestones_solve.py`离线生成的困难模式策略表，格式见`solver`"""
+
+POLICY: np.ndarray | None = np.load(POLICY_FILE, mmap_mode="r") if POLICY_FILE.exists() else None
+"""策略表不存在时为`None`，此时困难模式不可用"""
+
+HAND_INDEX: dict[bytes, int] = {
+    bytes(hand): i
+    for m in range(1, max(HARD_MODE_DICE_PRESET) + 1)
+    for i, hand in enumerate(hands(m))
+}
+"""`{ 升序手牌: 在同样骰数的所有手牌中的下标 }`"""
+
+
+def policy_guess(
+    ai_dices: bytes,
+    player_dice_count: int,
+    ai_first: bool,
+    last_guess: tuple[int, int, bool] | None,
+    rng: random.Random,
+) -> tuple[int, int, bool] | None:
+    """查策略表并按其中的混合策略抽样
+
+    Returns:
+        tuple[int, int, bool] | None: 猜测，或`None`表示揭穿
+    """
+    assert POLICY is not None
+    a, b = len(ai_dices), player_dice_count
+    state = guess_to_bid(*last_guess[:2]) + 1 if last_guess and last_guess[0] > 0 else 0
+    row = POLICY[a - 1, b - 1, int(ai_first), HAND_INDEX[bytes(ai_dices)], state, : (a + b) * HARD_MODE_DICE_FACE + 1]
+
+    action = rng.choices(range(len(row)), weights=row.tolist())[0]
+    if action == 0:
+        return None
+    return (*bid_to_guess(action - 1), False)
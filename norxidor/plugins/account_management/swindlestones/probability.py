@@ -0,0 +1,137 @@
+import math
+import threading
+from functools import cache
+from .constants import MAX_DICE_COUNT, MAX_DICE_FACE
+
+COUNT_PREFIX_TABLE: dict[tuple[int, int], tuple[int, ...]] = {}
+"""`{ (n, f): 累积组合数 }`，第`k`项为`n`个`f`面骰中指定面值出现次数小于`k`的组合数"""
+
+CDF_TABLE: dict[tuple[int, float], tuple[float, ...]] = {}
+"""`{ (n, 1/f): cdf }`，第`k`项为`Pr(X <= k; n, 1/f)`"""
+
+AT_LEAST_TABLE: dict[tuple[int, int], tuple[float, ...]] = {}
+"""`{ (n, d): p }`，第`k`项为`p_at_least_k_same(k, n, d)`"""
+
+_counter = threading.local()
+
+
+def evaluations() -> int:
+    """当前线程中`dice_probability`与`p_at_least_k_same`的累计调用次数（`kernel`的概率矩阵按元素个数计入），用于AI决策的性能统计
+
+    按线程计数，在工作池中同时进行的决策互不干扰。"""
+    return getattr(_counter, "value", 0)
+
+
+def count_evaluations(n: int = 1):
+    _counter.value = getattr(_counter, "value", 0) + n
+
+
+def pmf_B(k: int, n: int, p: float) -> float:
+    """二项分布概率质量函数 `Pr(X = k; n, p)`"""
+    if k > n or p < 0 or p > 1:
+        raise ValueError
+    return math.comb(n, k) * p**k * (1 - p) ** (n - k)
+
+
+def cdf_B(k: int, n: int, p: float) -> float:
+    """二项分布累积分布函数 `Pr(X <= k; n, p)`
+
+    `p`为`1/f`且`(n, f)`在预计算范围内时直接查表。"""
+    if (table := CDF_TABLE.get((n, p))) and 0 <= k <= n:
+        return table[k]
+
+    res = 0
+    for i in range(k + 1):
+        res += pmf_B(i, n, p)
+    return res
+
+
+def prefix_counts(n: int, f: int) -> tuple[int, ...]:
+    """`n`个`f`面骰中指定面值出现次数小于`k`的组合数 (`k = 0..n+1`)，总组合数为`f**n`"""
+    res = [0]
+    for k in range(n + 1):
+        res.append(res[-1] + math.comb(n, k) * (f - 1) ** (n - k))
+    return tuple(res)
+
+
+def dice_probability(k: int, kmin: int, kmax: int, n: int, f: int) -> float:
+    """在`n`个`f`面骰中，已知指定面值的骰子数目在`kmin`与`kmax`之间，求所有骰子中有至少`k`个相应面值骰子的概率
+
+    `Pr(X >= k | kmin ≤ X ≤ kmax) (kmin ≤ k ≤ kmax)`。
+
+    Args:
+        `k` (int): 目标值
+        `kmin` (int): 对应面值骰子数量的下限
+        `kmax` (int): 对应面值骰子数量的上限
+        `n` (int): 骰子总数
+        `f` (int): 骰子面数
+    """
+    count_evaluations()
+    if kmin > kmax:
+        raise ValueError
+
+    if k <= kmin:
+        return 1
+    elif k > kmax:
+        return 0
+    else:
+        if kmax > n:
+            raise ValueError
+        prefix = COUNT_PREFIX_TABLE.get((n, f)) or prefix_counts(n, f)
+        upper = prefix[kmax + 1]
+        return (upper - prefix[max(k, 0)]) / (upper - prefix[max(kmin, 0)])
+
+@cache
+def occupancy_counts(n: int, d: int) -> tuple[int, ...]:
+    """将n个可区分的物体放入d种项目（共`d**n`种方案），同种项目个数的最大值不超过m的方案数 (`m = 0..n`)
+
+    对每个上限m按项目逐一进行动态规划，全程使用整数运算，结果按`(n, d)`缓存。"""
+    res = []
+    for m in range(n + 1):
+        ways = [1] + [0] * n  # ways[s]: 已处理的项目中放入s个物体的方案数
+        for _ in range(d):
+            ways = [
+                sum(math.comb(s, j) * ways[s - j] for j in range(min(m, s) + 1))
+                for s in range(n + 1)
+            ]
+        res.append(ways[n])
+    return tuple(res)
+
+def p_no_more_than_k_same(k: int, n: int, d: int) -> float:
+    """有d种不同的项目共n个，其中同种项目个数的最大值恰为k的概率（k为1时为不超过1的概率）"""
+    counts = occupancy_counts(n, d)
+    if k == 1:
+        return counts[min(1, n)] / d**n
+    elif k > n:
+        return 0
+    return (counts[k] - counts[k - 1]) / d**n
+
+def p_at_least_k_same(k: int, n: int, d: int) -> float:
+    """有d种不同项目的物体共n个，其中同种项目的个数至少为k的概率"""
+    count_evaluations()
+    if k > n:
+        raise ValueError("k must lower or equal to n")
+    if k <= math.ceil(n/d):
+        return 1
+    elif table := AT_LEAST_TABLE.get((n, d)):
+        return table[k]
+    else:
+        return (d**n - occupancy_counts(n, d)[k - 1]) / d**n
+
+
+def build_tables():
+    """预计算所有受支持配置（`n ≤ MAX_DICE_COUNT`，`f ≤ MAX_DICE_FACE`）的概率表"""
+    for f in range(2, MAX_DICE_FACE + 1):
+        for n in range(MAX_DICE_COUNT + 1):
+            prefix = prefix_counts(n, f)
+            COUNT_PREFIX_TABLE[(n, f)] = prefix
+            CDF_TABLE[(n, 1 / f)] = tuple(prefix[k + 1] / f**n for k in range(n + 1))
+
+            counts = occupancy_counts(n, f)
+            AT_LEAST_TABLE[(n, f)] = tuple(
+                1 if k <= math.ceil(n/f) else (f**n - counts[k - 1]) / f**n
+                for k in range(n + 1)
+            )
+
+
+build_tables()
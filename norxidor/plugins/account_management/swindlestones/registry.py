@@ -0,0 +1,82 @@
+import asyncio
+import nonebot
+import sys
+import time
+from . import replay
+from .game import GameState
+from .. import config
+from nonebot import logger
+
+driver = nonebot.get_driver()
+
+SWEEP_INTERVAL = 60
+"""清理闲置对局的间隔（秒）"""
+
+games: dict[tuple[int, int], GameState] = {}
+"""进行中的对局 `{ (user_id, group_id): 对局 }`，私聊对局的`group_id`为0"""
+
+_sweep_task: asyncio.Task | None = None
+
+
+def add(game: GameState):
+    """登记一局新游戏，同一玩家在同一会话中的旧对局将被替换"""
+    game.last_active = time.monotonic()
+    games[(game.user_id, game.group_id)] = game
+
+
+def get(user_id: int, group_id: int | None) -> GameState | None:
+    """取出玩家在该会话中进行中的对局并刷新其活跃时间，对局不存在或已被清理时返回`None`"""
+    game = games.get((user_id, group_id or 0))
+    if game:
+        game.last_active = time.monotonic()
+    return game
+
+
+def remove(game: GameState):
+    if games.get((game.user_id, game.group_id)) is game:
+        del games[(game.user_id, game.group_id)]
+
+
+def evict_idle(timeout: float) -> list[GameState]:
+    """移除超过`timeout`秒无操作的对局，视为玩家认输并写入对局记录
+
+    Returns:
+        list[GameState]: 被移除的对局
+    """
+    deadline = time.monotonic() - timeout
+    evicted = [game for game in games.values() if game.last_active < deadline]
+    for game in evicted:
+        remove(game)
+        replay.record_quit(game)
+        try:
+            replay.save_record(game, replay.REPLAY_FILE)
+        except Exception as e:
+            logger.opt(exception=e).error(type(e).__name__)
+    if evicted:
+        logger.info(f"已清理{len(evicted)}局闲置的Swindlestones对局")
+    return evicted
+
+
+def memory_usage() -> int:
+    """估算所有进行中的对局占用的内存（字节）"""
+    return sys.getsizeof(games) + sum(game.sizeof() for game in games.values())
+
+
+async def _sweep_periodically(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        evict_idle(config.swindlestones_idle_timeout)
+
+
+@driver.on_startup
+async def _():
+    global _sweep_task
+    _sweep_task = asyncio.create_task(
+        _sweep_periodically(min(SWEEP_INTERVAL, config.swindlestones_idle_timeout))
+    )
+
+
+@driver.on_shutdown
+async def _():
+    if _sweep_task:
+        _sweep_task.cancel()
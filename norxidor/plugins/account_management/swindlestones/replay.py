@@ -0,0 +1,96 @@
+import json
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from .constants import AI_VERSION
+from .game import GameState, ai_guess, coin_flip, end_round, new_game
+from nonebot_plugin_localstore import get_plugin_data_file
+
+REPLAY_FILE = get_plugin_data_file("swindlestones_replays.jsonl")
+
+# 对局记录中的操作：
+#   p{C}x{N} / a{C}x{N}  玩家 / AI 猜测
+#   pc / ac              玩家 / AI 揭穿，其后紧跟 =p / =a 表示本轮胜者
+#   pq                   玩家认输
+
+
+def record_guess(game: GameState, guess: tuple[int, int, bool]):
+    game.record.append(f"{'p' if guess[2] else 'a'}{guess[0]}x{guess[1]}")
+
+
+def record_call(game: GameState, call_from_player: bool, player_win: bool):
+    game.record.append("pc" if call_from_player else "ac")
+    game.record.append("=p" if player_win else "=a")
+
+
+def record_quit(game: GameState):
+    game.record.append("pq")
+
+
+def save_record(game: GameState, path: Path):
+    """将一局游戏以单行JSON追加写入对局记录文件"""
+    line = json.dumps(
+        {
+            "version": AI_VERSION,
+            "seed": game.seed,
+            "dice": [game.player_dice_count, game.ai_dice_count, game.dice_face],
+            "hardmode": int(game.hardmode),
+            "moves": " ".join(game.record),
+        },
+        separators=(",", ":"),
+    )
+    with path.open("a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+def load_records(path: Path) -> Iterator[dict]:
+    """逐行读取对局记录文件"""
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+@dataclass
+class ReplayResult:
+    preset: str
+    decisions: int = 0
+    latencies: list[float] = field(default_factory=list)
+    mismatch: str | None = None
+    """首个与记录不一致之处，一致时为`None`"""
+
+
+def replay(record: dict) -> ReplayResult:
+    """以记录中的种子与玩家操作重新进行一局游戏，逐一比对AI的决策与每轮的胜负并计时"""
+    player_dice_count, ai_dice_count, f = record["dice"]
+    game = new_game(f, player_dice_count, ai_dice_count, record["seed"], bool(record["hardmode"]))
+    if not game.hardmode:
+        coin_flip(game)
+
+    res = ReplayResult(game.preset_name)
+    player_win = False
+    for i, move in enumerate(record["moves"].split()):
+        if move[0] == "a":
+            start = time.perf_counter()
+            guess = ai_guess(game)
+            res.latencies.append(time.perf_counter() - start)
+            res.decisions += 1
+
+            actual = f"a{guess[0]}x{guess[1]}" if guess else "ac"
+            if actual != move:
+                res.mismatch = f"#{i}: 记录为{move}，重放为{actual}"
+                break
+            if guess:
+                game.last_guess = game.ai_last_guess = guess
+            else:
+                player_win = end_round(game)
+        elif move == "pc":
+            player_win = end_round(game)
+        elif move[0] == "p" and move != "pq":
+            c, n = map(int, move[1:].split("x"))
+            game.last_guess = (c, n, True)
+        elif move[0] == "=" and (move == "=p") != player_win:
+            res.mismatch = f"#{i}: 记录为{move}，重放为{'=p' if player_win else '=a'}"
+            break
+    return res
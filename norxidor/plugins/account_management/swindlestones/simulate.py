@@ -0,0 +1,143 @@
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from .constants import HARD_MODE_DICE_FACE, HARD_MODE_DICE_PRESET
+from .game import GameState, ai_guess, check_guess_valid, coin_flip, end_round, new_game
+from .replay import record_call, record_guess, save_record
+
+
+@dataclass
+class Preset:
+    """骰子预设：玩家与AI开局各抓的骰子数目、骰子面数以及是否为困难模式（固定AI先手）"""
+
+    name: str
+    player_dice_count: int
+    ai_dice_count: int
+    dice_face: int
+    hardmode: bool = False
+
+    @classmethod
+    def parse(cls, notation: str):
+        """解析`NdF`或`hard`（困难模式预设）"""
+        if notation.lower() == "hard":
+            return cls("hard", *HARD_MODE_DICE_PRESET, HARD_MODE_DICE_FACE, hardmode=True)
+        n, f = map(int, notation.lower().split("d"))
+        return cls(notation.lower(), n, n, f)
+
+
+@dataclass
+class BenchmarkResult:
+    preset: str
+    games: int
+    ai_wins: int
+    seconds: float
+
+    @property
+    def win_rate(self) -> float:
+        return self.ai_wins / self.games
+
+    def confidence_interval(self, z: float = 1.96) -> tuple[float, float]:
+        """AI胜率的Wilson置信区间，默认为95%"""
+        n, p = self.games, self.win_rate
+        center = (p + z**2 / (2 * n)) / (1 + z**2 / n)
+        margin = z * math.sqrt(p * (1 - p) / n + z**2 / (4 * n**2)) / (1 + z**2 / n)
+        return (center - margin, center + margin)
+
+    @property
+    def games_per_second(self) -> float:
+        return self.games / self.seconds
+
+
+def baseline_guess(game: GameState) -> tuple[int, int, bool] | None:
+    """基准对手：只看自己手上的骰子，假设其余骰子均匀分布，按期望个数猜测或揭穿
+
+    Returns:
+        tuple[int, int, bool] | None: 猜测，或`None`表示揭穿
+    """
+    f = game.dice_face
+    player_dices = game.player_dices
+    unknown = len(game.ai_dices) / f
+
+    last_guess = game.last_guess
+    if last_guess and last_guess[0] > player_dices.count(last_guess[1]) + unknown + 0.5:
+        return None
+
+    face = max(range(1, f + 1), key=lambda x: (player_dices.count(x), -x))
+    count = max(int(player_dices.count(face) + unknown), 1)
+    if last_guess and not check_guess_valid((count, face, True), last_guess):
+        count = last_guess[0] + (1 if face <= last_guess[1] else 0)
+        if count > player_dices.count(face) + unknown + 0.5:
+            return None
+    return (count, face, True)
+
+
+def play_game(preset: Preset, seed: int | None = None, record_path: Path | None = None) -> bool:
+    """无需NoneBot的完整对局：AI对阵基准对手
+
+    Args:
+        `preset` (Preset): 骰子预设
+        `seed` (int | None): 对局种子，默认随机生成
+        `record_path` (Path | None): 对局记录文件，指定时将对局追加写入其中
+
+    Returns:
+        bool: AI是否获胜
+    """
+    game = new_game(
+        preset.dice_face, preset.player_dice_count, preset.ai_dice_count, seed, preset.hardmode
+    )
+    game.ai_turn = preset.hardmode or coin_flip(game)
+
+    while game.player_dices and game.ai_dices:
+        if game.ai_turn:
+            if guess := ai_guess(game):
+                game.ai_last_guess = guess
+        else:
+            guess = baseline_guess(game)
+
+        if guess:
+            game.last_guess = guess
+            game.ai_turn = not game.ai_turn
+            record_guess(game, guess)
+        else:
+            player_win = end_round(game)
+            record_call(game, not game.ai_turn, player_win)
+            game.ai_turn = not player_win
+
+    if record_path:
+        save_record(game, record_path)
+    return not game.player_dices
+
+
+def play_games(preset: Preset, games: int, seed: int) -> tuple[int, int]:
+    """在单个进程中以指定种子连续进行多局对局
+
+    Returns:
+        tuple[int, int]: `(对局数, AI获胜数)`
+    """
+    rng = random.Random(seed)
+    return games, sum(play_game(preset, rng.getrandbits(64)) for _ in range(games))
+
+
+def benchmark(
+    presets: list[Preset], games: int, workers: int | None = None, seed: int = 0, chunk_size: int = 10000
+) -> list[BenchmarkResult]:
+    """将各预设的对局切分为多个批次并行模拟，每个批次使用独立的种子"""
+    res = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for i, preset in enumerate(presets):
+            start = time.perf_counter()
+            chunks = [min(chunk_size, games - j) for j in range(0, games, chunk_size)]
+            ai_wins = sum(
+                wins
+                for _, wins in executor.map(
+                    play_games,
+                    [preset] * len(chunks),
+                    chunks,
+                    [seed + i * len(chunks) + j for j in range(len(chunks))],
+                )
+            )
+            res.append(BenchmarkResult(preset.name, games, ai_wins, time.perf_counter() - start))
+    return res
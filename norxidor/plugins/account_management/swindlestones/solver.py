@@ -0,0 +1,270 @@
+import math
+import numpy as np
+from itertools import combinations_with_replacement
+from .constants import HARD_MODE_DICE_FACE, HARD_MODE_DICE_PRESET
+
+# 困难模式的离线求解
+#
+# 每一轮是一个独立的吹牛骰子博弈，以`(AI骰数, 玩家骰数, 是否AI先手)`区分，
+# 其胜负的收益为进入下一轮后AI赢得整局的概率，因此按骰子总数从少到多逆推求解。
+# 信息集抽象为`(己方手牌, 上一次猜测)`：猜测严格递增，博弈树退化为按猜测排序的有向无环图，
+# 每轮在该图上以CFR+迭代，一次前向传播计算到达概率，一次反向传播计算反事实收益。
+#
+# 策略表`POLICY[a - 1, b - 1, ai_first, hand, state, action]`为AI的混合策略，以uint8量化：
+#   hand    AI手牌（升序）在`hands(a)`中的下标
+#   state   0为尚无猜测，`j + 1`为玩家上一次猜测了第`j`个猜测
+#   action  0为揭穿，`j + 1`为猜测第`j`个猜测
+# 第`j`个猜测为`(j // f + 1)x(j % f + 1)`，下标的大小顺序与`check_guess_valid`一致。
+
+POLICY_SCALE = 255
+"""策略表中每行概率之和"""
+
+
+def hands(m: int, f: int = HARD_MODE_DICE_FACE) -> list[tuple[int, ...]]:
+    """`m`枚`f`面骰所有可能的手牌（升序）"""
+    return list(combinations_with_replacement(range(1, f + 1), m))
+
+
+def bid_to_guess(j: int, f: int = HARD_MODE_DICE_FACE) -> tuple[int, int]:
+    return (j // f + 1, j % f + 1)
+
+
+def guess_to_bid(c: int, n: int, f: int = HARD_MODE_DICE_FACE) -> int:
+    return (c - 1) * f + n - 1
+
+
+def policy_shape(f: int = HARD_MODE_DICE_FACE) -> tuple[int, ...]:
+    ai_dice_count = max(HARD_MODE_DICE_PRESET)
+    player_dice_count = min(HARD_MODE_DICE_PRESET)
+    states = (player_dice_count + ai_dice_count) * f + 1
+    return (
+        ai_dice_count,
+        player_dice_count,
+        2,
+        len(hands(ai_dice_count, f)),
+        states,
+        states,
+    )
+
+
+class RoundGame:
+    """一轮吹牛骰子：AI与玩家分别持有`a`与`b`枚骰子
+
+    Args:
+        `a` (int): AI的骰子数目
+        `b` (int): 玩家的骰子数目
+        `ai_first` (bool): 本轮是否由AI先手
+        `ai_win` (float): AI赢下本轮时的收益（AI赢得整局的概率）
+        `ai_lose` (float): AI输掉本轮时的收益
+    """
+
+    def __init__(
+        self, a: int, b: int, ai_first: bool, ai_win: float, ai_lose: float,
+        f: int = HARD_MODE_DICE_FACE,
+    ):
+        self.ai_first = ai_first
+        self.bids = (a + b) * f
+
+        ai_hands, player_hands = hands(a, f), hands(b, f)
+        self.ai_prior = np.array([_hand_probability(x, f) for x in ai_hands])
+        self.player_prior = np.array([_hand_probability(y, f) for y in player_hands])
+        ai_counts = np.array([[x.count(i) for i in range(f + 1)] for x in ai_hands])
+        player_counts = np.array([[y.count(i) for i in range(f + 1)] for y in player_hands])
+
+        # truth[j, x, y]：第j个猜测在手牌组合(x, y)下是否成立
+        counts = ai_counts[:, None, :] + player_counts[None, :, :]
+        c, n = np.divmod(np.arange(self.bids), f)
+        truth = (counts[:, :, n + 1] >= c + 1).transpose(2, 0, 1)
+        # 揭穿第j个猜测时AI的收益：猜测成立则揭穿者输掉本轮
+        self.ai_call = np.where(truth, ai_lose, ai_win)
+        self.player_call = np.where(truth, ai_win, ai_lose)
+
+        # legal[state, action]
+        states = np.arange(self.bids + 1)
+        self.legal = states[None, :] > states[:, None]
+        self.legal[1:, 0] = True
+
+        shape = (self.bids + 1, self.bids + 1)
+        self.ai_regret = np.zeros((len(ai_hands), *shape))
+        self.player_regret = np.zeros((len(player_hands), *shape))
+        self.ai_strategy_sum = np.zeros_like(self.ai_regret)
+        self.player_strategy_sum = np.zeros_like(self.player_regret)
+        self.iterations = 0
+
+    def _regret_matching(self, regret: np.ndarray) -> np.ndarray:
+        positive = np.where(self.legal, np.maximum(regret, 0), 0)
+        total = positive.sum(axis=-1, keepdims=True)
+        uniform = self.legal / self.legal.sum(axis=-1, keepdims=True)
+        return np.where(total > 0, positive / np.where(total > 0, total, 1), uniform)
+
+    def average_strategies(self) -> tuple[np.ndarray, np.ndarray]:
+        """双方的平均策略，从未到达过的信息集取均匀策略"""
+        res = []
+        for strategy_sum in (self.ai_strategy_sum, self.player_strategy_sum):
+            total = strategy_sum.sum(axis=-1, keepdims=True)
+            uniform = np.broadcast_to(
+                self.legal / self.legal.sum(axis=-1, keepdims=True), strategy_sum.shape
+            )
+            res.append(np.where(total > 0, strategy_sum / np.where(total > 0, total, 1), uniform))
+        return res[0], res[1]
+
+    def _reach(self, ai_strategy: np.ndarray, player_strategy: np.ndarray):
+        """前向传播：各状态下轮到AI（`a_*`）或玩家（`p_*`）行动时，双方各自的到达概率
+
+        对手的行动计入对手的到达概率，己方的行动不计入，即反事实到达概率。
+        """
+        states = self.bids + 1
+        a_self = np.zeros((states, len(self.ai_prior)))
+        a_opp = np.zeros((states, len(self.player_prior)))
+        p_self = np.zeros((states, len(self.player_prior)))
+        p_opp = np.zeros((states, len(self.ai_prior)))
+        if self.ai_first:
+            a_self[0], a_opp[0] = 1, 1
+        else:
+            p_self[0], p_opp[0] = 1, 1
+
+        for s in range(states - 1):
+            # 猜测第j个猜测（j >= s）后转移到状态j + 1
+            p_opp[s + 1 :] += (a_self[s][:, None] * ai_strategy[:, s, s + 1 :]).T
+            p_self[s + 1 :] += a_opp[s]
+            a_opp[s + 1 :] += (p_self[s][:, None] * player_strategy[:, s, s + 1 :]).T
+            a_self[s + 1 :] += p_opp[s]
+        return a_self, a_opp, p_self, p_opp
+
+    def _values(
+        self,
+        ai_strategy: np.ndarray,
+        player_strategy: np.ndarray,
+        reach: tuple[np.ndarray, ...] | None = None,
+        best_response: str | None = None,
+    ):
+        """反向传播：计算各状态下AI的期望收益`u[x, y]`
+
+        给定`reach`时同时返回双方各信息集每个行动的反事实收益；
+        `best_response`为`"ai"`或`"player"`时该方在每个信息集上改为选择反事实收益最大的行动。
+        """
+        states = self.bids + 1
+        a_values = np.zeros((states, len(self.ai_prior), len(self.player_prior)))
+        p_values = np.zeros_like(a_values)
+        a_cfv = np.zeros_like(self.ai_regret) if reach else None
+        p_cfv = np.zeros_like(self.player_regret) if reach else None
+        if best_response:
+            ai_strategy, player_strategy = ai_strategy.copy(), player_strategy.copy()
+
+        for s in range(states - 1, -1, -1):
+            # AI行动：0为揭穿，a >= s + 1为转移到玩家行动的状态a
+            q = np.zeros((states, len(self.ai_prior), len(self.player_prior)))
+            if s:
+                q[0] = self.ai_call[s - 1]
+            q[s + 1 :] = p_values[s + 1 :]
+            if reach:
+                a_cfv[:, s, :] = np.einsum("axy,y->xa", q, self.player_prior * reach[1][s])
+                a_cfv[:, s, :] *= self.ai_prior[:, None]
+                if best_response == "ai":
+                    ai_strategy[:, s, :] = _argmax_strategy(a_cfv[:, s, :], self.legal[s])
+            a_values[s] = np.einsum("xa,axy->xy", ai_strategy[:, s, :], q)
+
+            if s:
+                q[0] = self.player_call[s - 1]
+            q[s + 1 :] = a_values[s + 1 :]
+            if reach:
+                p_cfv[:, s, :] = -np.einsum("axy,x->ya", q, self.ai_prior * reach[3][s])
+                p_cfv[:, s, :] *= self.player_prior[:, None]
+                if best_response == "player":
+                    player_strategy[:, s, :] = _argmax_strategy(p_cfv[:, s, :], self.legal[s])
+            p_values[s] = np.einsum("ya,axy->xy", player_strategy[:, s, :], q)
+
+        root = a_values[0] if self.ai_first else p_values[0]
+        value = float(self.ai_prior @ root @ self.player_prior)
+        return value, a_cfv, p_cfv
+
+    def iterate(self):
+        """一次CFR+迭代：交替更新双方的遗憾值，平均策略按迭代次数线性加权"""
+        self.iterations += 1
+        for ai in (True, False):
+            ai_strategy = self._regret_matching(self.ai_regret)
+            player_strategy = self._regret_matching(self.player_regret)
+            reach = self._reach(ai_strategy, player_strategy)
+            _, a_cfv, p_cfv = self._values(ai_strategy, player_strategy, reach)
+
+            regret, cfv, strategy, strategy_sum, self_reach = (
+                (self.ai_regret, a_cfv, ai_strategy, self.ai_strategy_sum, reach[0])
+                if ai
+                else (self.player_regret, p_cfv, player_strategy, self.player_strategy_sum, reach[2])
+            )
+            expected = (cfv * strategy).sum(axis=-1, keepdims=True)
+            regret += np.where(self.legal, cfv - expected, 0)
+            np.maximum(regret, 0, out=regret)
+            strategy_sum += self.iterations * self_reach.T[:, :, None] * strategy
+
+    def value(self) -> float:
+        """双方均采用平均策略时AI的期望收益"""
+        return self._values(*self.average_strategies())[0]
+
+    def exploitability(self) -> float:
+        """双方各自的最优反应相对平均策略的收益增量之和（在同一信息集抽象下的近似值）"""
+        ai_strategy, player_strategy = self.average_strategies()
+        reach = self._reach(ai_strategy, player_strategy)
+        ai_best = self._values(ai_strategy, player_strategy, reach, "ai")[0]
+        player_best = self._values(ai_strategy, player_strategy, reach, "player")[0]
+        return ai_best - player_best
+
+
+def _hand_probability(hand: tuple[int, ...], f: int) -> float:
+    res = math.factorial(len(hand)) / f ** len(hand)
+    for i in set(hand):
+        res /= math.factorial(hand.count(i))
+    return res
+
+
+def _argmax_strategy(cfv: np.ndarray, legal: np.ndarray) -> np.ndarray:
+    masked = np.where(legal, cfv, -np.inf)
+    return np.eye(len(legal))[masked.argmax(axis=-1)]
+
+
+def quantize(strategy: np.ndarray) -> np.ndarray:
+    """将每行概率量化为和恰为`POLICY_SCALE`的uint8，余数按最大余数法分配"""
+    scaled = strategy * POLICY_SCALE
+    res = np.floor(scaled)
+    remainder = (POLICY_SCALE - res.sum(axis=-1)).round().astype(int)
+    order = np.argsort(-(scaled - res), axis=-1)
+    ranks = np.argsort(order, axis=-1)
+    res += ranks < remainder[..., None]
+    return res.astype(np.uint8)
+
+
+def solve(iterations: int, progress=None) -> tuple[np.ndarray, dict[tuple[int, int, bool], float]]:
+    """逆推求解困难模式的每一轮
+
+    Args:
+        `iterations` (int): 每一轮的CFR+迭代次数
+        `progress` (Callable | None): 每解完一轮后以`(a, b, ai_first, 本轮对象)`调用
+
+    Returns:
+        tuple[np.ndarray, dict]: `(策略表, { (a, b, ai_first): AI赢得整局的概率 })`
+    """
+    f = HARD_MODE_DICE_FACE
+    player_dice_count, ai_dice_count = HARD_MODE_DICE_PRESET
+    policy = np.zeros(policy_shape(f), dtype=np.uint8)
+
+    values: dict[tuple[int, int, bool], float] = {}
+    for a in range(ai_dice_count + 1):
+        for b in range(player_dice_count + 1):
+            for ai_first in (False, True):
+                if a == 0 or b == 0:
+                    values[(a, b, ai_first)] = float(b == 0)
+    for total in range(2, ai_dice_count + player_dice_count + 1):
+        for a in range(max(1, total - player_dice_count), min(ai_dice_count, total - 1) + 1):
+            b = total - a
+            for ai_first in (False, True):
+                # 本轮的胜者下一轮先手
+                game = RoundGame(a, b, ai_first, values[(a, b - 1, True)], values[(a - 1, b, False)], f)
+                for _ in range(iterations):
+                    game.iterate()
+                values[(a, b, ai_first)] = game.value()
+
+                ai_strategy = game.average_strategies()[0]
+                policy[a - 1, b - 1, int(ai_first), : ai_strategy.shape[0], : game.bids + 1, : game.bids + 1] = quantize(ai_strategy)
+                if progress:
+                    progress(a, b, ai_first, game)
+    return policy, values
@@ -0,0 +1,79 @@
+import asyncio
+import nonebot
+from collections import Counter
+from .constants import AI_VERSION
+from .. import config
+from ..types.swindlestones import SwindlestonesStatistics
+from nonebot import logger
+from nonebot_plugin_orm import get_session
+from sqlalchemy import select, update
+
+driver = nonebot.get_driver()
+
+pending: Counter[str] = Counter()
+"""尚未写入数据库的统计增量 `{ 字段名: 增量 }`"""
+
+_flush_task: asyncio.Task | None = None
+
+
+def record_game(hardmode: bool, bot_win: bool):
+    """在内存中记录一局已结束的游戏，由后台任务定期批量写入"""
+    prefix = "hardmode" if hardmode else "regular"
+    pending[f"{prefix}_game_count"] += 1
+    if bot_win:
+        pending[f"{prefix}_bot_win_count"] += 1
+
+
+async def flush():
+    """将累计的增量以单条`UPDATE`写入当前AI版本对应的统计行"""
+    if not pending:
+        return
+
+    deltas = dict(pending)
+    pending.clear()
+    try:
+        async with get_session() as session:
+            await session.execute(
+                update(SwindlestonesStatistics)
+                .where(SwindlestonesStatistics.version == AI_VERSION)
+                .values(
+                    {
+                        k: getattr(SwindlestonesStatistics, k) + v
+                        for k, v in deltas.items()
+                    }
+                )
+            )
+            await session.commit()
+    except Exception as e:
+        pending.update(deltas)
+        logger.opt(exception=e).error(type(e).__name__)
+
+
+async def _flush_periodically(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        await flush()
+
+
+@driver.on_startup
+async def _():
+    async with get_session() as session:
+        if not await session.scalar(
+            select(SwindlestonesStatistics).where(
+                SwindlestonesStatistics.version == AI_VERSION
+            )
+        ):
+            session.add(SwindlestonesStatistics())
+            await session.commit()
+
+    global _flush_task
+    _flush_task = asyncio.create_task(
+        _flush_periodically(config.swindlestones_statistics_flush_interval)
+    )
+
+
+@driver.on_shutdown
+async def _():
+    if _flush_task:
+        _flush_task.cancel()
+    await flush()
@@ -1,14 +1,33 @@
 from nonebot_plugin_orm import Model
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped, mapped_column
+from typing import NamedTuple
 
 class Account(Model):
     id: Mapped[int] = mapped_column(primary_key=True)
     register_time: Mapped[float]
-    coin: Mapped[int]
+    coin: Mapped[int] = mapped_column(index=True)
     last_checkin_time: Mapped[float]
 
 class Nickname(Model):
+    # 群内按昵称查找账户、按群删除昵称均使用(group_id, nickname)索引；昵称在群内不要求唯一
+    __table_args__ = (Index("ix_account_management_nickname_group_id_nickname", "group_id", "nickname"),)
+
     session_id: Mapped[str] = mapped_column(primary_key=True)
-    user_id: Mapped[int]
+    user_id: Mapped[int] = mapped_column(index=True)
     group_id: Mapped[int]
     nickname: Mapped[str]
+
+# 只读记录：由Core查询的结果行直接构造，不进入会话的identity map，提交后也不会过期；字段与对应的模型一致
+
+class AccountRecord(NamedTuple):
+    id: int
+    register_time: float
+    coin: int
+    last_checkin_time: float
+
+class NicknameRecord(NamedTuple):
+    session_id: str
+    user_id: int
+    group_id: int
+    nickname: str
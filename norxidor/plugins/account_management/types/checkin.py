@@ -0,0 +1,12 @@
+from nonebot_plugin_orm import Model
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class CheckinHistory(Model):
+    """账户每月的签到记录"""
+
+    user_id: Mapped[int] = mapped_column(primary_key=True)
+    year: Mapped[int] = mapped_column(primary_key=True)
+    month: Mapped[int] = mapped_column(primary_key=True)
+    days: Mapped[int] = mapped_column(default=0)
+    """第`i`位表示该月第`i + 1`天是否签到"""
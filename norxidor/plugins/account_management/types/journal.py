@@ -0,0 +1,34 @@
+from enum import IntEnum, unique
+from nonebot_plugin_orm import Model
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+@unique
+class Reason(IntEnum):
+    """余额变动的原因"""
+
+    OPENING = 0
+    """期初余额（开始记录流水前已有的余额）"""
+    CHECKIN = 1
+    """签到"""
+    BET = 2
+    """Swindlestones下注"""
+    PAYOUT = 3
+    """Swindlestones赢得奖励"""
+    REFUND = 4
+    """Swindlestones退还赌注"""
+    ADMIN = 5
+    """管理员修改"""
+    DELETE = 6
+    """账户被删除时清零"""
+
+
+class CoinJournal(Model):
+    """只追加的余额流水，账户的余额应等于其全部流水的`delta`之和"""
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(index=True)
+    delta: Mapped[int]
+    reason: Mapped[int]
+    """`Reason`"""
+    time: Mapped[float]
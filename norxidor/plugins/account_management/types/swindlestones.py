@@ -0,0 +1,10 @@
+from ..swindlestones.constants import AI_VERSION
+from nonebot_plugin_orm import Model
+from sqlalchemy.orm import Mapped, mapped_column
+
+class SwindlestonesStatistics(Model):
+    version: Mapped[int] = mapped_column(primary_key=True, default=AI_VERSION)
+    regular_game_count: Mapped[int] = mapped_column(default=0)
+    regular_bot_win_count: Mapped[int] = mapped_column(default=0)
+    hardmode_game_count: Mapped[int] = mapped_column(default=0)
+    hardmode_bot_win_count: Mapped[int] = mapped_column(default=0)
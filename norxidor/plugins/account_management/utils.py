@@ -1,8 +1,13 @@
 import re
-from .types.account import Account, Nickname
+import time
+from . import config, names
+from .types.account import Account, AccountRecord, Nickname, NicknameRecord
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
 from nonebot.adapters.onebot.v11 import MessageSegment
-from nonebot_plugin_orm import async_scoped_session
-from sqlalchemy import select
+from nonebot_plugin_orm import Model, async_scoped_session
+from sqlalchemy import Select, select
+from typing import Any, TypeVar
 
 
 def get_target_from_msg(msg: str | MessageSegment) -> int | str | None:
@@ -17,21 +22,250 @@ def get_target_from_msg(msg: str | MessageSegment) -> int | str | None:
     return target
 
 
+# region cache
+
+_MISSING = object()
+
+
+class TTLCache:
+    """带过期时间的LRU缓存，记录命中与未命中次数"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Any:
+        """命中时返回缓存的值（可能为`None`），否则返回`_MISSING`"""
+        item = self._data.get(key)
+        if item is None or item[0] < time.monotonic():
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return _MISSING
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def set(self, key: Hashable, value: Any):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def pop_where(self, predicate: Callable[[Hashable, Any], bool]):
+        for key in [k for k, (_, v) in self._data.items() if predicate(k, v)]:
+            del self._data[key]
+
+    def clear(self):
+        self._data.clear()
+
+
+account_cache = TTLCache(config.account_cache_size, config.account_cache_ttl)
+"""`{ 账户id: AccountRecord | None }`"""
+
+nickname_cache = TTLCache(config.account_cache_size, config.account_cache_ttl)
+"""`{ session_id: NicknameRecord | None }`与`{ (group_id, 昵称): NicknameRecord | None }`"""
+
+# 读取均为Core查询，返回只读记录而非ORM对象；需要修改时使用`update`/`insert`语句
+
+R = TypeVar("R", AccountRecord, NicknameRecord)
+
+
+def _select(record: type[R], model: type[Model]) -> Select:
+    return select(*(getattr(model, x) for x in record._fields))
+
+
+async def _first(record: type[R], stmt: Select, session: async_scoped_session) -> R | None:
+    row = (await session.execute(stmt)).first()
+    return record._make(row) if row else None
+
+
+async def get_account(user_id: int, session: async_scoped_session) -> AccountRecord | None:
+    """带缓存的按id查询账户"""
+    res = account_cache.get(user_id)
+    if res is _MISSING:
+        res = await _first(AccountRecord, _select(AccountRecord, Account).where(Account.id == user_id), session)
+        account_cache.set(user_id, res)
+    return res
+
+
+async def get_nickname(session_id: str, session: async_scoped_session) -> NicknameRecord | None:
+    """带缓存的按session_id查询群昵称"""
+    res = nickname_cache.get(session_id)
+    if res is _MISSING:
+        res = await _first(
+            NicknameRecord, _select(NicknameRecord, Nickname).where(Nickname.session_id == session_id), session
+        )
+        nickname_cache.set(session_id, res)
+    return res
+
+
+async def find_nickname(group_id: int | None, nickname: str, session: async_scoped_session) -> NicknameRecord | None:
+    """带缓存的按群昵称查询"""
+    res = nickname_cache.get((group_id, nickname))
+    if res is _MISSING:
+        res = await _first(
+            NicknameRecord,
+            _select(NicknameRecord, Nickname).where(Nickname.group_id == group_id, Nickname.nickname == nickname),
+            session,
+        )
+        nickname_cache.set((group_id, nickname), res)
+    return res
+
+
+def invalidate_account(user_id: int | None = None):
+    """账户的字段（如余额、签到时间）被修改或账户被删除后调用，`user_id`为`None`时清除全部"""
+    if user_id is None:
+        account_cache.clear()
+    else:
+        account_cache.pop(user_id)
+
+
+def invalidate_nickname(group_id: int | None = None, user_id: int | None = None):
+    """群昵称被添加、修改或删除后调用，`user_id`为`None`时清除整个群，均为`None`时清除全部"""
+    if group_id is None and user_id is None:
+        nickname_cache.clear()
+        return
+
+    def predicate(key: Hashable, record: NicknameRecord | None) -> bool:
+        if isinstance(key, str):  # session_id: group_{group_id}_{user_id}
+            _group_id, _user_id = (
+                (record.group_id, record.user_id) if record else map(int, key.split("_")[1:3])
+            )
+            return (group_id is None or _group_id == group_id) and (user_id is None or _user_id == user_id)
+        # 按昵称查询的结果，未找到的结果也可能因新昵称而失效
+        return (group_id is None or key[0] == group_id) and (
+            record is None or user_id is None or record.user_id == user_id
+        )
+
+    nickname_cache.pop_where(predicate)
+
+
+# endregion
+
+
 async def find_account(
     target: str | int, group_id: int | None, session: async_scoped_session
-) -> tuple[Account | None, Nickname | None]:
+) -> tuple[AccountRecord | None, NicknameRecord | None]:
     account, nickname = None, None
     if type(target) is int:
-        account = await session.get(Account, target)
+        account = await get_account(target, session)
         if group_id:
-            nickname = await session.get(Nickname, f"group_{group_id}_{target}")
+            nickname = await get_nickname(f"group_{group_id}_{target}", session)
     else:
-        nickname = await session.scalar(
-            select(Nickname).where(
-                Nickname.group_id == group_id, Nickname.nickname == target
-            )
-        )
+        nickname = await find_nickname(group_id, target, session)
         if nickname:
-            account = await session.get(Account, nickname.user_id)
+            account = await get_account(nickname.user_id, session)
 
     return (account, nickname)
+
+
+async def find_accounts(
+    targets: list[str | int], group_id: int | None, session: async_scoped_session
+) -> list[tuple[AccountRecord | None, NicknameRecord | None]]:
+    """批量版的`find_account`，结果与`targets`一一对应；未命中缓存的昵称与账户各用一次`IN`查询载入"""
+    nickname_keys: dict[Hashable, NicknameRecord | None] = {}
+    for target in targets:
+        if type(target) is int:
+            if group_id:
+                nickname_keys[f"group_{group_id}_{target}"] = None
+        else:
+            nickname_keys[(group_id, target)] = None
+
+    missing = []
+    for key in nickname_keys:
+        record = nickname_cache.get(key)
+        if record is _MISSING:
+            missing.append(key)
+        else:
+            nickname_keys[key] = record
+    if missing:
+        session_ids = [x for x in missing if isinstance(x, str)]
+        names = [x[1] for x in missing if not isinstance(x, str)]
+        res = await session.execute(
+            _select(NicknameRecord, Nickname).where(
+                Nickname.session_id.in_(session_ids)
+                | ((Nickname.group_id == group_id) & Nickname.nickname.in_(names))
+            )
+        )
+        found: dict[Hashable, NicknameRecord] = {}
+        for nickname in map(NicknameRecord._make, res):
+            found[nickname.session_id] = nickname
+            found.setdefault((nickname.group_id, nickname.nickname), nickname)
+        for key in missing:
+            nickname_keys[key] = found.get(key)
+            nickname_cache.set(key, found.get(key))
+
+    def user_id_of(target: str | int) -> int | None:
+        if type(target) is int:
+            return target
+        nickname = nickname_keys[(group_id, target)]
+        return nickname.user_id if nickname else None
+
+    accounts: dict[int, AccountRecord | None] = {}
+    for user_id in map(user_id_of, targets):
+        if user_id is not None:
+            accounts[user_id] = None
+
+    missing = []
+    for user_id in accounts:
+        record = account_cache.get(user_id)
+        if record is _MISSING:
+            missing.append(user_id)
+        else:
+            accounts[user_id] = record
+    if missing:
+        res = await session.execute(_select(AccountRecord, Account).where(Account.id.in_(missing)))
+        found = {x.id: x for x in map(AccountRecord._make, res)}
+        for user_id in missing:
+            accounts[user_id] = found.get(user_id)
+            account_cache.set(user_id, found.get(user_id))
+
+    res = []
+    for target in targets:
+        user_id = user_id_of(target)
+        account = accounts[user_id] if user_id is not None else None
+        if type(target) is int:
+            nickname = nickname_keys.get(f"group_{group_id}_{target}")
+        else:
+            nickname = nickname_keys[(group_id, target)]
+        res.append((account, nickname))
+    return res
+
+
+async def match_targets(
+    targets: list[str | int], group_id: int | None, session: async_scoped_session, exact: bool = False
+) -> tuple[list[str | int], dict[str, list[str]]]:
+    """以群昵称索引补全`targets`中的昵称，返回补全后的目标与`{ 未能确定的昵称: [候选昵称] }`
+
+    昵称不存在时依次尝试前缀匹配与模糊匹配，只有一个匹配时替换为该昵称；没有匹配的昵称保持不变。
+    `exact`为`True`时（修改数据的命令）不自动替换，前缀或模糊匹配到的候选即使只有一个也作为未能确定的昵称返回
+    """
+    res, ambiguous = [], {}
+    for target in targets:
+        if type(target) is str and group_id:
+            matches = await names.nicknames.match(group_id, target, session)
+            if matches == [target]:
+                pass
+            elif len(matches) == 1 and not exact:
+                target = matches[0]
+            elif matches:
+                ambiguous[target] = matches
+        res.append(target)
+    return res, ambiguous
+
+
+def ambiguous_message(ambiguous: dict[str, list[str]]) -> str:
+    return "\n".join(
+        f"“{k}”匹配到多个昵称：{'、'.join(v)}" if len(v) > 1 else f"未找到“{k}”，是否为“{v[0]}”？"
+        for k, v in ambiguous.items()
+    ) + "\n请提供完整的昵称"
@@ -46,8 +46,13 @@ async def _(
     if target is None:
         await matcher.finish("请提供合法目标")
 
-    character = await utils.find_character(target, event.group_id, session)
+    character = await utils.find_character(target, event.group_id, session, exact=True)
     if not character:
+        # 删除角色只接受完全一致的角色名，前缀或模糊匹配的结果只作为候选提示
+        if type(target) is str and (matches := await utils.characters.match(event.group_id, target, session)):
+            if len(matches) > 1:
+                await matcher.finish(f"“{target}”匹配到多个角色：{'、'.join(matches)}\n请提供完整的角色名")
+            await matcher.finish(f"未找到“{target}”，是否为“{matches[0]}”？\n请提供完整的角色名")
         await matcher.finish("未找到符合的角色")
     state["character"] = character
     await matcher.send(
@@ -66,11 +71,13 @@ async def _(
     if conformation != "YES":
         await matcher.finish("已取消操作。")
 
+    character_id = state["character"].id
     try:
         await session.execute(
-            delete(Character).where(Character.id == state["character"].id)
+            delete(Character).where(Character.id == character_id)
         )
         await session.commit()
+        utils.characters.remove(event.group_id, character_id)
         await matcher.finish("角色已删除完毕。")
     except MatcherException:
         raise
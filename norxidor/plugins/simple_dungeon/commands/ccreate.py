@@ -4,6 +4,7 @@ from ..types.alignment import Alignment
 from ..types.character import Gender, Character
 from ..types.character_class import CharacterClass
 from ..types.race import Race
+from .. import utils
 from ... import account_management
 from nonebot import on_command, logger
 from nonebot.adapters import MessageTemplate
@@ -14,7 +15,7 @@ from nonebot.params import ArgPlainText
 from nonebot.rule import is_type
 from nonebot.typing import T_State
 from nonebot_plugin_orm import async_scoped_session
-from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 
 BAR_STRING = nonebot.get_driver().config.bar_string
 
@@ -41,7 +42,7 @@ async def _(
             "尊敬的" + MessageSegment.at(event.user_id) + "，您尚未注册账户，请先注册！（使用命令【/(register|注册) [昵称]】注册，昵称为可选项，使用时需at本机器人）"
         )
 
-    if await session.get(Character, event.get_session_id()):
+    if await utils.get_character_record(event.get_session_id(), session):
         await matcher.finish(
             f"亲爱的{(nickname.nickname+' ') if nickname else ''}"
             + MessageSegment.at(event.user_id)
@@ -62,13 +63,9 @@ async def _(
         await matcher.finish("已退出角色创建。")
     elif len(name.strip()) == 0:
         await matcher.reject("用户名不能为空，请重新输入！")
-    elif name.lower() in reserved_names:
+    elif name.strip().lower() in reserved_names:
         await matcher.reject("该名称被保留，请重新输入！")
-    elif await session.scalar(
-        select(Character).where(
-            Character.group_id == event.group_id, Character.name == name
-        )
-    ):
+    elif await utils.is_name_taken(event.group_id, name.strip(), session):
         await matcher.reject("该名称已有其他角色使用，请重新输入！")
     state["character"]["name"] = name.strip()
 
@@ -222,12 +219,19 @@ async def _(
     if conformation.lower() not in ("yes", "确认"):
         await matcher.finish("角色创建已取消。")
 
-    session.add(state["character"]["instance"])
+    character: Character = state["character"]["instance"]
+    id, name = character.id, character.name
+    session.add(character)
     try:
         await session.commit()
+        utils.characters.set(event.group_id, id, name)
         await matcher.finish("角色创建完毕！")
     except MatcherException:
         raise
+    except IntegrityError:
+        # 群内角色名由唯一索引保证，同时进行的另一次创建可能已先使用了该名称
+        await session.rollback()
+        await matcher.finish("该名称已有其他角色使用，或您已在别处创建了角色，角色创建失败")
     except Exception as e:
         logger.opt(exception=e).error(type(e).__name__)
         await matcher.finish("角色创建失败")
@@ -1,4 +1,5 @@
 from ..types.character import Character
+from .. import utils
 from ... import account_management
 from nonebot import on_command, logger
 from nonebot.adapters.onebot.v11 import GroupMessageEvent, MessageSegment
@@ -35,7 +36,7 @@ async def _(
             "尊敬的" + MessageSegment.at(event.user_id) + "，您尚未注册账户，请先注册！（使用命令【/(register|注册) [昵称 】注册，昵称为可选项，使用时需at本机器人）"
         )
     
-    state["character"] = await session.get(Character, event.get_session_id())
+    state["character"] = await utils.get_character_record(event.get_session_id(), session)
     if not state["character"]:
         await matcher.finish(
             ("亲爱" if account else "尊敬") + f"的{(nickname.nickname+' ') if nickname else ''}"
@@ -43,7 +44,6 @@ async def _(
             + "，您尚未创建角色！（使用命令【/(ccreate|创建角色)】创建角色）"
         )
     else:
-        logger.debug("Classes: "+", ".join([x.name for x in state["character"].classes]))
         await matcher.send(
             f"亲爱的{(nickname.nickname+' ') if nickname else ''}"
             + MessageSegment.at(event.user_id)
@@ -66,6 +66,7 @@ async def _(
             delete(Character).where(Character.id == state["character"].id)
         )
         await session.commit()
+        utils.characters.remove(event.group_id, state["character"].id)
         await matcher.finish("角色已删除完毕。")
     except MatcherException:
         raise
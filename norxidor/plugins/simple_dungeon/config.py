@@ -3,3 +3,13 @@ from pydantic import BaseModel
 
 class Config(BaseModel):
     """Plugin Config Here"""
+    dice_max_count: int = 1_000_000_000
+    """骰子项的最大骰子个数"""
+    dice_max_faces: int = 10000
+    """骰子的最大面数"""
+    dice_max_terms: int = 20
+    """表达式中骰子项与常数项的最大个数"""
+    dice_max_length: int = 200
+    """表达式的最大长度"""
+    dice_max_explosions: int = 100
+    """爆骰的最大轮数"""
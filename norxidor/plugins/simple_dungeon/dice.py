@@ -0,0 +1,233 @@
+import numpy as np
+import re
+from . import config
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+# 骰子表达式
+#
+# 表达式由骰子项、整数常数、`+ - * /`（`/`为向下取整的整除）与括号组成，例如`4d6kh3 + 2`、`(d20 + 5) * 2`、`2d10!r1`。
+# 骰子项为`[N]dF`或`[N]d%`，其后可依次跟随以下修饰（每种至多一个）：
+#
+# - `rX`：点数不大于`X`的骰子重投一次
+# - `!`：投出最大点数的骰子再投一个，新投出的最大点数继续爆骰，至多`config.dice_max_explosions`轮
+# - `khK`/`kK`、`klK`：只保留点数最高/最低的`K`个骰子
+#
+# 表达式先解析为语法树并按字符串缓存；求值时每个骰子项只记录各点数出现的次数，以一次多项分布抽样代替逐个投骰，
+# 重投、爆骰与保留也都在计数上完成，因此耗时只与面数有关，与骰子个数无关。
+
+TOKEN = re.compile(r"\s*(\d+|kh|kl|[dk!r%()+\-*/])", re.IGNORECASE)
+
+rng = np.random.default_rng()
+
+
+class DiceError(ValueError):
+    """表达式不合法或超出限制"""
+
+
+class Node(ABC):
+    __slots__ = ()
+
+    @abstractmethod
+    def evaluate(self) -> int:
+        """求值，每次调用重新投骰"""
+
+
+class Constant(Node):
+    __slots__ = ("value",)
+
+    def __init__(self, value: int):
+        self.value = value
+
+    def evaluate(self) -> int:
+        return self.value
+
+
+class Negative(Node):
+    __slots__ = ("operand",)
+
+    def __init__(self, operand: Node):
+        self.operand = operand
+
+    def evaluate(self) -> int:
+        return -self.operand.evaluate()
+
+
+class BinaryOperation(Node):
+    __slots__ = ("operator", "left", "right")
+
+    def __init__(self, operator: str, left: Node, right: Node):
+        self.operator = operator
+        self.left = left
+        self.right = right
+
+    def evaluate(self) -> int:
+        left, right = self.left.evaluate(), self.right.evaluate()
+        if self.operator == "+":
+            return left + right
+        if self.operator == "-":
+            return left - right
+        if self.operator == "*":
+            return left * right
+        if right == 0:
+            raise DiceError("除数为0")
+        return left // right
+
+
+class Dice(Node):
+    __slots__ = ("count", "faces", "reroll", "explode", "keep", "p", "values")
+
+    def __init__(
+        self,
+        count: int,
+        faces: int,
+        reroll: int = 0,
+        explode: bool = False,
+        keep: int | None = None,
+    ):
+        self.count = count
+        self.faces = faces
+        self.reroll = reroll
+        """点数不大于该值的骰子重投一次，0为不重投"""
+        self.explode = explode
+        self.keep = keep
+        """保留的骰子数，正数为最高的若干个，负数为最低的若干个，`None`为全部保留"""
+        self.p = np.full(faces, 1 / faces)
+        self.values = np.arange(1, faces + 1, dtype=np.int64)
+
+    def counts(self) -> np.ndarray:
+        """各点数（1~`faces`）出现的次数"""
+        counts = rng.multinomial(self.count, self.p)
+        if self.reroll:
+            rerolled = counts[: self.reroll].sum()
+            counts[: self.reroll] = 0
+            counts += rng.multinomial(rerolled, self.p)
+        if self.explode:
+            exploded = counts[-1]
+            for _ in range(config.dice_max_explosions):
+                if not exploded:
+                    break
+                extra = rng.multinomial(exploded, self.p)
+                counts += extra
+                exploded = extra[-1]
+        if self.keep is not None:
+            # 从保留的一端起累计，超出保留数的部分丢弃
+            ordered = counts[::-1] if self.keep > 0 else counts
+            before = np.cumsum(ordered) - ordered
+            ordered[:] = np.clip(abs(self.keep) - before, 0, ordered)
+        return counts
+
+    def evaluate(self) -> int:
+        return int(self.counts() @ self.values)
+
+
+class Parser:
+    def __init__(self, expression: str):
+        self.tokens = tokenize(expression)
+        self.position = 0
+        self.terms = 0
+
+    def peek(self) -> str | None:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def next(self) -> str:
+        if (token := self.peek()) is None:
+            raise DiceError("表达式不完整")
+        self.position += 1
+        return token
+
+    def number(self) -> int:
+        token = self.next()
+        if not token.isdigit():
+            raise DiceError(f"“{token}”处应为数字")
+        return int(token)
+
+    def parse(self) -> Node:
+        node = self.expression()
+        if (token := self.peek()) is not None:
+            raise DiceError(f"无法解析“{token}”")
+        return node
+
+    def expression(self) -> Node:
+        node = self.term()
+        while self.peek() in ("+", "-"):
+            node = BinaryOperation(self.next(), node, self.term())
+        return node
+
+    def term(self) -> Node:
+        node = self.factor()
+        while self.peek() in ("*", "/"):
+            node = BinaryOperation(self.next(), node, self.factor())
+        return node
+
+    def factor(self) -> Node:
+        if self.peek() == "-":
+            self.next()
+            return Negative(self.factor())
+        if self.peek() == "(":
+            self.next()
+            node = self.expression()
+            if self.next() != ")":
+                raise DiceError("括号不匹配")
+            return node
+
+        self.terms += 1
+        if self.terms > config.dice_max_terms:
+            raise DiceError(f"骰子与常数项不能多于{config.dice_max_terms}个")
+        count = self.number() if self.peek() != "d" else 1
+        if self.peek() != "d":
+            return Constant(count)
+        self.next()
+        return self.dice(count)
+
+    def dice(self, count: int) -> Dice:
+        if self.peek() == "%":
+            self.next()
+            faces = 100
+        else:
+            faces = self.number()
+        if not 0 < count <= config.dice_max_count:
+            raise DiceError(f"骰子个数须在1~{config.dice_max_count}之间")
+        if not 0 < faces <= config.dice_max_faces:
+            raise DiceError(f"骰子面数须在1~{config.dice_max_faces}之间")
+
+        modifiers: dict[str, int | None] = {}
+        while (token := self.peek()) in ("r", "!", "k", "kh", "kl"):
+            self.next()
+            key = "k" if token.startswith("k") else token
+            if key in modifiers:
+                raise DiceError(f"修饰“{token}”重复")
+            modifiers[key] = None if token == "!" else -self.number() if token == "kl" else self.number()
+
+        if modifiers.get("k", 1) == 0:
+            raise DiceError("保留的骰子数须大于0")
+        reroll = modifiers.get("r") or 0
+        if reroll >= faces:
+            raise DiceError("重投的点数须小于骰子面数")
+        if "!" in modifiers and faces == 1:
+            raise DiceError("单面骰不能爆骰")
+        return Dice(count, faces, reroll, "!" in modifiers, modifiers.get("k"))
+
+
+def tokenize(expression: str) -> list[str]:
+    tokens, position = [], 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        if not (match := TOKEN.match(expression, position)):
+            raise DiceError(f"无法解析“{expression[position:].strip()[:10]}”")
+        tokens.append(match.group(1).lower())
+        position = match.end()
+    return tokens
+
+
+@lru_cache(maxsize=256)
+def parse(expression: str) -> Node:
+    """解析表达式，结果按表达式字符串缓存"""
+    if len(expression) > config.dice_max_length:
+        raise DiceError(f"表达式不能长于{config.dice_max_length}个字符")
+    return Parser(expression).parse()
+
+
+def roll(expression: str) -> int:
+    """对骰子表达式求值"""
+    return parse(expression).evaluate()
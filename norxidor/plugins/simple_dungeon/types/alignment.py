@@ -7,7 +7,9 @@ from typing import Self
 @unique
 class Alignment(IntFlag):
     def __new__(cls, value, *args, **kwargs):
-        return IntFlag.__new__(cls, value)
+        obj = int.__new__(cls, value)
+        obj._value_ = value
+        return obj
     
     def __init__(self, value, name_zh: str, abbr: str, index: int = -1):
         self.name_zh = name_zh
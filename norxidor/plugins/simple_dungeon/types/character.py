@@ -3,8 +3,10 @@ from ..types.character_class import CharacterClass
 from ..types.race import Race
 from enum import Enum, unique, auto
 from nonebot_plugin_orm import Model
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.ext.hybrid import hybrid_property
+from typing import NamedTuple
 
 @unique
 class Gender(Enum):
@@ -17,8 +19,11 @@ class Gender(Enum):
     """
 
 class Character(Model):
+    # 角色名在群内唯一（见`ccreate`），按名称查找角色使用该索引；删除账户时按user_id删除角色
+    __table_args__ = (Index("ix_simple_dungeon_character_group_id_name", "group_id", "name", unique=True),)
+
     id: Mapped[str] = mapped_column(primary_key=True)
-    user_id: Mapped[int]
+    user_id: Mapped[int] = mapped_column(index=True)
     group_id: Mapped[int]
     name: Mapped[str]
     gender: Mapped[Gender]
@@ -55,4 +60,11 @@ class Character(Model):
 感知：{self.wis_}
 魅力：{self.cha_}\
 {f'经验值：{self.exp}'+chr(10) if not no_stat else ''}\
-{f'金币：{self.gold}'+chr(10) if not no_stat else ''}"""
\ No newline at end of file
+{f'金币：{self.gold}'+chr(10) if not no_stat else ''}"""
+
+class CharacterRecord(NamedTuple):
+    """角色的只读记录，由Core查询直接构造，字段与`Character`一致"""
+    id: str
+    user_id: int
+    group_id: int
+    name: str
@@ -1,10 +1,20 @@
-import random
-from .types.character import Character
+from . import dice
+from .types.character import Character, CharacterRecord
 from .. import account_management
-from ..account_management.types.account import Account, Nickname
 from nonebot_plugin_orm import async_scoped_session
 from sqlalchemy import select
 
+characters = account_management.names.NameIndex(Character.group_id, Character.id, Character.name)
+"""群内角色名索引，key为角色id"""
+
+# 删除账户或群数据时一并删除角色
+account_management.purge.register(
+    Character,
+    user_column=Character.user_id,
+    group_column=Character.group_id,
+    on_delete=lambda job: characters.invalidate(job.id if job.kind == "group" else None),
+)
+
 def roll(n: int, f: int, m: int=0) -> int:
     """骰子roll点
 
@@ -16,10 +26,7 @@ def roll(n: int, f: int, m: int=0) -> int:
     Returns:
         int: roll点结果
     """
-    res = m
-    for _ in range(n):
-        res += random.randint(1, f)
-    return res
+    return dice.Dice(n, f).evaluate() + m
 
 def d20() -> int:
     """投一个20面骰
@@ -29,9 +36,31 @@ def d20() -> int:
     """
     return roll(1, 20)
 
-async def find_character(target: int | str, group_id: int, session: async_scoped_session) -> Character | None:
+async def find_character(
+    target: int | str, group_id: int, session: async_scoped_session, exact: bool = False
+) -> Character | None:
+    """按账户（QQ号或群昵称）或角色名查找角色
+
+    角色名不存在时使用唯一的前缀或模糊匹配；`exact`为`True`时（修改数据的命令）只接受完全一致的角色名
+    """
     account, _ = await account_management.utils.find_account(target, group_id, session)
     if not account:
-        return await session.scalar(select(Character).where(Character.name == target, Character.group_id == group_id))
+        if type(target) is not str:
+            return None
+        matches = await characters.match(group_id, target, session)
+        if len(matches) != 1 or (exact and matches[0] != target):
+            return None
+        return await session.scalar(select(Character).where(Character.name == matches[0], Character.group_id == group_id))
     else:
-        return await session.scalar(select(Character).where(Character.id == f"group_{group_id}_{account.id}"))
\ No newline at end of file
+        return await session.scalar(select(Character).where(Character.id == f"group_{group_id}_{account.id}"))
+
+async def get_character_record(id: str, session: async_scoped_session) -> CharacterRecord | None:
+    """以Core查询读取角色的只读记录"""
+    row = (
+        await session.execute(select(*(getattr(Character, x) for x in CharacterRecord._fields)).where(Character.id == id))
+    ).first()
+    return CharacterRecord._make(row) if row else None
+
+async def is_name_taken(group_id: int, name: str, session: async_scoped_session) -> bool:
+    """群内是否已有使用该名称的角色（查询内存中的角色名索引）"""
+    return await characters.contains(group_id, name, session)
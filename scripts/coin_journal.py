@@ -0,0 +1,115 @@
+"""余额流水校验与重建
+
+按账户id分块（每块一次`IN`+`GROUP BY`聚合查询）将账户余额与其全部流水之和比对，不会一次载入整张流水表。
+
+流水先缓冲在内存中，由后台任务批量写入（至多`coin_journal_flush_interval`秒或`coin_journal_batch_size`条），
+机器人异常退出或写入失败时，已提交的余额变动对应的流水可能丢失，因此流水之和可能落后于余额，余额才是准确的。
+`--rebuild`为不一致的账户补写一条`ADMIN`流水（差额），使流水之和等于余额，不修改余额；
+只有确认流水正确而余额有误时，才以`--restore`对逐一列出的账户将余额改为流水之和，且须加`--yes`才会执行。
+以上操作会直接修改数据库，须在机器人停止运行（缓冲的流水已写入）时进行。在项目根目录下运行：
+
+    python -m scripts.coin_journal [--init | --rebuild | --restore ID [ID ...] [--yes]] [--chunk-size 1000]
+"""
+
+import argparse
+import asyncio
+import nonebot
+import sys
+import time
+
+nonebot.init()
+nonebot.load_plugin("nonebot_plugin_orm")
+nonebot.load_plugin("norxidor.plugins.account_management")
+
+from nonebot import logger
+from nonebot_plugin_orm import get_session
+from norxidor.plugins.account_management.types.account import Account
+from norxidor.plugins.account_management.types.journal import CoinJournal, Reason
+from sqlalchemy import func, insert, select, update
+
+logger.remove()
+logger.add(sys.stderr, level="WARNING")
+
+parser = argparse.ArgumentParser(description="以余额流水校验或重建账户余额")
+mode = parser.add_mutually_exclusive_group()
+mode.add_argument("--init", action="store_true", help="为尚无任何流水的账户补写期初余额")
+mode.add_argument("--rebuild", action="store_true", help="为余额与流水之和不一致的账户补写差额流水，不修改余额")
+mode.add_argument("--restore", type=int, nargs="+", metavar="ID", help="将列出的账户的余额改为流水之和")
+parser.add_argument("--yes", action="store_true", help="确认执行--restore，否则只显示将要修改的账户")
+parser.add_argument("--chunk-size", type=int, default=1000, help="每块的账户数，默认为1000")
+parser.add_argument("--show", type=int, default=10, help="最多显示的不一致账户数，默认为10")
+
+
+async def main(args: argparse.Namespace):
+    checked, mismatched, fixed = 0, 0, 0
+    mismatches: list[tuple[int, int, int]] = []
+    last_id = None
+    async with get_session() as session:
+        while True:
+            stmt = select(Account.id, Account.coin).order_by(Account.id).limit(args.chunk_size)
+            if args.restore:
+                stmt = stmt.where(Account.id.in_(args.restore))
+            if last_id is not None:
+                stmt = stmt.where(Account.id > last_id)
+            accounts = dict(tuple(x) for x in await session.execute(stmt))
+            if not accounts:
+                break
+            last_id = max(accounts)
+            sums = dict(
+                tuple(x)
+                for x in await session.execute(
+                    select(CoinJournal.user_id, func.sum(CoinJournal.delta))
+                    .where(CoinJournal.user_id.in_(accounts))
+                    .group_by(CoinJournal.user_id)
+                )
+            )
+            checked += len(accounts)
+
+            if args.init:
+                rows = [
+                    dict(user_id=id, delta=coin, reason=Reason.OPENING, time=time.time())
+                    for id, coin in accounts.items()
+                    if id not in sums
+                ]
+                if rows:
+                    await session.execute(insert(CoinJournal), rows)
+                    await session.commit()
+                fixed += len(rows)
+                continue
+
+            rows = []
+            for id, coin in accounts.items():
+                if coin != sums.get(id, 0):
+                    mismatched += 1
+                    if len(mismatches) < args.show:
+                        mismatches.append((id, coin, sums.get(id, 0)))
+                    if args.rebuild:
+                        rows.append(dict(user_id=id, delta=coin - sums.get(id, 0), reason=Reason.ADMIN, time=time.time()))
+                    elif args.restore and args.yes:
+                        await session.execute(
+                            update(Account).where(Account.id == id).values(coin=sums.get(id, 0))
+                        )
+                        fixed += 1
+            if rows:
+                await session.execute(insert(CoinJournal), rows)
+                fixed += len(rows)
+            if args.rebuild or args.restore and args.yes:
+                await session.commit()
+
+    print(f"账户：{checked}个")
+    if args.init:
+        print(f"补写期初余额：{fixed}个账户")
+        return
+    if args.restore and not args.yes:
+        print("未加--yes，未修改余额")
+    print(
+        f"不一致：{mismatched}个账户"
+        + (f"，已补写{fixed}条差额流水" if args.rebuild else "")
+        + (f"，已将{fixed}个账户的余额改为流水之和" if args.restore and args.yes else "")
+    )
+    for id, coin, total in mismatches:
+        print(f"{id}：余额{coin}，流水之和{total}，差额{coin - total:+}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parser.parse_args()))
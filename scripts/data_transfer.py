@@ -0,0 +1,112 @@
+"""插件数据导出与导入
+
+以JSONL格式流式导出或导入各插件（`account_management`、`simple_dungeon`）的全部数据表，用于更换数据库后端或在环境间复制数据。
+数据库由`SQLALCHEMY_DATABASE_URL`等`nonebot_plugin_orm`配置指定；表结构从数据库中反射，导入前目标数据库须已建好表结构
+（启动一次机器人或运行`nb orm upgrade`）且各表为空。在项目根目录下运行：
+
+    python -m scripts.data_transfer export path/to/dump.jsonl
+    SQLALCHEMY_DATABASE_URL=... python -m scripts.data_transfer import path/to/dump.jsonl
+
+导出文件中每张表以一行`{"table": 表名, "columns": [列名, ...]}`开头，其后每行为一行数据的列值数组。
+"""
+
+import argparse
+import asyncio
+import json
+import nonebot
+import sys
+import time
+from pathlib import Path
+
+nonebot.init()
+nonebot.load_plugin("nonebot_plugin_orm")
+
+from nonebot import logger
+from nonebot_plugin_orm import get_session
+from sqlalchemy import MetaData, Table, func, insert, select
+
+logger.remove()
+logger.add(sys.stderr, level="WARNING")
+
+TABLE_PREFIXES = ("account_management_", "simple_dungeon_")
+
+parser = argparse.ArgumentParser(description="流式导出或导入插件数据")
+parser.add_argument("action", choices=["export", "import"], help="导出或导入")
+parser.add_argument("path", type=Path, help="JSONL文件")
+parser.add_argument("--chunk-size", type=int, default=10000, help="每批读取或插入的行数，默认为10000")
+
+
+async def reflect(session) -> dict[str, Table]:
+    metadata = MetaData()
+    conn = await session.connection()
+    await conn.run_sync(
+        lambda conn: metadata.reflect(conn, only=lambda name, _: name.startswith(TABLE_PREFIXES))
+    )
+    return dict(metadata.tables)
+
+
+def report(table: str, rows: int, start: float):
+    print(f"\r{table}：{rows}行，{time.perf_counter() - start:.1f}s", end="", file=sys.stderr)
+
+
+async def export(path: Path, chunk_size: int):
+    async with get_session() as session:
+        tables = await reflect(session)
+        with path.open("w", encoding="utf-8") as f:
+            for name, table in sorted(tables.items()):
+                columns = [x.name for x in table.columns]
+                f.write(json.dumps({"table": name, "columns": columns}, ensure_ascii=False) + "\n")
+                start, rows = time.perf_counter(), 0
+                result = await session.stream(
+                    select(table).order_by(*table.primary_key.columns),
+                    execution_options={"yield_per": chunk_size},
+                )
+                async for partition in result.partitions():
+                    f.writelines(json.dumps(list(x), ensure_ascii=False) + "\n" for x in partition)
+                    rows += len(partition)
+                    report(name, rows, start)
+                report(name, rows, start)
+                print(file=sys.stderr)
+
+
+async def import_(path: Path, chunk_size: int):
+    async with get_session() as session:
+        tables = await reflect(session)
+        table, columns, batch = None, [], []
+        start, rows = time.perf_counter(), 0
+
+        async def flush():
+            nonlocal rows
+            if batch:
+                await session.execute(insert(table), batch)
+                await session.commit()
+                rows += len(batch)
+                batch.clear()
+                report(table.name, rows, start)
+
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                value = json.loads(line)
+                if isinstance(value, dict):
+                    await flush()
+                    if table is not None:
+                        print(file=sys.stderr)
+                    if (table := tables.get(value["table"])) is None:
+                        raise SystemExit(f"目标数据库中不存在表{value['table']}")
+                    if await session.scalar(select(func.count()).select_from(table)):
+                        raise SystemExit(f"目标数据库中的表{table.name}不为空")
+                    columns = value["columns"]
+                    start, rows = time.perf_counter(), 0
+                    report(table.name, rows, start)
+                else:
+                    batch.append(dict(zip(columns, value)))
+                    if len(batch) >= chunk_size:
+                        await flush()
+            await flush()
+            if table is not None:
+                print(file=sys.stderr)
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    asyncio.run((export if args.action == "export" else import_)(args.path, args.chunk_size))
@@ -0,0 +1,85 @@
+"""账户读取路径基准
+
+在临时SQLite数据库上比较按id读取账户与按群昵称读取昵称的两种方式：以ORM（`session.get`/`select(Model)`）构造identity map中的对象，
+与`utils`中以Core查询构造只读记录。每次读取与命令一样使用独立的会话，并关闭账户与昵称缓存。在项目根目录下运行：
+
+    python -m scripts.read_benchmark -n 10000
+"""
+
+import argparse
+import asyncio
+import nonebot
+import sys
+import tempfile
+import time
+
+nonebot.init()
+nonebot.load_plugin("nonebot_plugin_orm")
+nonebot.load_plugin("norxidor.plugins.account_management")
+
+from nonebot import logger
+from nonebot_plugin_orm import Model
+from norxidor.plugins.account_management import utils
+from norxidor.plugins.account_management.types.account import Account, Nickname
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+logger.remove()
+logger.add(sys.stderr, level="WARNING")
+
+parser = argparse.ArgumentParser(description="比较ORM与Core读取账户的耗时")
+parser.add_argument("-n", "--reads", type=int, default=10000, help="每种方式的读取次数，默认为10000")
+parser.add_argument("--accounts", type=int, default=10000, help="数据库中的账户数，默认为10000")
+parser.add_argument("--rounds", type=int, default=3, help="重复轮数，取最快的一轮，默认为3")
+
+GROUPS = 10
+
+
+async def orm(session, id: int):
+    account = await session.get(Account, id)
+    nickname = await session.scalar(
+        select(Nickname).where(Nickname.group_id == id % GROUPS, Nickname.nickname == f"n{id}")
+    )
+    return account.coin, nickname.nickname
+
+
+async def core(session, id: int):
+    account = await utils.get_account(id, session)
+    nickname = await utils.find_nickname(id % GROUPS, f"n{id}", session)
+    return account.coin, nickname.nickname
+
+
+async def main(args: argparse.Namespace):
+    utils.account_cache.maxsize = utils.nickname_cache.maxsize = 0
+    with tempfile.TemporaryDirectory() as d:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{d}/db.sqlite")
+        async with engine.begin() as conn:
+            await conn.run_sync(Model.metadata.create_all)
+            await conn.execute(
+                insert(Account),
+                [dict(id=x, register_time=0, coin=x, last_checkin_time=0) for x in range(args.accounts)],
+            )
+            await conn.execute(
+                insert(Nickname),
+                [
+                    dict(session_id=f"group_{x % GROUPS}_{x}", user_id=x, group_id=x % GROUPS, nickname=f"n{x}")
+                    for x in range(args.accounts)
+                ],
+            )
+        Session = async_sessionmaker(engine)
+        ids = [x * 7919 % args.accounts for x in range(args.reads)]
+
+        for name, read in (("ORM", orm), ("Core", core)):
+            best = float("inf")
+            for _ in range(args.rounds):
+                start = time.perf_counter()
+                for id in ids:
+                    async with Session() as session:
+                        assert await read(session, id) == (id, f"n{id}")
+                best = min(best, time.perf_counter() - start)
+            print(f"{name:<4} {args.reads}次，{best:.2f}s，{best / args.reads * 1e6:.0f}µs/次，{args.reads / best:.0f}次/s")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parser.parse_args()))
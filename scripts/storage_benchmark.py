@@ -0,0 +1,110 @@
+"""SQLite存储配置基准
+
+在临时数据库文件上分别以默认设置与`storage.py`中的存储配置运行注册、签到与查询，比较每秒完成的操作数。
+每个操作与对应的命令一样使用独立的会话并单独提交；查询与命令一样调用`utils.find_account`，并关闭账户与昵称缓存，每次都访问数据库。在项目根目录下运行：
+
+    python -m scripts.storage_benchmark -n 2000
+"""
+
+import argparse
+import asyncio
+import nonebot
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+nonebot.init()
+nonebot.load_plugin("nonebot_plugin_orm")
+nonebot.load_plugin("norxidor.plugins.account_management")
+
+from nonebot import logger
+from nonebot_plugin_orm import Model
+from norxidor.plugins.account_management import checkin, coins, config, journal, storage, utils
+from norxidor.plugins.account_management.types.account import Account, Nickname
+from norxidor.plugins.account_management.types.journal import Reason
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+logger.remove()
+logger.add(sys.stderr, level="WARNING")
+
+parser = argparse.ArgumentParser(description="比较SQLite存储配置前后的注册、签到与查询吞吐量")
+parser.add_argument("-n", "--accounts", type=int, default=2000, help="注册与签到的账户数，默认为2000")
+parser.add_argument("-l", "--lookups", type=int, default=20000, help="查询次数，默认为20000")
+parser.add_argument("-c", "--concurrency", type=int, default=8, help="并发执行的操作数，默认为8")
+parser.add_argument("--dir", type=Path, default=None, help="临时数据库所在目录，默认为系统临时目录")
+
+GROUPS = 10
+
+
+async def run(name: str, ops, concurrency: int) -> float:
+    queue = iter(ops)
+
+    async def worker():
+        for op in queue:
+            await op()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - start
+    print(f"  {name:<6} {len(ops):>7}次，{seconds:7.2f}s，{len(ops) / seconds:9.0f}次/s")
+    return len(ops) / seconds
+
+
+async def bench(profile: bool, args: argparse.Namespace) -> dict[str, float]:
+    config.sqlite_profile = profile
+    with tempfile.TemporaryDirectory(dir=args.dir) as d:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{d}/db.sqlite")
+        async with engine.begin() as conn:
+            await conn.run_sync(Model.metadata.create_all)
+            mode = await conn.scalar(text("PRAGMA journal_mode"))
+        print(f"{'存储配置' if profile else '默认设置'}（journal_mode={mode}）")
+        Session = async_sessionmaker(engine)
+        day = checkin.today()
+
+        def register(id: int):
+            async def op():
+                async with Session() as session:
+                    session.add(Account(id=id, register_time=time.time(), coin=0, last_checkin_time=0))
+                    session.add(Nickname(session_id=f"group_{id % GROUPS}_{id}", user_id=id, group_id=id % GROUPS, nickname=f"n{id}"))
+                    await session.commit()
+            return op
+
+        def check_in(id: int):
+            async def op():
+                async with Session() as session:
+                    if await coins.add_coin(session, id, 1, Reason.CHECKIN, Account.last_checkin_time < checkin.day_start(), last_checkin_time=time.time()) is not None:
+                        await checkin.record(session, id, day)
+            return op
+
+        def lookup(id: int):
+            async def op():
+                async with Session() as session:
+                    account, _ = await utils.find_account(f"n{id}", id % GROUPS, session)
+                    assert account.id == id
+            return op
+
+        ids = range(args.accounts)
+        res = {
+            "注册": await run("注册", [register(x) for x in ids], args.concurrency),
+            "签到": await run("签到", [check_in(x) for x in ids], args.concurrency),
+            "查询": await run("查询", [lookup(x % args.accounts) for x in range(args.lookups)], args.concurrency),
+        }
+        journal.pending.clear()
+        await engine.dispose()
+    return res
+
+
+async def main(args: argparse.Namespace):
+    # 流水只在内存中缓冲，不写入机器人的数据库
+    config.coin_journal_batch_size = sys.maxsize
+    utils.account_cache.maxsize = utils.nickname_cache.maxsize = 0
+    print(f"PRAGMA：{storage.PROFILE | config.sqlite_pragmas}")
+    before = await bench(False, args)
+    after = await bench(True, args)
+    print("提升：" + "，".join(f"{k} {after[k] / before[k]:.2f}x" for k in before))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,38 @@
+"""Swindlestones AI 离线胜率基准
+
+在项目根目录下运行：
+
+    python -m scripts.swindlestones_benchmark 5d4 5d8 hard -n 1000000
+"""
+
+import argparse
+import nonebot
+import sys
+
+nonebot.init()
+nonebot.load_plugin("norxidor.plugins.account_management")
+
+from nonebot import logger
+from norxidor.plugins.account_management.swindlestones.constants import AI_VERSION
+from norxidor.plugins.account_management.swindlestones.simulate import Preset, benchmark
+
+logger.remove()
+logger.add(sys.stderr, level="WARNING")
+
+parser = argparse.ArgumentParser(description="Swindlestones AI 对阵基准对手的离线胜率测试")
+parser.add_argument("presets", nargs="*", default=["5d4"], help="骰子预设，NdF或hard（困难模式），默认为5d4")
+parser.add_argument("-n", "--games", type=int, default=100000, help="每个预设的对局数，默认为100000")
+parser.add_argument("-j", "--workers", type=int, default=None, help="工作进程数，默认为CPU核数")
+parser.add_argument("-s", "--seed", type=int, default=0, help="起始种子，默认为0")
+parser.add_argument("--chunk-size", type=int, default=10000, help="每个批次的对局数，默认为10000")
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    presets = [Preset.parse(x) for x in args.presets]
+    print(f"AI_VERSION = {AI_VERSION}")
+    for res in benchmark(presets, args.games, args.workers, args.seed, args.chunk_size):
+        low, high = res.confidence_interval()
+        print(
+            f"{res.preset:>6}: AI胜率 {res.win_rate:.4f} (95% CI {low:.4f}~{high:.4f}), "
+            f"{res.games}局，{res.seconds:.1f}s，{res.games_per_second:.0f}局/s"
+        )
@@ -0,0 +1,58 @@
+"""Swindlestones 对局重放
+
+以对局记录（默认位于插件数据目录下的`swindlestones_replays.jsonl`）中的种子与玩家操作重放每一局，
+比对AI的决策是否与记录一致，并统计各骰子预设下单次决策的耗时。在项目根目录下运行：
+
+    python -m scripts.swindlestones_replay path/to/swindlestones_replays.jsonl
+"""
+
+import argparse
+import nonebot
+import statistics
+import sys
+from pathlib import Path
+
+nonebot.init()
+nonebot.load_plugin("norxidor.plugins.account_management")
+
+from nonebot import logger
+from norxidor.plugins.account_management.swindlestones.constants import AI_VERSION
+from norxidor.plugins.account_management.swindlestones.replay import load_records, replay
+
+logger.remove()
+logger.add(sys.stderr, level="WARNING")
+
+parser = argparse.ArgumentParser(description="重放Swindlestones对局记录，检查AI决策回归并测量决策耗时")
+parser.add_argument("path", type=Path, help="对局记录文件")
+parser.add_argument("--all-versions", action="store_true", help="同时重放其他AI版本的对局记录")
+parser.add_argument("--show", type=int, default=10, help="最多显示的不一致对局数，默认为10")
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    games: dict[str, int] = {}
+    latencies: dict[str, list[float]] = {}
+    mismatches: list[str] = []
+    for i, record in enumerate(load_records(args.path)):
+        if record["version"] != AI_VERSION and not args.all_versions:
+            continue
+        res = replay(record)
+        games[res.preset] = games.get(res.preset, 0) + 1
+        latencies.setdefault(res.preset, []).extend(res.latencies)
+        if res.mismatch:
+            mismatches.append(f"第{i + 1}行（{res.preset}）{res.mismatch}")
+
+    for preset, _latencies in sorted(latencies.items()):
+        if not _latencies:
+            continue
+        _latencies.sort()
+        print(
+            f"{preset:>6}: {games[preset]}局，{len(_latencies)}次决策，"
+            f"平均 {statistics.fmean(_latencies) * 1e6:.0f}us，"
+            f"p50 {_latencies[len(_latencies) // 2] * 1e6:.0f}us，"
+            f"p99 {_latencies[int(len(_latencies) * 0.99)] * 1e6:.0f}us，"
+            f"最大 {_latencies[-1] * 1e6:.0f}us"
+        )
+    print(f"不一致：{len(mismatches)}局")
+    for x in mismatches[: args.show]:
+        print(x)
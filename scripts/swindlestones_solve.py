@@ -0,0 +1,46 @@
+"""Swindlestones 困难模式策略表求解
+
+对困难模式（AI与玩家分别持有5枚与3枚4面骰，AI先手）的每一轮以CFR+离线求解近似均衡策略，
+并将AI的策略表写入`swindlestones/hardmode_policy.npy`，运行时以mmap方式载入。在项目根目录下运行：
+
+    python -m scripts.swindlestones_solve -n 1000
+"""
+
+import argparse
+import nonebot
+import numpy as np
+import sys
+import time
+from pathlib import Path
+
+nonebot.init()
+nonebot.load_plugin("norxidor.plugins.account_management")
+
+from nonebot import logger
+from norxidor.plugins.account_management.swindlestones.constants import HARD_MODE_DICE_PRESET
+from norxidor.plugins.account_management.swindlestones.policy import POLICY_FILE
+from norxidor.plugins.account_management.swindlestones.solver import RoundGame, solve
+
+logger.remove()
+logger.add(sys.stderr, level="WARNING")
+
+parser = argparse.ArgumentParser(description="以CFR+离线求解Swindlestones困难模式的AI策略表")
+parser.add_argument("-n", "--iterations", type=int, default=1000, help="每一轮的迭代次数，默认为1000")
+parser.add_argument("-o", "--output", type=Path, default=POLICY_FILE, help="策略表输出路径，默认覆盖插件自带的策略表")
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    start = time.perf_counter()
+
+    def progress(a: int, b: int, ai_first: bool, game: RoundGame):
+        print(
+            f"AI {a}枚 vs 玩家 {b}枚，{'AI' if ai_first else '玩家'}先手："
+            f"AI胜率 {game.value():.4f}，近似可剥削度 {game.exploitability():.4f}，"
+            f"累计 {time.perf_counter() - start:.0f}s"
+        )
+
+    policy, values = solve(args.iterations, progress)
+    np.save(args.output, policy)
+    player_dice_count, ai_dice_count = HARD_MODE_DICE_PRESET
+    print(f"整局AI胜率：{values[(ai_dice_count, player_dice_count, True)]:.4f}")
+    print(f"策略表已写入{args.output}（{policy.nbytes / 1024:.0f} KiB）")
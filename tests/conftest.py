@@ -0,0 +1,56 @@
+import os
+import tempfile
+
+import nonebot
+import pytest
+
+# 测试使用临时目录中的SQLite数据库与插件数据目录，不影响机器人的数据
+_tmp = tempfile.mkdtemp(prefix="norxidor-test-")
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}/db.sqlite"
+os.environ["ALEMBIC_STARTUP_CHECK"] = "false"
+for _name in ("CACHE", "CONFIG", "DATA"):
+    os.environ[f"LOCALSTORE_{_name}_DIR"] = os.path.join(_tmp, _name.lower())
+
+nonebot.init()
+nonebot.load_plugin("nonebot_plugin_orm")
+nonebot.load_plugin("norxidor.plugins.account_management")
+nonebot.load_plugin("norxidor.plugins.simple_dungeon")
+
+
+def pytest_addoption(parser):
+    parser.addoption("--slow", action="store_true", help="运行标记为slow的测试（如百万行数据的导出导入）")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--slow"):
+        return
+    skip = pytest.mark.skip(reason="需要--slow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+
+@pytest.fixture
+async def db():
+    """建好全部表的空数据库，测试结束后删除所有表并清空缓存"""
+    from nonebot_plugin_orm import Model, get_session
+    from norxidor.plugins.account_management import names, utils
+    from norxidor.plugins.simple_dungeon.utils import characters
+
+    async with get_session() as session:
+        await session.run_sync(lambda x: Model.metadata.create_all(x.connection()))
+        await session.commit()
+    yield
+    utils.invalidate_account()
+    utils.invalidate_nickname()
+    names.nicknames.invalidate()
+    characters.invalidate()
+    async with get_session() as session:
+        await session.run_sync(lambda x: Model.metadata.drop_all(x.connection()))
+        await session.commit()
@@ -0,0 +1,88 @@
+"""`scripts/data_transfer.py`的往返测试
+
+在临时SQLite数据库的各插件表中生成合成数据，以脚本导出后导入到另一个新建的数据库，比较两个数据库各表的行数与内容。
+默认只用少量数据；百万行的往返以`pytest --slow`运行。
+"""
+
+import json
+import os
+import pytest
+import subprocess
+import sys
+from nonebot_plugin_orm import Model
+from pathlib import Path
+from sqlalchemy import Boolean, Float, Integer, Table, create_engine, func, insert, select, text
+
+ROOT = Path(__file__).parents[1]
+TABLE_PREFIXES = ("account_management_", "simple_dungeon_")
+CHUNK_SIZE = 10000
+
+
+def plugin_tables() -> list[Table]:
+    return [x for x in Model.metadata.sorted_tables if x.name.startswith(TABLE_PREFIXES)]
+
+
+def synthetic_row(table: Table, i: int) -> dict:
+    row = {}
+    for column in table.columns:
+        if isinstance(column.type, Boolean):
+            row[column.name] = i % 2 == 0
+        elif isinstance(column.type, Integer):
+            row[column.name] = i
+        elif isinstance(column.type, Float):
+            row[column.name] = i + 0.25
+        elif enums := getattr(column.type, "enums", None):
+            row[column.name] = column.type.enum_class[enums[i % len(enums)]] if column.type.enum_class else enums[i % len(enums)]
+        else:
+            row[column.name] = f"{column.name}_{i}"
+    return row
+
+
+def create_database(path: Path, rows_per_table: int = 0):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        Model.metadata.create_all(conn)
+        for table in plugin_tables():
+            for start in range(0, rows_per_table, CHUNK_SIZE):
+                conn.execute(
+                    insert(table),
+                    [synthetic_row(table, i) for i in range(start, min(start + CHUNK_SIZE, rows_per_table))],
+                )
+    engine.dispose()
+
+
+def data_transfer(action: str, database: Path, dump: Path):
+    env = os.environ | {"SQLALCHEMY_DATABASE_URL": f"sqlite+aiosqlite:///{database}"}
+    subprocess.run(
+        [sys.executable, "-m", "scripts.data_transfer", action, str(dump), "--chunk-size", str(CHUNK_SIZE)],
+        cwd=ROOT, env=env, check=True,
+    )
+
+
+@pytest.mark.parametrize("rows", [1000, pytest.param(1_000_000, marks=pytest.mark.slow)])
+def test_round_trip(tmp_path: Path, rows: int):
+    source, target, dump = tmp_path / "source.sqlite", tmp_path / "target.sqlite", tmp_path / "dump.jsonl"
+    tables = plugin_tables()
+    rows_per_table = rows // len(tables)
+    create_database(source, rows_per_table)
+    create_database(target)
+
+    data_transfer("export", source, dump)
+    data_transfer("import", target, dump)
+
+    with dump.open(encoding="utf-8") as f:
+        headers = [x["table"] for x in map(json.loads, f) if isinstance(x, dict)]
+    assert sorted(headers) == sorted(x.name for x in tables)
+
+    engine = create_engine(f"sqlite:///{target}")
+    with engine.connect() as conn:
+        conn.exec_driver_sql(f"ATTACH DATABASE '{source}' AS source")
+        for table in tables:
+            assert conn.scalar(select(func.count()).select_from(table)) == rows_per_table, table.name
+            # 两个方向的差集都为空时两表内容完全相同
+            for a, b in (("main", "source"), ("source", "main")):
+                difference = conn.scalar(
+                    text(f"SELECT count(*) FROM (SELECT * FROM {a}.{table.name} EXCEPT SELECT * FROM {b}.{table.name})")
+                )
+                assert difference == 0, (table.name, a, b)
+    engine.dispose()
@@ -0,0 +1,143 @@
+"""常用查询与删除的查询计划
+
+在由模型建立的SQLite数据库上执行实际的查询与删除函数，记录其发出的语句，再以`EXPLAIN QUERY PLAN`检查每条语句
+使用了预期的索引，且没有全表扫描。
+"""
+
+import pytest
+import re
+from nonebot_plugin_orm import get_session
+from norxidor.plugins.account_management import journal, purge, utils
+from norxidor.plugins.account_management.types.account import Account, Nickname
+from norxidor.plugins.simple_dungeon import utils as dungeon_utils
+from norxidor.plugins.simple_dungeon.types.alignment import Alignment
+from norxidor.plugins.simple_dungeon.types.character import Character, Gender
+from norxidor.plugins.simple_dungeon.types.race import Race
+from sqlalchemy import Engine, event
+
+pytestmark = pytest.mark.anyio
+
+GROUP = 100
+USER = 1
+
+NICKNAME_GROUP_INDEX = "ix_account_management_nickname_group_id_nickname"
+NICKNAME_USER_INDEX = "ix_account_management_nickname_user_id"
+CHARACTER_NAME_INDEX = "ix_simple_dungeon_character_group_id_name"
+CHARACTER_USER_INDEX = "ix_simple_dungeon_character_user_id"
+
+
+class Statements:
+    """记录期间数据库收到的语句"""
+
+    def __init__(self):
+        self.items: list[tuple[str, tuple]] = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "DELETE", "UPDATE")):
+            self.items.append((statement, parameters))
+
+    def __enter__(self):
+        event.listen(Engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *_):
+        event.remove(Engine, "before_cursor_execute", self._record)
+
+    async def plans(self) -> list[str]:
+        """每条语句的查询计划"""
+        res = []
+        async with get_session() as session:
+            conn = await session.connection()
+            for statement, parameters in self.items:
+                rows = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+                res.append("\n".join(x[-1] for x in rows))
+        return res
+
+
+async def assert_indexed(statements: Statements, *indexes: str):
+    plans = await statements.plans()
+    assert plans
+    for plan in plans:
+        assert not re.search(r"^SCAN \w+$", plan, re.MULTILINE), plan
+    for index in indexes:
+        assert any(index in x for x in plans), (index, plans)
+
+
+@pytest.fixture
+async def data(db):
+    async with get_session() as session:
+        for id in range(USER, USER + 3):
+            session.add(Account(id=id, register_time=0, coin=id, last_checkin_time=0))
+            session.add(Nickname(session_id=f"group_{GROUP}_{id}", user_id=id, group_id=GROUP, nickname=f"player{id}"))
+            session.add(
+                Character(
+                    id=f"group_{GROUP}_{id}", user_id=id, group_id=GROUP, name=f"hero{id}",
+                    gender=Gender.Male, race=list(Race)[0], _str_class="", alignment=list(Alignment)[0],
+                    str_=10, dex_=10, con_=10, int_=10, wis_=10, cha_=10,
+                )
+            )
+        await session.commit()
+    yield
+    journal.pending.clear()
+
+
+async def test_find_account_by_nickname(data):
+    async with get_session() as session:
+        with Statements() as statements:
+            account, _ = await utils.find_account(f"player{USER}", GROUP, session)
+    assert account.id == USER
+    await assert_indexed(statements, NICKNAME_GROUP_INDEX, "INTEGER PRIMARY KEY")
+
+
+async def test_find_account_by_id(data):
+    async with get_session() as session:
+        with Statements() as statements:
+            account, nickname = await utils.find_account(USER, GROUP, session)
+    assert account.id == USER and nickname.user_id == USER
+    await assert_indexed(statements, "INTEGER PRIMARY KEY", "sqlite_autoindex_account_management_nickname")
+
+
+async def run_job(job: purge.Job) -> Statements:
+    with Statements() as statements:
+        for target in purge.targets:
+            if (where := job.condition(target)) is not None:
+                await purge._delete_chunk(target, where)
+    return statements
+
+
+async def test_delete_account(data):
+    await assert_indexed(await run_job(purge.Job("account", USER)), NICKNAME_USER_INDEX, CHARACTER_USER_INDEX)
+    async with get_session() as session:
+        assert await session.get(Account, USER) is None
+        assert await session.get(Character, f"group_{GROUP}_{USER}") is None
+
+
+async def test_delete_group(data):
+    await assert_indexed(await run_job(purge.Job("group", GROUP)), NICKNAME_GROUP_INDEX, CHARACTER_NAME_INDEX)
+    async with get_session() as session:
+        assert await session.get(Nickname, f"group_{GROUP}_{USER}") is None
+        assert await session.get(Account, USER) is not None
+
+
+async def test_character_name_taken(data):
+    async with get_session() as session:
+        with Statements() as statements:
+            assert await dungeon_utils.is_name_taken(GROUP, f"hero{USER}", session)
+            assert not await dungeon_utils.is_name_taken(GROUP, "nobody", session)
+    await assert_indexed(statements, CHARACTER_NAME_INDEX)
+
+
+async def test_find_character_by_name(data):
+    async with get_session() as session:
+        with Statements() as statements:
+            character = await dungeon_utils.find_character(f"hero{USER}", GROUP, session)
+    assert character.user_id == USER
+    await assert_indexed(statements, NICKNAME_GROUP_INDEX, CHARACTER_NAME_INDEX)
+
+
+async def test_find_character_by_nickname(data):
+    async with get_session() as session:
+        with Statements() as statements:
+            character = await dungeon_utils.find_character(f"player{USER}", GROUP, session)
+    assert character.user_id == USER
+    await assert_indexed(statements, NICKNAME_GROUP_INDEX, "sqlite_autoindex_simple_dungeon_character")
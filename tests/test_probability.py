@@ -0,0 +1,110 @@
+"""概率表与原递归实现的回归测试
+
+`baseline_*`为改为查表与占用数动态规划之前的实现，原样复制于此，在游戏使用的全部`(n, d)`范围内逐项比较。
+"""
+
+import math
+
+import pytest
+
+from norxidor.plugins.account_management.swindlestones.constants import MAX_DICE_COUNT, MAX_DICE_FACE
+from norxidor.plugins.account_management.swindlestones.probability import (
+    dice_probability,
+    p_at_least_k_same,
+    p_no_more_than_k_same,
+)
+
+CONFIGS = [(n, d) for d in range(2, MAX_DICE_FACE + 1) for n in range(MAX_DICE_COUNT + 1)]
+
+
+def baseline_pmf_B(k: int, n: int, p: float) -> float:
+    if k > n or p < 0 or p > 1:
+        raise ValueError
+    return math.comb(n, k) * p**k * (1 - p) ** (n - k)
+
+
+def baseline_cdf_B(k: int, n: int, p: float) -> float:
+    res = 0
+    for i in range(k + 1):
+        res += baseline_pmf_B(i, n, p)
+    return res
+
+
+def baseline_dice_probability(k: int, kmin: int, kmax: int, n: int, f: int) -> float:
+    if kmin > kmax:
+        raise ValueError
+
+    if k <= kmin:
+        return 1
+    elif k > kmax:
+        return 0
+    else:
+        p = 1 / f
+        return ((1 - baseline_cdf_B(k - 1, n, p)) - (1 - baseline_cdf_B(kmax, n, p))) / (
+            1 - baseline_cdf_B(kmin - 1, n, p) - (1 - baseline_cdf_B(kmax, n, p))
+        )
+
+
+def baseline_p_no_more_than_k_same(k: int, n: int, d: int) -> float:
+    if k == 1:
+        return math.factorial(d) / (math.factorial(d-n)*d**n)
+
+    res = 0
+    for i in range(1, math.floor(n/k)+1):
+        a = math.factorial(n)*math.factorial(d) / (d**(i*k)*math.factorial(i)*math.factorial(k)**i*math.factorial(n-i*k)*math.factorial(d-i))
+        s = 0
+        for j in range(1, k):
+            s += baseline_p_no_more_than_k_same(j, n-i*k, d-i)*(d-i)**(n-i*k)/d**(n-i*k)
+        res += a*s
+    return res
+
+
+def baseline_p_at_least_k_same(k: int, n: int, d: int) -> float:
+    if k > n:
+        raise ValueError("k must lower or equal to n")
+    if k <= math.ceil(n/d):
+        return 1
+    else:
+        return sum([baseline_p_no_more_than_k_same(i, n, d) for i in range(k, n+1)])
+
+
+def _baseline(fn, *args) -> float | None:
+    """原实现在部分配置下（如骰子数多于面数时）因阶乘参数为负而无法计算，此时返回`None`"""
+    try:
+        return fn(*args)
+    except ValueError:
+        return None
+
+
+@pytest.mark.parametrize(("n", "d"), CONFIGS)
+def test_p_no_more_than_k_same(n: int, d: int):
+    for k in range(1, n + 1):
+        if (expected := _baseline(baseline_p_no_more_than_k_same, k, n, d)) is not None:
+            assert p_no_more_than_k_same(k, n, d) == pytest.approx(expected, rel=1e-9, abs=1e-12), k
+
+
+@pytest.mark.parametrize(("n", "d"), CONFIGS)
+def test_p_at_least_k_same(n: int, d: int):
+    for k in range(n + 1):
+        if (expected := _baseline(baseline_p_at_least_k_same, k, n, d)) is not None:
+            assert p_at_least_k_same(k, n, d) == pytest.approx(expected, rel=1e-9, abs=1e-12), k
+
+
+@pytest.mark.parametrize(("n", "f"), CONFIGS)
+def test_dice_probability(n: int, f: int):
+    # 原实现以`1 - cdf`相减，区间很窄时有相对1e-9量级的抵消误差
+    for kmin in range(n + 1):
+        for kmax in range(kmin, n + 1):
+            for k in range(kmin, kmax + 2):
+                expected = baseline_dice_probability(k, kmin, kmax, n, f)
+                assert dice_probability(k, kmin, kmax, n, f) == pytest.approx(expected, rel=1e-7, abs=1e-12), (k, kmin, kmax)
+
+
+def test_baseline_coverage():
+    """原实现可计算的配置应覆盖绝大部分范围，避免比较被大量跳过"""
+    computed = sum(
+        _baseline(baseline_p_at_least_k_same, k, n, d) is not None
+        for n, d in CONFIGS
+        for k in range(n + 1)
+    )
+    assert computed > sum(n + 1 for n, _ in CONFIGS) / 2
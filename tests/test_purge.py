@@ -0,0 +1,64 @@
+"""后台分块删除任务"""
+
+import asyncio
+import pytest
+from nonebot_plugin_orm import get_session
+from norxidor.plugins.account_management import config, journal, purge
+from norxidor.plugins.account_management.types.account import Account, Nickname
+from sqlalchemy import func, insert, select
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def accounts(db, monkeypatch):
+    monkeypatch.setattr(config, "purge_chunk_size", 10)
+    monkeypatch.setattr(config, "purge_interval", 0)
+    async with get_session() as session:
+        await session.execute(
+            insert(Account), [dict(id=x, register_time=0, coin=1, last_checkin_time=0) for x in range(50)]
+        )
+        await session.execute(
+            insert(Nickname),
+            [dict(session_id=f"group_{x % 2}_{x}", user_id=x, group_id=x % 2, nickname=f"n{x}") for x in range(50)],
+        )
+        await session.commit()
+    yield
+    journal.pending.clear()
+
+
+async def count(model) -> int:
+    async with get_session() as session:
+        return await session.scalar(select(func.count()).select_from(model))
+
+
+async def wait(timeout: float = 10):
+    async with asyncio.timeout(timeout):
+        while purge.jobs:
+            await asyncio.sleep(0.01)
+
+
+async def test_group_and_account_jobs(accounts):
+    purge.submit(purge.Job("group", 1))
+    purge.submit(purge.Job("account", 0))
+    await wait()
+    assert await count(Nickname) == 24
+    assert await count(Account) == 49
+
+
+async def test_retry_after_error(accounts, monkeypatch):
+    delete_chunk, failures = purge._delete_chunk, [RuntimeError("database is locked")]
+
+    async def flaky(target, where):
+        if failures:
+            raise failures.pop()
+        return await delete_chunk(target, where)
+
+    monkeypatch.setattr(purge, "_delete_chunk", flaky)
+    purge.submit(purge.Job("group", 0))
+    purge.submit(purge.Job("group", 1))
+    await asyncio.sleep(0.1)
+    assert purge.jobs[0].error == "RuntimeError"
+    assert purge.status()[0].startswith("⚠")
+    await wait()
+    assert await count(Nickname) == 0